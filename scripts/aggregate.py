@@ -0,0 +1,35 @@
+""" Maintenance of the stored monthly aggregate cube used by reporting """
+
+import sys
+
+import click
+import pyexcel_ods3 as ods
+
+from utils import aggregates as ag
+from utils import file_settings as fs
+from utils import partitions as pt
+from utils import utils
+
+
+@click.command()
+@click.option(
+    "--verify", is_flag=True, help="Compare stored aggregates to a full rebuild."
+)
+@click.option("--rebuild", is_flag=True, help="Rebuild aggregates from expenses.")
+def aggregate(verify: bool, rebuild: bool) -> None:
+    """Verify or rebuild the stored monthly aggregates against the expenses sheet"""
+    book = ods.get_data(fs.decrypted_file_name())
+    df_expenses = utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+    # closed years keep the cube stored when they were archived
+    cube = ag.combine_cubes([pt.cube(), ag.build_cube(df_expenses)])
+
+    if rebuild:
+        ag.save_cube(cube)
+        utils.print_status(f"Aggregates rebuilt, {len(cube)} cells")
+
+    if verify:
+        if ag.cubes_equal(ag.load_cube(), cube):
+            utils.print_status("Stored aggregates match the expenses sheet")
+        else:
+            utils.print_error("Stored aggregates differ from the expenses sheet")
+            sys.exit(1)
@@ -0,0 +1,64 @@
+""" Freezing of closed years out of the workbook, into read-only archives """
+
+import sys
+from typing import Tuple
+
+import click
+import pyexcel_ods3 as ods
+
+from utils import expenses_store as es
+from utils import file_settings as fs
+from utils import instrument
+from utils import partitions as pt
+from utils import utils
+
+
+@click.command()
+@click.argument("years", type=int, nargs=-1)
+@click.option(
+    "--verify", is_flag=True, help="Check every archive against its checksum."
+)
+def archive(years: Tuple[int, ...], verify: bool) -> None:
+    """
+    Move closed YEARS of activity & expenses out of finance.ods into finance_archive.
+
+    Archived years are read-only, so categorize only relabels the open years. Without
+    YEARS, lists the archived years.
+    """
+    if years:
+        with instrument.stage("ods_load"):
+            book = ods.get_data(fs.decrypted_file_name())
+
+        # every year is checked before any is written, and listed in the manifest only
+        # once the book without it is saved
+        manifest = pt.load_manifest()
+        try:
+            pt.check(years, manifest)
+            archived = {year: pt.freeze(book, year, manifest) for year in sorted(years)}
+        except ValueError as error:
+            utils.print_error(str(error))
+            sys.exit(1)
+
+        with instrument.stage("ods_save"):
+            ods.save_data(fs.decrypted_file_name(), book)
+            es.prime(utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype()))
+        pt.save_manifest(manifest)
+
+        for year, rows in archived.items():
+            utils.print_status(
+                f"{year} archived, "
+                + ", ".join(f"{count} {sheet}" for sheet, count in rows.items())
+            )
+
+    if verify:
+        problems = pt.verify()
+        for problem in problems:
+            utils.print_error(problem)
+        if problems:
+            sys.exit(1)
+        utils.print_status("Every archive matches its checksum")
+
+    if not years and not verify:
+        for year, entry in sorted(pt.load_manifest()["years"].items()):
+            rows = entry["sheets"][fs.expenses_page()]["rows"]
+            utils.print_status(f"{year}: {rows} expense row(s)")
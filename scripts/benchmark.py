@@ -0,0 +1,285 @@
+""" Synthetic data generation & an end to end benchmark of every pipeline stage """
+
+import json
+import os
+import platform
+import tempfile
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import click
+import matplotlib.pyplot as plt
+import pandas as pd
+import pyexcel_ods3 as ods
+
+from scripts import categorize as ct
+from scripts import graph as gr
+from scripts import import_activity as ia
+from utils import aggregates as ag
+from utils import arrow
+from utils import dates as dt
+from utils import figure_cache as fc
+from utils import file_settings as fs
+from utils import instrument
+from utils import synthetic as syn
+from utils import utils
+
+STAGES = [
+    "csv_parse",
+    "dedup",
+    "transfers",
+    "label",
+    "inflation",
+    "type",
+    "aggregate",
+    "ods_save",
+    "ods_load",
+    "graph",
+]
+
+# regressions below this many seconds are noise
+NOISE_FLOOR = 0.05
+
+
+def measure(func: Callable[[], Any]) -> Tuple[Any, Dict[str, float]]:
+    """Run func, returning its result with wall & cpu seconds and peak traced memory"""
+    with instrument.measured() as metrics:
+        result = func()
+
+    return result, {key: metrics[key] for key in ("wall_s", "cpu_s", "peak_mb")}
+
+
+def _uninflated(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """expenses_raw layout without the inflation adjustment, when that stage is skipped"""
+    df_raw = df_raw.copy()
+    df_raw["Date"] = dt.parse(df_raw["Date"])
+    df_raw["Currency"] = fs.base_currency()
+    df_raw["Original"] = df_raw["Amount"]
+    df_raw["Historical"] = df_raw["Amount"]
+    return df_raw[
+        [
+            "data_source_note",
+            "Date",
+            "Currency",
+            "Original",
+            "Historical",
+            "Amount",
+            "Type",
+            "Category",
+            "Description",
+            "Grouping",
+            "Merchant",
+            "Label",
+            "Link",
+        ]
+    ]
+
+
+def _graphs(df: pd.DataFrame) -> Dict[str, Callable[[], None]]:
+    graphs: Dict[str, Callable[[], None]] = {
+        "graph_income_expenses_cumsum": lambda: gr.graph_income_expenses_cumsum(df)
+    }
+    for sample in ("month", "year"):
+        for func in (
+            gr.graph_income,
+            gr.graph_expenses,
+            gr.graph_expense_type_area,
+            gr.graph_expense_type_area_perc_of_income,
+            gr.graph_lifestyle_type_area,
+        ):
+            graphs[f"{func.__name__}_{sample}"] = lambda func=func, sample=sample: func(
+                df, sample
+            )
+    return graphs
+
+
+def run_benchmark(
+    rows: int, seed: int = 0, skip: Iterable[str] = ()
+) -> Dict[str, Dict[str, float]]:
+    """Time every stage of import, categorize & graph over synthetic statements"""
+    skip = set(skip)
+    results: Dict[str, Dict[str, float]] = {}
+
+    def stage(name: str, func: Callable[[], Any], count: int) -> Any:
+        result, metrics = measure(func)
+        results[name] = {"rows": count, **metrics}
+        return result
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = syn.write_statements(directory, rows, seed)
+
+        bank, credit = stage(
+            "csv_parse",
+            lambda: (
+                ia._get_csv_df_bank(paths["bank"]),
+                ia._get_csv_df_credit(paths["credit"]),
+            ),
+            rows,
+        )
+
+        # the sheets already hold every other row of the exports
+        bank_sheet = bank.iloc[::2].assign(data_source_note="synthetic bank")
+        credit_sheet = credit.iloc[::2].assign(data_source_note="synthetic credit")
+        bank, credit = stage(
+            "dedup",
+            lambda: (
+                ia.merge_activity(bank_sheet, bank, "synthetic bank"),
+                ia.merge_activity(credit_sheet, credit, "synthetic credit"),
+            ),
+            rows,
+        )
+
+        linked = {"credit": credit.copy(), "bank": bank.copy()}
+        window = fs.transfer_window_days()
+        stage(
+            "transfers",
+            lambda: ct.link_transfers(linked["credit"], linked["bank"], window),
+            rows,
+        )
+
+        df_raw = stage(
+            "label",
+            lambda: ct.label_rows(
+                ct.organized_concat_df(linked["credit"], linked["bank"])
+            ),
+            rows,
+        )
+
+        if "inflation" in skip:
+            df_raw = _uninflated(df_raw)
+        else:
+            df_raw = stage("inflation", lambda: ct.inflate_rows(df_raw), rows)
+
+        df_simple = stage("type", lambda: ct.simplify_rows(df_raw), rows)
+        stage("aggregate", lambda: ag.build_cube(df_simple), rows)
+
+        book = {
+            fs.activity_page_bank(): [bank.columns.tolist()] + bank.values.tolist(),
+            fs.activity_page_credit(): [credit.columns.tolist()]
+            + credit.values.tolist(),
+            fs.expenses_raw_page(): [df_raw.columns.tolist()] + df_raw.values.tolist(),
+            fs.expenses_page(): [df_simple.columns.tolist()]
+            + df_simple.values.tolist(),
+        }
+        if "ods_save" not in skip:
+            stage("ods_save", lambda: ods.save_data(paths["workbook"], book), rows)
+            if "ods_load" not in skip:
+                stage("ods_load", lambda: ods.get_data(paths["workbook"]), rows)
+
+    if "graph" not in skip:
+        plt.switch_backend("Agg")
+        fc.set_enabled(False)
+        df = gr.drop_vacation(gr.df_base(df_simple))
+        for name, draw in _graphs(df).items():
+            stage(name, draw, len(df))
+            plt.close("all")
+        fc.set_enabled(True)
+
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Stages whose wall time grew by more than tolerance over the baseline"""
+    regressions = []
+    for size, stages in results.items():
+        for name, metrics in stages.items():
+            before = baseline.get(size, {}).get(name)
+            if not before or max(before["wall_s"], metrics["wall_s"]) < NOISE_FLOOR:
+                continue
+            if metrics["wall_s"] > before["wall_s"] * (1 + tolerance):
+                regressions.append(
+                    f"{size} rows, {name}: {before['wall_s']}s -> {metrics['wall_s']}s"
+                )
+    return regressions
+
+
+def _summary(results: Dict[str, Any]) -> str:
+    lines = [f"{'rows':>9} {'stage':<45} {'wall s':>9} {'cpu s':>9} {'peak MB':>9}"]
+    for size, stages in results.items():
+        for name, metrics in stages.items():
+            lines.append(
+                f"{size:>9} {name:<45} {metrics['wall_s']:>9.3f} "
+                f"{metrics['cpu_s']:>9.3f} {metrics['peak_mb']:>9.2f}"
+            )
+    return "\n".join(lines)
+
+
+@click.command()
+@click.argument("directory", type=str)
+@click.option("--rows", type=int, default=10000, show_default=True)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--unlabeled",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Share of rows from vendors no pattern matches.",
+)
+def synthesize(directory: str, rows: int, seed: int, unlabeled: float) -> None:
+    """Write seeded synthetic bank.csv, credit.csv & finance.ods into DIRECTORY"""
+    paths = syn.write_statements(directory, rows, seed, unlabeled)
+    utils.print_status(f"Synthetic statements written: {', '.join(paths.values())}")
+
+
+@click.command()
+@click.option(
+    "--rows",
+    type=int,
+    multiple=True,
+    default=(1000, 10000, 100000),
+    show_default=True,
+    help="Ledger sizes to run, may be repeated.",
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--skip", type=click.Choice(STAGES), multiple=True, help="Stages to leave out."
+)
+@click.option("--output", type=str, default="benchmark.json", show_default=True)
+@click.option("--baseline", type=str, default="", help="Results JSON to compare to.")
+@click.option(
+    "--tolerance",
+    type=float,
+    default=0.25,
+    show_default=True,
+    help="Allowed slowdown over the baseline before a stage is a regression.",
+)
+def benchmark(
+    rows: Tuple[int, ...],
+    seed: int,
+    skip: Tuple[str, ...],
+    output: str,
+    baseline: str,
+    tolerance: float,
+) -> None:
+    """Time & measure peak memory of every stage over synthetic ledgers"""
+    results = {}
+    for size in rows:
+        utils.print_status(f"Benchmarking {size} rows")
+        results[str(size)] = run_benchmark(size, seed, skip)
+
+    with open(output, "w") as file:
+        json.dump(
+            {
+                "meta": {
+                    "timestamp": utils.timestamp(),
+                    "seed": seed,
+                    "python": platform.python_version(),
+                    "pandas": pd.__version__,
+                    "strings": "arrow" if arrow.enabled() else "object",
+                    "machine": platform.machine(),
+                },
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    utils.print_status(f"Benchmark results\n{_summary(results)}\nwritten to {output}")
+
+    if baseline and os.path.exists(baseline):
+        with open(baseline) as file:
+            regressions = compare(results, json.load(file)["results"], tolerance)
+        for regression in regressions:
+            utils.print_error(f"Regression {regression}")
+        if not regressions:
+            utils.print_status(f"No regressions against {baseline}")
@@ -1,9 +1,18 @@
+import os
+
 import click
 import pandas as pd
 import pyexcel_ods3 as ods
 
+from utils import aggregates as ag
+from utils import arrow, concurrency
+from utils import dates as dt
 from utils import expense_patterns as ep
+from utils import expenses_store as es
 from utils import file_settings as fs
+from utils import fx, instrument
+from utils import partitions as pt
+from utils import transfers as tr
 from utils import utils
 
 
@@ -14,22 +23,55 @@ def organized_concat_df(credit_df: pd.DataFrame, bank_df: pd.DataFrame) -> pd.Da
     bank_df.rename(columns={"Posting Date": "Date"}, inplace=True)
     bank_df = bank_df.drop(["Details", "Balance"], axis=1)
 
-    order = ["Date", "Type", "Description", "Amount", "Category", "data_source_note"]
+    order = [
+        "Date",
+        "Type",
+        "Description",
+        "Amount",
+        fs.currency_column(),
+        "Category",
+        "data_source_note",
+        "Link",
+    ]
     credit_df = credit_df.reindex(columns=order)
     bank_df = bank_df.reindex(columns=order)
 
     df = pd.concat([credit_df, bank_df], ignore_index=True)
     df[["Amount"]] = df[["Amount"]].fillna(value=0)
-    df[["Category"]] = df[["Category"]].fillna(value="")
+    blank = ["Category", fs.currency_column(), "Link"]
+    df[blank] = df[blank].fillna(value="")
     return df
 
 
+def link_transfers(
+    credit_df: pd.DataFrame, bank_df: pd.DataFrame, window_days: int
+) -> None:
+    """Give the card payments found in both sheets a shared Link id"""
+    bank_df["Link"], credit_df["Link"] = tr.link_ids(bank_df, credit_df, window_days)
+    pairs = (bank_df["Link"] != "").sum()
+    if pairs:
+        utils.print_status(f"{pairs} card payment(s) linked as transfers")
+
+
 def find_and_print_unlabeled_rows(df: pd.DataFrame) -> None:
     unlabeled_rows = df[df["Label"] == ""]["Grouping"].drop_duplicates()
     if not unlabeled_rows.empty:
         utils.print_status(f"\n\nUnlabeled rows found\n{unlabeled_rows}\n\n")
 
 
+def update_aggregates(df_old: pd.DataFrame, df_new: pd.DataFrame) -> None:
+    """Refresh the stored monthly cube, rebuilding only the months whose rows changed"""
+    if os.path.exists(fs.aggregates_file_name()):
+        months = ag.touched_months(df_old, df_new)
+        cube = ag.update_cube(ag.load_cube(), df_new, months, pt.cube())
+        utils.print_status(f"Aggregates updated for {len(months)} month(s)")
+    else:
+        # closed years keep the cube stored when they were archived
+        cube = ag.combine_cubes([pt.cube(), ag.build_cube(df_new)])
+        utils.print_status("Aggregates built")
+    ag.save_cube(cube)
+
+
 def adjust_for_inflation(row) -> None:
     import cpi
 
@@ -40,57 +82,86 @@ def adjust_for_inflation(row) -> None:
         return row["Amount"]
 
 
-@click.command()
-def categorize() -> None:
-    book = ods.get_data(fs.decrypted_file_name())
-
-    credit_df = utils.get_sheet_df(book, fs.activity_page_credit(), fs.credit_dtype())
-    bank_df = utils.get_sheet_df(book, fs.activity_page_bank(), fs.bank_dtype())
+def label_rows(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Group each row by description & category and label it with the expense patterns.
 
-    # raw
-    df_raw = organized_concat_df(credit_df, bank_df)
-    df_raw["Grouping"] = (
-        df_raw["Description"].astype(str) + " " + df_raw["Category"].astype(str)
-    )
+    Patterns are matched once per Merchant, the merchant key of the description & the
+    category, far fewer distinct strings than Groupings. A Merchant matching no pattern
+    falls back to its Grouping.
+    """
+    df_raw = df_raw.copy()
+    text = arrow.string_dtype()
+    category = " " + df_raw["Category"].astype(text)
+    df_raw["Grouping"] = df_raw["Description"].astype(text) + category
+    df_raw["Merchant"] = ep.merchant_keys(df_raw["Description"]).astype(text) + category
     df_raw = df_raw.sort_values(by=["Grouping", "Date"])
-    df_raw["Label"] = df_raw["Grouping"].apply(ep.apply_expense_label)
-    df_raw = df_raw.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-
-    find_and_print_unlabeled_rows(df_raw)
-
-    # adjust for inflation
-    df_raw["Date"] = pd.to_datetime(df_raw["Date"])
-    df_raw["Historical"] = df_raw["Amount"]
-    df_raw["Amount"] = df_raw.apply(adjust_for_inflation, axis=1)
-    df_raw["Date"] = df_raw["Date"].dt.strftime("%Y-%m-%d")
+    df_raw["Label"] = ep.label_merchants(df_raw["Merchant"], df_raw["Grouping"])
+    df_raw["Label"] = df_raw["Label"].astype(text)
+    if "Link" in df_raw:
+        df_raw.loc[df_raw["Link"] != "", "Label"] = tr.transfer_label()
+    return df_raw.apply(lambda x: x.str.strip() if arrow.is_text(x) else x)
+
+
+def inflation_factors(dates: pd.Series) -> pd.Series:
+    """Inflation adjustment of a dollar spent on each date, computed once per date"""
+    codes, distinct = pd.factorize(dates, use_na_sentinel=False)
+    unit = pd.DataFrame({"Amount": 1.0, "Date": distinct})
+    factors = unit.apply(adjust_for_inflation, axis=1).to_numpy(dtype=float)
+    return pd.Series(factors[codes], index=dates.index)
+
+
+def inflate_rows(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert Amount to the base currency & adjust it for inflation, in expenses_raw layout.
+
+    Original keeps the exported amount in its Currency, Historical the base currency
+    amount at the rate of its date (see utils/fx.py).
+    """
+    df_raw = df_raw.copy()
+    df_raw["Date"] = dt.parse(df_raw["Date"])
+    currency = fs.currency_column()
+    codes = fx.currencies(
+        df_raw[currency] if currency in df_raw else pd.Series("", index=df_raw.index)
+    )
+    df_raw["Currency"] = codes
+    df_raw["Original"] = df_raw["Amount"]
+    df_raw["Historical"] = fx.convert(df_raw["Amount"], df_raw["Date"], codes).round(2)
+    # the adjustment scales an amount, so it is found per date rather than per row
+    df_raw["Amount"] = df_raw["Historical"] * inflation_factors(df_raw["Date"])
     df_raw["Amount"] = df_raw["Amount"].round(2)
 
-    # Type	Description	Category	Grouping	Label
-    df_raw = df_raw[
+    # Type	Description	Category	Grouping	Merchant	Label
+    return df_raw[
         [
             "data_source_note",
             "Date",
+            "Currency",
+            "Original",
             "Historical",
             "Amount",
             "Type",
             "Category",
             "Description",
             "Grouping",
+            "Merchant",
             "Label",
+            "Link",
         ]
     ]
 
-    book[fs.expenses_raw_page()] = [df_raw.columns.tolist()] + df_raw.values.tolist()
-    ods.save_data(fs.decrypted_file_name(), book)
 
-    # simplified
-    df_simple = df_raw["Label"].str.split(":", expand=True)
+def simplify_rows(df_raw: pd.DataFrame) -> pd.DataFrame:
+    """Split labels into Primary, Secondary & Terciary and apply the expense Type"""
+    # anything past the third level stays in Terciary
+    df_simple = df_raw["Label"].str.split(":", n=2, expand=True)
+    df_simple = df_simple.reindex(columns=range(3))
     df_simple.columns = ["Primary", "Secondary", "Terciary"]
     df_simple = pd.concat(
         [df_raw[["Date", "data_source_note", "Amount", "Description"]], df_simple],
         axis=1,
     )
-    df_simple = df_simple.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
+    df_simple = df_simple.apply(lambda x: x.str.strip() if arrow.is_text(x) else x)
     df_simple.fillna("", inplace=True)
 
     df_simple = df_simple[
@@ -105,14 +176,72 @@ def categorize() -> None:
         ]
     ]
     ep.apply_type(df_simple)
-    df_simple.sort_values(
+    return sort_expenses(df_simple)
+
+
+def sort_expenses(df_simple: pd.DataFrame) -> pd.DataFrame:
+    """Row order of the expenses sheet"""
+    return df_simple.sort_values(
         ["data_source_note", "Primary", "Secondary", "Terciary", "Description"],
         ascending=[True, True, True, True, True],
-        inplace=True,
     )
 
-    book[fs.expenses_page()] = [df_simple.columns.tolist()] + df_simple.values.tolist()
-    ods.save_data(fs.decrypted_file_name(), book)
+
+@click.command()
+@click.option(
+    "--transfer-window",
+    type=int,
+    default=fs.transfer_window_days(),
+    show_default=True,
+    help="Most days between the bank & credit rows of a card payment.",
+)
+def categorize(transfer_window: int) -> None:
+    with instrument.stage("ods_load"):
+        book = ods.get_data(fs.decrypted_file_name())
+
+    with instrument.stage("sheet_frames") as stage:
+        frames = [
+            concurrency.submit(
+                f"sheet_frame({sheet_name})",
+                utils.get_sheet_df,
+                book,
+                sheet_name,
+                dtypes,
+            )
+            for sheet_name, dtypes in (
+                (fs.activity_page_credit(), fs.credit_dtype()),
+                (fs.activity_page_bank(), fs.bank_dtype()),
+                (fs.expenses_page(), fs.expenses_dtype()),
+            )
+        ]
+        credit_df, bank_df, df_previous = (frame.result() for frame in frames)
+        stage["rows"] = len(credit_df) + len(bank_df) + len(df_previous)
+
+    # raw
+    rows = len(credit_df) + len(bank_df)
+    with instrument.stage("transfers", rows):
+        link_transfers(credit_df, bank_df, transfer_window)
+    with instrument.stage("label", rows):
+        df_raw = label_rows(organized_concat_df(credit_df, bank_df))
+    find_and_print_unlabeled_rows(df_raw)
+    with instrument.stage("inflation", rows):
+        df_raw = inflate_rows(df_raw)
+
+    with instrument.stage("ods_save", rows):
+        book[fs.expenses_raw_page()] = utils.df_to_sheet(df_raw)
+        ods.save_data(fs.decrypted_file_name(), book)
+
+    # simplified
+    with instrument.stage("type", rows):
+        df_simple = simplify_rows(df_raw)
+
+    with instrument.stage("ods_save", rows):
+        book[fs.expenses_page()] = utils.df_to_sheet(df_simple)
+        ods.save_data(fs.decrypted_file_name(), book)
+        es.prime(df_simple)
+
+    with instrument.stage("aggregates", rows):
+        update_aggregates(df_previous, df_simple)
 
     utils.open(fs.decrypted_file_name())
     utils.print_status("Categorization complete")
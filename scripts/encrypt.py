@@ -2,11 +2,8 @@
 
 import base64
 import getpass
-import os
-from typing import Any
 
 import click
-import pyexcel_ods3 as ods
 from cryptography.fernet import Fernet
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes
@@ -37,11 +34,15 @@ def encrypt_file(input_file: str, output_file: str, key: bytes) -> None:
         file.write(encrypted_data)
 
 
-def decrypt_file(input_file: str, output_file: str, key: bytes) -> None:
+def decrypt_bytes(input_file: str, key: bytes) -> bytes:
     cipher_suite = Fernet(key)
     with open(input_file, "rb") as file:
         encrypted_data = file.read()
-    decrypted_data = cipher_suite.decrypt(encrypted_data)
+    return cipher_suite.decrypt(encrypted_data)
+
+
+def decrypt_file(input_file: str, output_file: str, key: bytes) -> None:
+    decrypted_data = decrypt_bytes(input_file, key)
     with open(output_file, "wb") as file:
         file.write(decrypted_data)
 
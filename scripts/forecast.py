@@ -0,0 +1,111 @@
+from typing import Dict
+
+import click
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from scripts import graph as gr
+from utils import aggregates as ag
+from utils import expenses_store as es
+from utils import forecast as fcst
+from utils import instrument, utils
+
+
+def graph_forecast(projection: Dict[str, pd.DataFrame]) -> None:
+    """Fan charts of the projected monthly net flow & balance"""
+    monthly = projection["monthly"]
+    index = pd.to_datetime(monthly.Month, format="%Y-%m") + pd.offsets.MonthEnd(0)
+    for name, title, ylabel in (
+        ("Balance", "Projected savings", "Balance ($)"),
+        ("Net", "Projected net cash flow", "Net ($ / month)"),
+    ):
+        bands = monthly[[f"{name}{percentile}" for percentile in fcst.PERCENTILES]]
+        bands = bands.set_axis(index).rename(
+            columns=lambda column: f"P{column[len(name):]}"
+        )
+        gr.fan_figure(bands, title, ylabel)
+
+
+@click.command()
+@click.option(
+    "--months",
+    type=int,
+    default=60,
+    show_default=True,
+    help="Months to project.",
+)
+@click.option(
+    "--paths",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Simulated paths.",
+)
+@click.option(
+    "--history",
+    type=int,
+    default=36,
+    show_default=True,
+    help="Fit the last this many months, 0 for all.",
+)
+@click.option(
+    "--start",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Savings today, the projected balance starts from.",
+)
+@click.option("--seed", type=int, default=0, show_default=True)
+@click.option(
+    "--report",
+    type=click.Choice(["monthly", "types", "runway"]),
+    default="monthly",
+    show_default=True,
+    help="Percentile bands per month, Type totals per year, or the runway summary.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+    show_default=True,
+)
+@click.option("--output", type=str, default="", help="Write to a file, not stdout.")
+@click.option(
+    "--graph/--no-graph", default=True, help="Show fan charts of the projection."
+)
+def forecast(
+    months: int,
+    paths: int,
+    history: int,
+    start: float,
+    seed: int,
+    report: str,
+    output_format: str,
+    output: str,
+    graph: bool,
+) -> None:
+    """
+    Project savings & cash flow by simulating future months from the history.
+
+    Each Type's monthly amounts, with their seasonality by calendar month, are
+    resampled from the categorized history (see utils/forecast.py), e.g.\n
+    forecast --months 120 --start 25000 --report runway
+    """
+    with instrument.stage("aggregates_load") as stage:
+        cube = ag.load_cube()
+        if cube.empty:
+            cube = ag.build_cube(es.load())
+        stage["rows"] = len(cube)
+
+    matrix = fcst.history(cube, history)
+    if matrix.empty:
+        raise click.ClickException("No categorized expenses to project from")
+
+    with instrument.stage("simulate", paths * months):
+        projection = fcst.project(matrix, months, paths, start, seed)
+
+    utils.write_frame(projection[report], output_format, output)
+    if graph:
+        graph_forecast(projection)
+        plt.show()
@@ -1,6 +1,6 @@
 import os
 import warnings
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import click
 import matplotlib as mpl
@@ -9,9 +9,20 @@ import numpy as np
 import pandas as pd
 import pyexcel_ods3 as ods
 import seaborn as sns
+from matplotlib.figure import Figure
 
+from utils import aggregates as ag
+from utils import amortization as am
+from utils import dates as dt
+from utils import downsample as ds
 from utils import expense_patterns as ep
+from utils import figure_cache as fc
 from utils import file_settings as fs
+from utils import instrument
+from utils import net_worth as nw
+from utils import outliers as ol
+from utils import partitions as pt
+from utils import rolling as rl
 from utils import utils
 
 warnings.filterwarnings(
@@ -24,7 +35,7 @@ FIGSIZE_LARGE = (6, 4)
 FONTSIZE = 9
 
 
-def _palette() -> List[str]:
+def palette() -> List[str]:
     return [
         "#DC143C",  # Crimson Red
         "#0047AB",  # Cobalt Blue
@@ -48,12 +59,32 @@ def _sample(sample: str) -> str:
 def df_base(df_arg: pd.DataFrame) -> pd.DataFrame:
     """Simplify df"""
     df = df_arg[["Date", "Amount", "Primary", "Secondary", "Terciary", "Type"]].copy()
-    df.Date = pd.to_datetime(df.Date)
+    df.Date = dt.parse(df.Date)
     df.sort_values("Date", inplace=True)
 
     return df
 
 
+def monthly_cube(df_expenses_sheet: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """The stored cube, built from the expenses sheet & archives when there is none"""
+    cube = ag.load_cube()
+    if cube.empty and df_expenses_sheet is not None:
+        utils.print_status("No stored aggregates, building from expenses")
+        cube = ag.combine_cubes([pt.cube(), ag.build_cube(df_expenses_sheet)])
+
+    return cube
+
+
+def df_monthly(df_expenses_sheet: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+    """Monthly pre-aggregated df, read from the stored cube rather than grouping every row"""
+    return ag.cube_to_frame(monthly_cube(df_expenses_sheet))
+
+
+def drop_vacation(df: pd.DataFrame) -> pd.DataFrame:
+    """Vacation transfers are not relevant"""
+    return df[~((df.Primary == "Transfers") & (df.Secondary == "Vacation"))]
+
+
 def df_income(df_arg: pd.DataFrame, sample: Optional[str] = None) -> pd.DataFrame:
     """Income only df"""
     df = df_arg[df_arg.Primary == "Income"][["Date", "Amount", "Terciary"]].copy()
@@ -143,87 +174,240 @@ def apply_stand_dev(
     ].copy()
 
 
-def graph_income_expenses_cumsum(
-    df_arg: pd.DataFrame, title_disclaimer: str = ""
-) -> None:
-    """Basic graph of overall ingress & egress"""
-    df = df_arg.copy()
+def df_cumsum_lines(
+    df_arg: pd.DataFrame, max_points: int = 0
+) -> Dict[str, pd.DataFrame]:
+    """
+    Line data of the cumulative sum figure, one point per date as seaborn would draw it.
+
+    With max_points, each line is downsampled to the min & max of each x bucket.
+    """
+    df = df_arg[["Date", "Amount"]].copy()
     df["Sum"] = df.Amount.cumsum()
     df["Category"] = np.where(df.Amount > 0, "Income", "Expense")
 
-    fig, ax = plt.subplots(figsize=FIGSIZE, tight_layout=True)
+    amounts = df.groupby(["Category", "Date"], as_index=False).Amount.mean()
+    sums = df.groupby("Date", as_index=False).Sum.mean()
+
+    if max_points:
+        amounts = pd.concat(
+            [
+                ds.downsample_frame(group, "Date", "Amount", max_points)
+                for _, group in amounts.groupby("Category")
+            ],
+            ignore_index=True,
+        )
+        sums = ds.downsample_frame(sums, "Date", "Sum", max_points)
+
+    return {"amounts": amounts, "sums": sums}
 
-    sns.lineplot(
-        data=df,
-        x="Date",
-        y="Amount",
-        hue="Category",
-        palette={"Income": "black", "Expense": "red"},
-        ax=ax,
-    )
-    sns.lineplot(data=df, x="Date", y="Sum", color="blue", label="Sum", ax=ax)
+
+@instrument.timed
+def graph_income_expenses_cumsum(
+    df_arg: pd.DataFrame,
+    title_disclaimer: str = "",
+    max_points: int = 2000,
+    ci: bool = False,
+) -> None:
+    """
+    Basic graph of overall ingress & egress
+
+    Every transaction is reduced to at most max_points per line (0 to draw all). With ci,
+    raw transactions are plotted so seaborn can estimate the confidence interval.
+    """
+    if ci:
+        df = df_arg.copy()
+        df["Sum"] = df.Amount.cumsum()
+        df["Category"] = np.where(df.Amount > 0, "Income", "Expense")
+        amounts, sums, errorbar = df, df, ("ci", 95)
+    else:
+        lines = df_cumsum_lines(df_arg, max_points)
+        amounts, sums, errorbar = lines["amounts"], lines["sums"], None
 
     title = f"Income, Expenses, and Sum\nIgnoring Vacation Savings.{title_disclaimer}"
-    ax.set_title(title, fontsize=FONTSIZE)
-    ax.set_xlabel("Date", fontsize=FONTSIZE)
-    ax.set_ylabel("Amount ($)", fontsize=FONTSIZE)
-    ax.legend(title="Category", fontsize=FONTSIZE)
-    ax.tick_params(axis="x", rotation=45)
-    ax.grid(True)
+
+    def draw() -> Figure:
+        fig, ax = plt.subplots(figsize=FIGSIZE, tight_layout=True)
+        sns.lineplot(
+            data=amounts,
+            x="Date",
+            y="Amount",
+            hue="Category",
+            palette={"Income": "black", "Expense": "red"},
+            errorbar=errorbar,
+            ax=ax,
+        )
+        sns.lineplot(
+            data=sums,
+            x="Date",
+            y="Sum",
+            color="blue",
+            label="Sum",
+            errorbar=errorbar,
+            ax=ax,
+        )
+        ax.set_title(title, fontsize=FONTSIZE)
+        ax.set_xlabel("Date", fontsize=FONTSIZE)
+        ax.set_ylabel("Amount ($)", fontsize=FONTSIZE)
+        ax.legend(title="Category", fontsize=FONTSIZE)
+        ax.tick_params(axis="x", rotation=45)
+        ax.grid(True)
+        return fig
+
+    key = fc.fingerprint(
+        "cumsum",
+        amounts[["Date", "Amount", "Category"]],
+        sums[["Date", "Sum"]],
+        title,
+        errorbar,
+        FIGSIZE,
+        FONTSIZE,
+    )
+    fc.cached_figure(key, FIGSIZE, draw)
+
+
+def area_figure(
+    pivot: pd.DataFrame,
+    title: str,
+    ylabel: str,
+    legend_title: str,
+    figsize: Tuple[float, float] = FIGSIZE,
+) -> None:
+    """Stacked area figure of a date indexed pivot, re-drawn only when its inputs change"""
+
+    def draw() -> Figure:
+        fig, ax = plt.subplots(figsize=figsize, tight_layout=True)
+        pivot.plot.area(
+            stacked=True,
+            color=palette(),
+            ax=ax,
+        )
+        ax.set_title(title, fontsize=FONTSIZE)
+        ax.set_xlabel("Date", fontsize=FONTSIZE)
+        ax.set_ylabel(ylabel, fontsize=FONTSIZE)
+        ax.legend(title=legend_title, fontsize=FONTSIZE)
+        ax.grid(True)
+        return fig
+
+    key = fc.fingerprint(
+        "area", pivot, title, ylabel, legend_title, figsize, palette(), FONTSIZE
+    )
+    fc.cached_figure(key, figsize, draw)
 
 
+def line_figure(
+    frame: pd.DataFrame,
+    title: str,
+    ylabel: str,
+    legend_title: str,
+    figsize: Tuple[float, float] = FIGSIZE,
+) -> None:
+    """Line per column of a date indexed frame, re-drawn only when its inputs change"""
+
+    def draw() -> Figure:
+        fig, ax = plt.subplots(figsize=figsize, tight_layout=True)
+        frame.plot.line(color=palette(), ax=ax)
+        ax.set_title(title, fontsize=FONTSIZE)
+        ax.set_xlabel("Date", fontsize=FONTSIZE)
+        ax.set_ylabel(ylabel, fontsize=FONTSIZE)
+        ax.legend(title=legend_title, fontsize=FONTSIZE)
+        ax.grid(True)
+        return fig
+
+    key = fc.fingerprint(
+        "line", frame, title, ylabel, legend_title, figsize, palette(), FONTSIZE
+    )
+    fc.cached_figure(key, figsize, draw)
+
+
+def fan_figure(
+    bands: pd.DataFrame,
+    title: str,
+    ylabel: str,
+    figsize: Tuple[float, float] = FIGSIZE,
+) -> None:
+    """
+    Median line with shaded percentile bands, re-drawn only when its inputs change.
+
+    :param bands: date indexed, columns the percentiles in increasing order, the middle
+    one the median & each outer pair one band
+    """
+
+    def draw() -> Figure:
+        fig, ax = plt.subplots(figsize=figsize, tight_layout=True)
+        columns = list(bands.columns)
+        middle = len(columns) // 2
+        for inner, (low, high) in enumerate(zip(columns[:middle], columns[::-1])):
+            ax.fill_between(
+                bands.index,
+                bands[low],
+                bands[high],
+                color=palette()[1],
+                alpha=0.15 * (inner + 1),
+                linewidth=0,
+                label=f"{low} - {high}",
+            )
+        ax.plot(bands.index, bands[columns[middle]], color=palette()[0], label="Median")
+        ax.set_title(title, fontsize=FONTSIZE)
+        ax.set_xlabel("Date", fontsize=FONTSIZE)
+        ax.set_ylabel(ylabel, fontsize=FONTSIZE)
+        ax.legend(title="Percentiles", fontsize=FONTSIZE)
+        ax.grid(True)
+        return fig
+
+    key = fc.fingerprint("fan", bands, title, ylabel, figsize, palette(), FONTSIZE)
+    fc.cached_figure(key, figsize, draw)
+
+
+@instrument.timed
 def graph_income(df_arg: pd.DataFrame, sample: str) -> None:
     """Graph basic ingress by type"""
     df = df_income(df_arg, sample)
     income_pivot = (
-        df.pivot_table(values="Amount", index="Date", columns="Source", fill_value=0)
+        df.pivot_table(
+            values="Amount", index="Date", columns="Source", fill_value=0, aggfunc="sum"
+        )
         .resample(_sample(sample))
         .sum()
     )
 
-    fig, ax = plt.subplots(figsize=FIGSIZE, tight_layout=True)
-    income_pivot.plot.area(
-        stacked=True,
-        color=_palette(),
-        ax=ax,
+    area_figure(
+        income_pivot,
+        f"Income, sample {sample}",
+        "Income",
+        "Income Source",
     )
-    ax.set_title(f"Income, sample {sample}", fontsize=FONTSIZE)
-    ax.set_xlabel("Date", fontsize=FONTSIZE)
-    ax.set_ylabel("Income", fontsize=FONTSIZE)
-    ax.legend(title="Income Source", fontsize=FONTSIZE)
-    ax.grid(True)
 
 
+@instrument.timed
 def graph_expenses(df_arg: pd.DataFrame, sample: str, disclaimer: str = "") -> None:
     """Graph egress by type"""
 
     df_exp = df_expenses(df_arg)
     expenses_pivot = (
-        df_exp.pivot_table(values="Amount", index="Date", columns="Type", fill_value=0)
+        df_exp.pivot_table(
+            values="Amount", index="Date", columns="Type", fill_value=0, aggfunc="sum"
+        )
         .resample(_sample(sample))
         .sum()
     )
 
-    fig, ax = plt.subplots(figsize=FIGSIZE, tight_layout=True)
-    expenses_pivot.plot.area(
-        stacked=True,
-        color=_palette(),
-        ax=ax,
+    area_figure(
+        expenses_pivot,
+        f"Expenses, sample {sample}{disclaimer}",
+        "Expense",
+        "Expense Type",
     )
-    ax.set_title(f"Expenses, sample {sample}{disclaimer}", fontsize=FONTSIZE)
-    ax.set_xlabel("Date", fontsize=FONTSIZE)
-    ax.set_ylabel("Expense", fontsize=FONTSIZE)
-    ax.legend(title="Expense Type", fontsize=FONTSIZE)
-    ax.grid(True)
 
 
+@instrument.timed
 def graph_expense_type_area(
     df_arg: pd.DataFrame, sample: str, disclaimer: str = ""
 ) -> None:
     """Display egress in total percentages"""
     df = df_expenses(df_arg)
     expenses_pivot = df.pivot_table(
-        values="Amount", index="Date", columns="Type", fill_value=0
+        values="Amount", index="Date", columns="Type", fill_value=0, aggfunc="sum"
     )
     smoothed_expenses = expenses_pivot.resample(_sample(sample)).sum()
 
@@ -232,19 +416,15 @@ def graph_expense_type_area(
         smoothed_expenses.sum(axis=1), axis=0
     )
 
-    fig, ax = plt.subplots(figsize=FIGSIZE, tight_layout=True)
-    percentage_expenses.plot.area(
-        stacked=True,
-        color=_palette(),
-        ax=ax,
+    area_figure(
+        percentage_expenses,
+        f"Expense Percentages, sample {sample}{disclaimer}",
+        "Percentage of Expenses",
+        "Expense Type",
     )
-    ax.set_title(f"Expense Percentages, sample {sample}{disclaimer}", fontsize=FONTSIZE)
-    ax.set_xlabel("Date", fontsize=FONTSIZE)
-    ax.set_ylabel("Percentage of Expenses", fontsize=FONTSIZE)
-    ax.legend(title="Expense Type", fontsize=FONTSIZE)
-    ax.grid(True)
 
 
+@instrument.timed
 def graph_expense_type_area_perc_of_income(
     df_arg: pd.DataFrame, sample: str, disclaimer: str = ""
 ) -> None:
@@ -253,7 +433,9 @@ def graph_expense_type_area_perc_of_income(
     df_exp = df_expenses(df_arg)
 
     expenses_pivot = (
-        df_exp.pivot_table(values="Amount", index="Date", columns="Type", fill_value=0)
+        df_exp.pivot_table(
+            values="Amount", index="Date", columns="Type", fill_value=0, aggfunc="sum"
+        )
         .resample(_sample(sample))
         .sum()
     )
@@ -264,21 +446,15 @@ def graph_expense_type_area_perc_of_income(
     # as percentage
     percentage_expenses = expenses_pivot.div(df_inc.Amount, axis=0) * 100
 
-    fig, ax = plt.subplots(figsize=FIGSIZE, tight_layout=True)
-    percentage_expenses.plot.area(
-        stacked=True,
-        color=_palette(),
-        ax=ax,
-    )
-    ax.set_title(
-        f"Expense as perc of income, sample {sample}{disclaimer}", fontsize=FONTSIZE
+    area_figure(
+        percentage_expenses,
+        f"Expense as perc of income, sample {sample}{disclaimer}",
+        "Percentage of Expenses",
+        "Expense Type",
     )
-    ax.set_xlabel("Date", fontsize=FONTSIZE)
-    ax.set_ylabel("Percentage of Expenses", fontsize=FONTSIZE)
-    ax.legend(title="Expense Type", fontsize=FONTSIZE)
-    ax.grid(True)
 
 
+@instrument.timed
 def graph_lifestyle_type_area(
     df_arg: pd.DataFrame, sample: str, disclaimer: str = ""
 ) -> None:
@@ -286,7 +462,7 @@ def graph_lifestyle_type_area(
     df = df_lifestyle(df_arg)
 
     expenses_pivot = df.pivot_table(
-        values="Amount", index="Date", columns="Primary", fill_value=0
+        values="Amount", index="Date", columns="Primary", fill_value=0, aggfunc="sum"
     )
     smoothed_expenses = expenses_pivot.resample(_sample(sample)).sum()
 
@@ -295,69 +471,266 @@ def graph_lifestyle_type_area(
         smoothed_expenses.sum(axis=1), axis=0
     )
 
-    fig, ax = plt.subplots(figsize=FIGSIZE_LARGE, tight_layout=True)
-    percentage_expenses.plot.area(
-        stacked=True,
-        color=_palette(),
-        ax=ax,
+    area_figure(
+        percentage_expenses,
+        f"Lifestyle Percentages, sample {sample}{disclaimer}",
+        "Percentage of Expenses",
+        "Expense Type",
+        FIGSIZE_LARGE,
     )
-    ax.set_title(
-        f"Lifestyle Percentages, sample {sample}{disclaimer}", fontsize=FONTSIZE
+
+
+@instrument.timed
+def graph_property(df_assets: pd.DataFrame, horizon_months: int = 0) -> None:
+    """Equity, loan balance & net cash flow of every financed asset"""
+    df_loans = am.loans(df_assets) if not df_assets.empty else pd.DataFrame()
+    if df_loans.empty:
+        utils.print_status("No loans found in the asset sheet")
+        return
+
+    frames = am.schedules(df_loans, horizon_months)
+    area_figure(frames["equity"], "Property equity", "Equity ($)", "Asset")
+    line_figure(frames["balance"], "Loan balance", "Balance ($)", "Asset")
+    line_figure(
+        frames["net_cash_flow"],
+        "Property net cash flow, monthly\nRecurring income less expenses, payment & PMI",
+        "Amount ($)",
+        "Asset",
     )
-    ax.set_xlabel("Date", fontsize=FONTSIZE)
-    ax.set_ylabel("Percentage of Expenses", fontsize=FONTSIZE)
-    ax.legend(title="Expense Type", fontsize=FONTSIZE)
-    ax.grid(True)
 
 
-@click.command()
-@click.argument("variant", type=str, default="all")
-def graph(variant: str) -> None:
-    """
-    Graph may be of the following variants
+@instrument.timed
+def graph_net_worth(df_assets: pd.DataFrame, df_raw: pd.DataFrame) -> None:
+    """Equity of every asset & cash, and the net worth of each owner, month by month"""
+    df = nw.timeline(df_assets, nw.nominal_flow(df_raw))
+    if df.empty:
+        utils.print_status("No assets or expenses for the net worth figures")
+        return
+
+    # lines rather than stacked areas, as equity & cash may change sign
+    equity = df.pivot(index="Month", columns="Asset", values="Equity")
+    equity["Total"] = equity.sum(axis=1)
+    line_figure(equity, "Net worth by asset", "Equity ($)", "Asset")
+    line_figure(
+        nw.by_owner(df, nw.shares(df_assets)),
+        "Net worth by owner\nAsset equity by ownership share, cash split equally",
+        "Net worth ($)",
+        "Owner",
+    )
 
-    - all\n
-    - household\n
-    - property\n
-    """
-    utils.print_status("Begin graph")
-    book = ods.get_data(fs.decrypted_file_name())
 
-    if variant in ("all", "household"):
-        df_expenses = utils.get_sheet_df(book, fs.expenses_page(), fs.credit_dtype())
-        df = df_base(df_expenses)
+def df_rolling(cube: pd.DataFrame, by: str, statistic: str) -> pd.DataFrame:
+    """One rolling statistic of the expenses, date indexed with a column per category"""
+    cube = drop_vacation(cube[~cube.Type.isin(["Income", "Transfers"])])
+    df = rl.rolling_stats(cube, by)
+    pivot = df.pivot(index="Month", columns="Category", values=statistic)
+    pivot.index = pd.to_datetime(pivot.index, format="%Y-%m") + pd.offsets.MonthEnd(0)
+    return pivot.dropna(how="all")
+
+
+@instrument.timed
+def graph_rolling(cube: pd.DataFrame, top: int = 8) -> None:
+    """Trailing averages & year over year change of the expenses by Type & Primary"""
+    if cube.empty:
+        utils.print_status("No aggregates for the rolling figures")
+        return
+
+    for window in (3, 12):
+        line_figure(
+            df_rolling(cube, "Type", f"Mean{window}").abs(),
+            f"Expenses, trailing {window} month average",
+            "Expense ($ / month)",
+            "Expense Type",
+        )
 
-        # Vacation transfers are not relevant
-        df = df[~((df.Primary == "Transfers") & (df.Secondary == "Vacation"))]
+    # the largest Primary categories, by their latest trailing 12 month average
+    primary = df_rolling(cube, "Primary", "Mean12").abs()
+    if not primary.empty:
+        largest = primary.iloc[-1].sort_values(ascending=False).index[:top]
+        line_figure(
+            primary[largest],
+            "Largest expenses, trailing 12 month average",
+            "Expense ($ / month)",
+            "Primary",
+            FIGSIZE_LARGE,
+        )
 
-        df_std_5 = apply_stand_dev(df, 5)
+    line_figure(
+        df_rolling(cube, "Type", "YoYPct"),
+        "Expenses, trailing 12 months year over year",
+        "Change (%)",
+        "Expense Type",
+    )
 
-        graph_income_expenses_cumsum(df)
-        graph_income_expenses_cumsum(df_std_5, "\nControl for 5 standar deviations")
 
-        graph_income(df, "month")
-        graph_income(df, "year")
+def draw_figures(
+    book: Dict[str, list],
+    variant: str = "all",
+    max_points: int = 2000,
+    ci: bool = False,
+    df_sheet: Optional[pd.DataFrame] = None,
+    outliers: str = "std",
+    outlier_by: str = "Type",
+    outlier_window: int = 0,
+) -> None:
+    """
+    Draw the figures of a graph variant from a loaded workbook, without showing them.
 
-        graph_expenses(df, "month")
-        graph_expenses(df, "year")
-        graph_expenses(df_std_5, "year", "\nControl for 5 standard deviation")
+    df_sheet, when given, is used in place of the workbook's expenses sheet. The
+    outlier controlled figures drop rows beyond 5 global standard deviations ("std"),
+    or beyond the robust bounds of their outlier_by category ("robust", see
+    utils/outliers.py), of the trailing outlier_window months when given.
+    """
+    if variant in ("all", "household", "summary"):
+        df_controlled, controlled = None, ""
+        if variant != "summary":
+            with instrument.stage("sheet_frame") as stage:
+                if df_sheet is None:
+                    df_sheet = utils.get_sheet_df(
+                        book, fs.expenses_page(), fs.expenses_dtype()
+                    )
+                # the transaction level figures span the archived years too
+                df = drop_vacation(df_base(pt.with_archived_expenses(df_sheet)))
+                stage["rows"] = len(df)
+            if outliers == "robust":
+                with instrument.stage("outliers", len(df)):
+                    df_controlled = ol.control(
+                        df, outlier_by, window_months=outlier_window
+                    )
+                controlled = f"\nControl for outliers per {outlier_by}"
+                cumsum_controlled = controlled
+            else:
+                with instrument.stage("std_dev", len(df)):
+                    df_controlled = apply_stand_dev(df, 5)
+                controlled = "\nControl for 5 standard deviation"
+                cumsum_controlled = "\nControl for 5 standar deviations"
+
+            graph_income_expenses_cumsum(df, "", max_points, ci)
+            graph_income_expenses_cumsum(
+                df_controlled, cumsum_controlled, max_points, ci
+            )
+
+        # Monthly & yearly figures only need the monthly cube
+        with instrument.stage("aggregates_load") as stage:
+            df_month = drop_vacation(df_monthly(df_sheet))
+            stage["rows"] = len(df_month)
+
+        graph_income(df_month, "month")
+        graph_income(df_month, "year")
+
+        graph_expenses(df_month, "month")
+        graph_expenses(df_month, "year")
+        if df_controlled is not None:
+            graph_expenses(df_controlled, "year", controlled)
+
+        graph_expense_type_area(df_month, "month")
+        graph_expense_type_area(df_month, "year")
+        if df_controlled is not None:
+            graph_expense_type_area(df_controlled, "year", controlled)
+
+        graph_expense_type_area_perc_of_income(df_month, "month")
+        graph_expense_type_area_perc_of_income(df_month, "year")
+
+        graph_lifestyle_type_area(df_month, "month")
+        graph_lifestyle_type_area(df_month, "year")
+        if df_controlled is not None:
+            graph_lifestyle_type_area(df_controlled, "year", controlled)
+
+    if variant in ("all", "rolling"):
+        with instrument.stage("aggregates_load") as stage:
+            cube = monthly_cube(df_sheet)
+            stage["rows"] = len(cube)
+        graph_rolling(cube)
+
+    if variant in ("all", "property"):
+        graph_property(utils.get_sheet_df(book, fs.asset_page(), fs.asset_dtype()))
+
+    if variant in ("all", "networth"):
+        # nominal amounts, as the valuations & loans are, so not the (adjusted) cube
+        with instrument.stage("sheet_frame") as stage:
+            df_raw = pt.with_archived_raw(
+                utils.get_sheet_df(
+                    book, fs.expenses_raw_page(), fs.expenses_raw_dtype()
+                )
+            )
+            stage["rows"] = len(df_raw)
+        graph_net_worth(
+            utils.get_sheet_df(book, fs.asset_page(), fs.asset_dtype()), df_raw
+        )
 
-        graph_expense_type_area(df, "month")
-        graph_expense_type_area(df, "year")
-        graph_expense_type_area(df_std_5, "year", "\nControl for 5 standard deviation")
 
-        graph_expense_type_area_perc_of_income(df, "month")
-        graph_expense_type_area_perc_of_income(df, "year")
+@click.command()
+@click.argument("variant", type=str, default="all")
+@click.option(
+    "--max-points",
+    type=int,
+    default=2000,
+    show_default=True,
+    help="Points per line of the transaction level figures, 0 for all.",
+)
+@click.option(
+    "--ci/--no-ci",
+    default=False,
+    help="Estimate confidence intervals on the transaction level figures (slow).",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse stored renders of figures whose data & parameters are unchanged.",
+)
+@click.option(
+    "--outliers",
+    type=click.Choice(["std", "robust"]),
+    default="std",
+    show_default=True,
+    help="Outlier control of the controlled figures: 5 global standard deviations, "
+    "or robust bounds per category.",
+)
+@click.option(
+    "--outlier-by",
+    type=click.Choice(["Type", "Primary"]),
+    default="Type",
+    show_default=True,
+    help="Category the robust bounds are computed for.",
+)
+@click.option(
+    "--outlier-window",
+    type=int,
+    default=0,
+    show_default=True,
+    help="Robust bounds of the trailing months of each row, 0 for all history.",
+)
+def graph(
+    variant: str,
+    max_points: int,
+    ci: bool,
+    cache: bool,
+    outliers: str,
+    outlier_by: str,
+    outlier_window: int,
+) -> None:
+    """
+    Graph may be of the following variants
 
-        graph_lifestyle_type_area(df, "month")
-        graph_lifestyle_type_area(df, "year")
-        graph_lifestyle_type_area(
-            df_std_5, "year", "\nControl for 5 standard deviation"
-        )
+    - all\n
+    - household\n
+    - summary (monthly & yearly figures from the stored aggregates only)\n
+    - rolling (trailing 3 & 12 month averages & year over year, from the aggregates)\n
+    - property\n
+    - networth (equity per asset & owner, cash from the nominal expenses_raw amounts)\n
+    """
+    utils.print_status("Begin graph")
+    fc.set_enabled(cache)
 
-    elif variant in ("property"):
-        raise Exception("Not implemented")
+    # the summary & rolling figures are drawn from the stored aggregates alone
+    book = {}
+    if variant not in ("summary", "rolling"):
+        with instrument.stage("ods_load"):
+            book = ods.get_data(fs.decrypted_file_name())
 
+    draw_figures(
+        book, variant, max_points, ci, None, outliers, outlier_by, outlier_window
+    )
     plt.show()
 
     utils.print_status("Graphing complete complete")
@@ -1,14 +1,41 @@
 import os
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import click
 import pandas as pd
 import pyexcel_ods3 as ods
 
+from utils import arrow, concurrency
+from utils import dates as dt
 from utils import file_settings as fs
+from utils import instrument
+from utils import partitions as pt
 from utils import utils
 
 
+def _read_export(
+    csv_file: str, columns: List[str], dtype_mapping: Dict[str, Any]
+) -> pd.DataFrame:
+    """
+    The columns of a bank or credit export, with the optional Currency column.
+
+    Exports without Currency get it blank, amounts in the base currency.
+    """
+    currency = fs.currency_column()
+    header = pd.read_csv(csv_file, nrows=0).columns
+    df = pd.read_csv(
+        csv_file,
+        usecols=columns + [currency] if currency in header else columns,
+        dtype={**dtype_mapping, currency: "str"},
+        header=0,
+        index_col=False,
+        **arrow.csv_options(),
+    )
+    if currency not in df.columns:
+        df[currency] = ""
+    return df
+
+
 def _get_csv_df_bank(csv_file: str) -> pd.DataFrame:
     columns_to_import = [
         "Details",
@@ -18,18 +45,12 @@ def _get_csv_df_bank(csv_file: str) -> pd.DataFrame:
         "Type",
         "Balance",
     ]
-    dtype_mapping = fs.bank_dtype()
-    df = pd.read_csv(
-        csv_file,
-        usecols=columns_to_import,
-        dtype=dtype_mapping,
-        header=0,
-        index_col=False,
-    )
+    df = _read_export(csv_file, columns_to_import, fs.bank_dtype())
     df[["Amount"]] = df[["Amount"]].fillna(value=0)
-    na_str_cols = ["Details", "Posting Date", "Description", "Type", "Balance"]
+    na_str_cols = ["Details", "Description", "Type", "Balance", fs.currency_column()]
     df[na_str_cols] = df[na_str_cols].fillna(value="")
-    return df
+    df = dt.typed(df, fs.sheet_date_columns()[fs.activity_page_bank()])
+    return arrow.strings(df, na_str_cols)
 
 
 def _get_csv_df_credit(csv_file: str) -> pd.DataFrame:
@@ -42,25 +63,64 @@ def _get_csv_df_credit(csv_file: str) -> pd.DataFrame:
         "Amount",
         "Memo",
     ]
-    dtype_mapping = fs.credit_dtype()
-    df = pd.read_csv(
-        csv_file,
-        usecols=columns_to_import,
-        dtype=dtype_mapping,
-        header=0,
-        index_col=False,
-    )
+    df = _read_export(csv_file, columns_to_import, fs.credit_dtype())
     df[["Amount"]] = df[["Amount"]].fillna(value=0)
-    na_str_cols = [
-        "Transaction Date",
-        "Post Date",
-        "Description",
-        "Category",
-        "Type",
-        "Memo",
-    ]
+    na_str_cols = ["Description", "Category", "Type", "Memo", fs.currency_column()]
     df[na_str_cols] = df[na_str_cols].fillna(value="")
-    return df
+    df = dt.typed(df, fs.sheet_date_columns()[fs.activity_page_credit()])
+    return arrow.strings(df, na_str_cols)
+
+
+def activity_sheet(data_type: str) -> Tuple[str, Dict[str, Any]]:
+    """Sheet name & dtypes of "bank" or "credit" activity"""
+    return {
+        "bank": (fs.activity_page_bank(), fs.bank_dtype()),
+        "credit": (fs.activity_page_credit(), fs.credit_dtype()),
+    }[data_type]
+
+
+def read_activity_csv(csv_file: str, data_type: str) -> pd.DataFrame:
+    if data_type == "bank":
+        return _get_csv_df_bank(csv_file)
+    return _get_csv_df_credit(csv_file)
+
+
+def drop_archived(
+    df: pd.DataFrame, data_type: str, data_source_note: str
+) -> pd.DataFrame:
+    """Rows of df not already in the archive, reading only the closed years df spans"""
+    closed = set(pt.closed_years())
+    if not closed or df.empty:
+        return df
+
+    sheet_name = activity_sheet(data_type)[0]
+    spanned = set(pt.row_years(df, sheet_name).dropna().astype(int)) & closed
+    if not spanned:
+        return df
+
+    archived = pt.read_sheet(sheet_name, spanned)
+    if archived.empty:
+        return df
+    noted = df.assign(data_source_note=data_source_note)
+    # years archived before the Currency column have it blank
+    archived = archived.reindex(columns=noted.columns, fill_value="")
+    known = set(archived.itertuples(index=False, name=None))
+    new = [row not in known for row in noted.itertuples(index=False, name=None)]
+    return df[new]
+
+
+def merge_activity(
+    sheet_df: pd.DataFrame, df: pd.DataFrame, data_source_note: str
+) -> pd.DataFrame:
+    """Add newly exported activity to the sheet's, ignoring duplicate entries"""
+    df = df.copy()
+    df["data_source_note"] = data_source_note
+    df = arrow.strings(df, ["data_source_note"])
+    combined = pd.concat([df, sheet_df])
+    if fs.currency_column() in combined:
+        # sheets imported before the Currency column have it blank
+        combined[fs.currency_column()] = combined[fs.currency_column()].fillna("")
+    return combined.drop_duplicates().reset_index(drop=True)
 
 
 @click.command()
@@ -75,25 +135,25 @@ def import_activity(csv_file: str, data_type: str, data_source_note: str) -> Non
     :param data_type: "credit" or "bank" (column names differ)
     :param data_source_note: A user-specified data source for the supplied data.
     """
-    book = ods.get_data(fs.decrypted_file_name())
+    # the export is parsed while the workbook loads
+    parsed = concurrency.submit("csv_parse", read_activity_csv, csv_file, data_type)
+    loaded = concurrency.submit("ods_load", ods.get_data, fs.decrypted_file_name())
 
-    sheet_name, dtypes = {
-        "bank": (fs.activity_page_bank(), fs.bank_dtype()),
-        "credit": (fs.activity_page_credit(), fs.credit_dtype()),
-    }[data_type]
-
-    sheet_df = utils.get_sheet_df(book, sheet_name, dtypes)
+    sheet_name, dtypes = activity_sheet(data_type)
+    book = loaded.result()
+    with instrument.stage("sheet_frame") as stage:
+        sheet_df = utils.get_sheet_df(book, sheet_name, dtypes)
+        stage["rows"] = len(sheet_df)
+    df = parsed.result()
 
-    if data_type == "bank":
-        df = _get_csv_df_bank(csv_file)
-    else:
-        df = _get_csv_df_credit(csv_file)
-
-    df["data_source_note"] = data_source_note
-    combined_df = pd.concat([df, sheet_df]).drop_duplicates().reset_index(drop=True)
+    with instrument.stage("dedup") as stage:
+        df = drop_archived(df, data_type, data_source_note)
+        combined_df = merge_activity(sheet_df, df, data_source_note)
+        stage["rows"] = len(combined_df)
 
-    book[sheet_name] = [combined_df.columns.tolist()] + combined_df.values.tolist()
-    ods.save_data(fs.decrypted_file_name(), book)
+    with instrument.stage("ods_save", len(combined_df)):
+        book[sheet_name] = utils.df_to_sheet(combined_df)
+        ods.save_data(fs.decrypted_file_name(), book)
 
     utils.open(fs.decrypted_file_name())
     utils.print_status(
@@ -0,0 +1,213 @@
+import getpass
+import io
+import pathlib
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+import click
+import matplotlib.pyplot as plt
+import pandas as pd
+import pyexcel_ods3 as ods
+
+from scripts import categorize as ct
+from scripts import graph as gr
+from scripts import import_activity as ia
+from utils import concurrency
+from utils import expenses_store as es
+from utils import figure_cache as fc
+from utils import file_settings as fs
+from utils import instrument, utils
+
+
+def parse_statements(
+    statements: Dict[str, List[Tuple[str, str]]],
+) -> Dict[str, Future]:
+    """Start parsing every statement file in the background, by file"""
+    return {
+        csv_file: concurrency.submit(
+            "csv_parse", ia.read_activity_csv, csv_file, data_type
+        )
+        for data_type, files in statements.items()
+        for csv_file, _ in files
+    }
+
+
+def import_statements(
+    book: Dict[str, list],
+    statements: Dict[str, List[Tuple[str, str]]],
+    parsed: Optional[Dict[str, Future]] = None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Merge each (csv_file, data_source_note) into its activity sheet, in memory.
+
+    :param statements: "bank" & "credit" statement files with their data source notes
+    :param parsed: parse_statements of the statements, when already started
+    :return: the merged activity of each data type, also set on the book
+    """
+    parsed = parsed or parse_statements(statements)
+    activity = {}
+    for data_type in ("bank", "credit"):
+        sheet_name, dtypes = ia.activity_sheet(data_type)
+        with instrument.stage(f"sheet_frame({data_type})") as stage:
+            sheet_df = utils.get_sheet_df(book, sheet_name, dtypes)
+            stage["rows"] = len(sheet_df)
+
+        for csv_file, data_source_note in statements.get(data_type, []):
+            df = parsed[csv_file].result()
+            with instrument.stage("dedup") as stage:
+                df = ia.drop_archived(df, data_type, data_source_note)
+                sheet_df = ia.merge_activity(sheet_df, df, data_source_note)
+                stage["rows"] = len(sheet_df)
+            utils.print_status(f"Data from {csv_file} merged, ignoring duplicates")
+
+        book[sheet_name] = utils.df_to_sheet(sheet_df)
+        activity[data_type] = sheet_df
+
+    return activity
+
+
+def categorize_activity(
+    book: Dict[str, list],
+    activity: Dict[str, pd.DataFrame],
+    transfer_window: int = fs.transfer_window_days(),
+) -> pd.DataFrame:
+    """Label, inflate & type the activity into the book, returning the expenses frame"""
+    credit_df, bank_df = activity["credit"].copy(), activity["bank"].copy()
+    rows = len(credit_df) + len(bank_df)
+    with instrument.stage("transfers", rows):
+        ct.link_transfers(credit_df, bank_df, transfer_window)
+    with instrument.stage("label", rows):
+        df_raw = ct.label_rows(ct.organized_concat_df(credit_df, bank_df))
+    ct.find_and_print_unlabeled_rows(df_raw)
+    with instrument.stage("inflation", rows):
+        df_raw = ct.inflate_rows(df_raw)
+    with instrument.stage("type", rows):
+        df_simple = ct.simplify_rows(df_raw)
+
+    book[fs.expenses_raw_page()] = utils.df_to_sheet(df_raw)
+    book[fs.expenses_page()] = utils.df_to_sheet(df_simple)
+    return df_simple
+
+
+def decrypted_book() -> Dict[str, list]:
+    """
+    Decrypt finance_encrypted.ods to finance.ods, parsing the decrypted bytes in memory.
+
+    Writing finance.ods overlaps the parse instead of preceding a re-read of the file.
+    """
+    # imported here, only this option needs the cipher
+    from scripts import encrypt as enc
+
+    password = getpass.getpass(prompt="Enter password: ")
+    content = concurrency.submit(
+        "decrypt",
+        lambda: enc.decrypt_bytes(fs.encrypted_file_name(), enc.derive_key(password)),
+    ).result()
+
+    written = concurrency.submit(
+        "ods_write", pathlib.Path(fs.decrypted_file_name()).write_bytes, content
+    )
+    with instrument.stage("ods_load"):
+        book = ods.get_data(io.BytesIO(content), file_type="ods")
+    written.result()
+    return book
+
+
+@click.command()
+@click.option(
+    "--bank",
+    type=(str, str),
+    multiple=True,
+    metavar="CSV_FILE NOTE",
+    help="Bank export & its data source note, may be repeated.",
+)
+@click.option(
+    "--credit",
+    type=(str, str),
+    multiple=True,
+    metavar="CSV_FILE NOTE",
+    help="Credit card export & its data source note, may be repeated.",
+)
+@click.option(
+    "--transfer-window",
+    type=int,
+    default=fs.transfer_window_days(),
+    show_default=True,
+    help="Most days between the bank & credit rows of a card payment.",
+)
+@click.option(
+    "--decrypt",
+    is_flag=True,
+    help="Decrypt finance_encrypted.ods first, while the statements are parsed.",
+)
+@click.option(
+    "--graph/--no-graph",
+    "draw",
+    default=True,
+    help="Graph the categorized expenses once saved.",
+)
+@click.option(
+    "--open",
+    "open_book",
+    is_flag=True,
+    help="Open the workbook in LibreOffice once saved.",
+)
+@click.option(
+    "--max-points",
+    type=int,
+    default=2000,
+    show_default=True,
+    help="Points per line of the transaction level figures, 0 for all.",
+)
+@click.option(
+    "--cache/--no-cache",
+    default=True,
+    help="Reuse stored renders of figures whose data & parameters are unchanged.",
+)
+def pipeline(
+    bank: Tuple[Tuple[str, str], ...],
+    credit: Tuple[Tuple[str, str], ...],
+    transfer_window: int,
+    decrypt: bool,
+    draw: bool,
+    open_book: bool,
+    max_points: int,
+    cache: bool,
+) -> None:
+    """
+    Import, categorize & graph in one process, saving finance.ods once.
+
+    Equivalent to import-activity for each statement, then categorize & graph.
+    """
+    # statements parse while the workbook is decrypted & loaded
+    statements = {"bank": list(bank), "credit": list(credit)}
+    parsed = parse_statements(statements)
+    if decrypt:
+        book = decrypted_book()
+    else:
+        with instrument.stage("ods_load"):
+            book = ods.get_data(fs.decrypted_file_name())
+    df_previous = utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+
+    activity = import_statements(book, statements, parsed)
+    df_simple = categorize_activity(book, activity, transfer_window)
+
+    with instrument.stage("ods_save", len(df_simple)):
+        ods.save_data(fs.decrypted_file_name(), book)
+        es.prime(df_simple)
+    utils.print_status(
+        f"Activity imported & categorized into {fs.decrypted_file_name()}"
+    )
+
+    with instrument.stage("aggregates", len(df_simple)):
+        ct.update_aggregates(df_previous, df_simple)
+
+    if open_book:
+        utils.open(fs.decrypted_file_name())
+
+    if draw:
+        fc.set_enabled(cache)
+        gr.draw_figures(book, "all", max_points, df_sheet=df_simple)
+        plt.show()
+
+    utils.print_status("Pipeline complete")
@@ -0,0 +1,188 @@
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import click
+import numpy as np
+import pandas as pd
+
+from utils import expenses_store as es
+from utils import instrument, utils
+
+PERIODS = {"month": "M", "year": "Y"}
+
+COLUMNS = [
+    "Date",
+    "Amount",
+    "Description",
+    "Primary",
+    "Secondary",
+    "Terciary",
+    "Type",
+    "data_source_note",
+]
+
+
+def date_bounds(start: str = "", end: str = "") -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """Inclusive bounds from partial dates, e.g. ("2023", "2023") covers all of 2023"""
+    lower = pd.Period(start).start_time if start else pd.Timestamp.min
+    upper = pd.Period(end).end_time if end else pd.Timestamp.max
+    return lower, upper
+
+
+def _category_mask(series: pd.Series, matches: np.ndarray) -> pd.Series:
+    """Rows of a categorical series whose category is marked in matches"""
+    return series.cat.codes.isin(np.flatnonzero(matches))
+
+
+def _labels_mask(series: pd.Series, values: Iterable[str]) -> pd.Series:
+    values = {value.strip().lower() for value in values}
+    categories = series.cat.categories.str.lower()
+    return _category_mask(series, np.asarray(categories.isin(values)))
+
+
+def filter_expenses(
+    df: pd.DataFrame,
+    start: str = "",
+    end: str = "",
+    primary: Iterable[str] = (),
+    secondary: Iterable[str] = (),
+    terciary: Iterable[str] = (),
+    types: Iterable[str] = (),
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+    description: str = "",
+) -> pd.DataFrame:
+    """
+    Expenses matching every given filter, labels compare case-insensitively.
+
+    :param min_amount: minimum absolute amount, e.g. 200 for charges over $200
+    :param description: regex searched (case-insensitively) in the description
+    """
+    mask = pd.Series(True, index=df.index)
+
+    if start or end:
+        lower, upper = date_bounds(start, end)
+        mask &= (df.Date >= lower) & (df.Date <= upper)
+
+    for column, values in (
+        ("Primary", primary),
+        ("Secondary", secondary),
+        ("Terciary", terciary),
+        ("Type", types),
+    ):
+        if values:
+            mask &= _labels_mask(df[column], values)
+
+    cents = df.Cents.abs()
+    if min_amount is not None:
+        mask &= cents >= round(min_amount * 100)
+    if max_amount is not None:
+        mask &= cents <= round(max_amount * 100)
+
+    if description:
+        # searched last, once per distinct description of the rows still matching
+        codes = np.unique(df.Description.cat.codes[mask])
+        candidates = df.Description.cat.categories[codes]
+        found = candidates.str.contains(description, flags=re.IGNORECASE, regex=True)
+        mask &= df.Description.cat.codes.isin(codes[np.asarray(found, dtype=bool)])
+
+    return df[mask]
+
+
+def group_expenses(df: pd.DataFrame, by: Iterable[str]) -> pd.DataFrame:
+    """Summed Amount & Count per group, by columns or "month" / "year" of the date"""
+    keys: List[pd.Series] = []
+    for key in by:
+        if key in PERIODS:
+            keys.append(df.Date.dt.to_period(PERIODS[key]).astype(str).rename(key))
+        else:
+            keys.append(df[key])
+
+    grouped = df.groupby(keys, observed=True).Cents.agg(["sum", "size"])
+    grouped = grouped.rename(columns={"sum": "Amount", "size": "Count"})
+    grouped["Amount"] = grouped.Amount / 100
+    return grouped.reset_index()
+
+
+def _rows(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[COLUMNS].sort_values("Date").copy()
+    df["Date"] = df.Date.dt.strftime("%Y-%m-%d")
+    for column in COLUMNS[2:]:
+        df[column] = df[column].astype(str)
+    return df.reset_index(drop=True)
+
+
+@click.command()
+@click.option("--start", type=str, default="", help="First date, e.g. 2023 or 2023-05.")
+@click.option("--end", type=str, default="", help="Last date (inclusive).")
+@click.option("--primary", type=str, multiple=True, help="Primary label, repeatable.")
+@click.option("--secondary", type=str, multiple=True, help="Secondary label.")
+@click.option("--terciary", type=str, multiple=True, help="Terciary label.")
+@click.option("--type", "types", type=str, multiple=True, help="Expense Type.")
+@click.option("--min-amount", type=float, help="Minimum absolute amount.")
+@click.option("--max-amount", type=float, help="Maximum absolute amount.")
+@click.option("--description", type=str, default="", help="Description regex.")
+@click.option(
+    "--by",
+    type=str,
+    multiple=True,
+    help="Group by month, year, Primary, Secondary, Terciary, Type or data_source_note.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+    show_default=True,
+)
+@click.option("--output", type=str, default="", help="Write to a file, not stdout.")
+def query(
+    start: str,
+    end: str,
+    primary: Tuple[str, ...],
+    secondary: Tuple[str, ...],
+    terciary: Tuple[str, ...],
+    types: Tuple[str, ...],
+    min_amount: Optional[float],
+    max_amount: Optional[float],
+    description: str,
+    by: Tuple[str, ...],
+    output_format: str,
+    output: str,
+) -> None:
+    """
+    Filter, group & sum the categorized expenses without opening LibreOffice.
+
+    e.g. query --primary Fuel --start 2023 --end 2023 --by month\n
+    e.g. query --description amazon --min-amount 200
+    """
+    allowed = set(PERIODS) | set(es.CATEGORIES)
+    unknown = [key for key in by if key not in allowed]
+    if unknown:
+        raise click.BadParameter(
+            f"can not group by {', '.join(unknown)}", param_hint="--by"
+        )
+
+    with instrument.stage("expenses_load") as stage:
+        df = es.load()
+        stage["rows"] = len(df)
+
+    with instrument.stage("query") as stage:
+        df = filter_expenses(
+            df,
+            start,
+            end,
+            primary,
+            secondary,
+            terciary,
+            types,
+            min_amount,
+            max_amount,
+            description,
+        )
+        result = group_expenses(df, by) if by else _rows(df)
+        stage["rows"] = len(df)
+
+    utils.write_frame(result, output_format, output)
+    if output_format == "table" and not output and not df.empty:
+        utils.print_status(f"{len(df)} row(s), total {df.Cents.sum() / 100:,.2f}")
@@ -0,0 +1,46 @@
+import pathlib
+
+import click
+
+from scripts import graph as gr
+from utils import aggregates as ag
+from utils import expenses_store as es
+from utils import file_settings as fs
+from utils import html_report as hr
+from utils import instrument, utils
+
+
+@click.command()
+@click.option(
+    "--html",
+    "html_file",
+    type=str,
+    default=fs.report_file_name(),
+    show_default=True,
+    help="HTML file to write.",
+)
+@click.option("--title", type=str, default="Finance report", show_default=True)
+def report(html_file: str, title: str) -> None:
+    """
+    Write the household figures to one self-contained HTML file.
+
+    Monthly cubes of the expenses, with & without the 5 standard deviation control,
+    are embedded & drawn in the browser, sampled by month or year (see
+    utils/html_report.py), e.g.\n
+    report --html ~/finance_report.html
+    """
+    with instrument.stage("sheet_frame") as stage:
+        df = gr.drop_vacation(es.load())
+        stage["rows"] = len(df)
+
+    with instrument.stage("aggregate", len(df)):
+        cubes = {
+            "all": ag.build_cube(df),
+            "std": ag.build_cube(gr.apply_stand_dev(df, 5)),
+        }
+
+    with instrument.stage("render"):
+        page = hr.render(hr.payload(cubes), gr.palette(), title)
+        pathlib.Path(html_file).expanduser().write_text(page)
+
+    utils.print_status(f"Report of {len(df)} rows written to {html_file}")
@@ -0,0 +1,49 @@
+import os
+
+import click
+
+from utils import expense_patterns as ep
+from utils import file_settings as fs
+from utils import rule_file, utils
+
+
+@click.command()
+@click.option(
+    "--output", type=str, default="", help="File written, the rules file by default."
+)
+@click.option("--force", is_flag=True, help="Overwrite an existing file.")
+def export_rules(output: str, force: bool) -> None:
+    """
+    Write the active categorization rules as JSON, to edit without touching code.
+
+    Once finance_rules.json exists it replaces the built-in patterns & Type rules.
+    """
+    output = output or fs.rules_file_name()
+    if os.path.exists(output) and not force:
+        raise click.ClickException(f"{output} exists, use --force to overwrite it")
+
+    rules = ep.active_rules()
+    with open(output, "w", encoding="utf-8") as file:
+        file.write(rule_file.dump(rules))
+    utils.print_status(
+        f"Wrote {len(rules['patterns'])} pattern(s) & {len(rules['types'])} type rule(s)"
+        f" to {output}"
+    )
+
+
+@click.command()
+@click.argument("file", type=click.Path(exists=True), required=False)
+def check_rules(file: str) -> None:
+    """Validate a rules file (finance_rules.json by default) & cache its bundle"""
+    file = file or fs.rules_file_name()
+    if not os.path.exists(file):
+        raise click.ClickException(f"{file} not found")
+    try:
+        rules = rule_file.load(file)
+    except ValueError as error:
+        raise click.ClickException(str(error)) from error
+
+    types = dict.fromkeys(type_name for type_name, _, _ in rules["types"])
+    utils.print_status(
+        f"{file}: {len(rules['patterns'])} pattern(s), types {', '.join(types)}"
+    )
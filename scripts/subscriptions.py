@@ -0,0 +1,66 @@
+import click
+
+from utils import expenses_store as es
+from utils import instrument
+from utils import recurring as rc
+from utils import utils
+
+
+@click.command()
+@click.option(
+    "--as-of",
+    type=str,
+    default="",
+    help="Date to judge active & lapsed at, the last expense by default.",
+)
+@click.option(
+    "--new-days",
+    type=int,
+    default=120,
+    show_default=True,
+    help="Active subscriptions first charged this many days ago or less are new.",
+)
+@click.option(
+    "--status",
+    type=click.Choice(["new", "active", "lapsed"]),
+    multiple=True,
+    help="Only report subscriptions of this status, repeatable.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+    show_default=True,
+)
+@click.option("--output", type=str, default="", help="Write to a file, not stdout.")
+def subscriptions(
+    as_of: str, new_days: int, status: tuple, output_format: str, output: str
+) -> None:
+    """
+    Find recurring (weekly, monthly & annual) charges in the categorized expenses.
+
+    Reports each one's cadence, status (new, active or lapsed) & annualized cost.
+    """
+    with instrument.stage("expenses_load") as stage:
+        df = es.load()
+        stage["rows"] = len(df)
+
+    with instrument.stage("detect", len(df)):
+        found = rc.detect(df, as_of, new_days)
+    if status:
+        found = found[found.Status.isin(status)]
+
+    report = found
+    if not found.empty:
+        report = found.assign(
+            First=found.First.dt.strftime("%Y-%m-%d"),
+            Last=found.Last.dt.strftime("%Y-%m-%d"),
+        )
+    utils.write_frame(report, output_format, output)
+
+    active = found[found.Status != "lapsed"]
+    if output_format == "table" and not output and not active.empty:
+        utils.print_status(
+            f"{len(active)} active subscription(s), {active.Annual.sum():,.2f} a year"
+        )
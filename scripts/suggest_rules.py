@@ -0,0 +1,72 @@
+import click
+import pandas as pd
+import pyexcel_ods3 as ods
+
+from scripts import categorize as ct
+from utils import expense_patterns as ep
+from utils import file_settings as fs
+from utils import instrument
+from utils import rule_suggestions as rs
+from utils import synthetic as syn
+from utils import utils
+
+
+def reference_labels(df_labeled: pd.DataFrame) -> pd.DataFrame:
+    """Labeled Groupings of the ledger, with an example of each expense pattern"""
+    patterns = ep.active_rules()["patterns"]
+    examples = pd.DataFrame(
+        {
+            "Grouping": [syn.pattern_example(pattern) for pattern, _ in patterns],
+            "Label": [label for _, label in patterns],
+        }
+    )
+    examples = examples[examples.Grouping != ""]
+    return pd.concat([df_labeled[["Grouping", "Label"]], examples], ignore_index=True)
+
+
+@click.command()
+@click.option(
+    "--limit",
+    type=int,
+    default=20,
+    show_default=True,
+    help="Number of suggestions, 0 for all.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+    show_default=True,
+)
+@click.option("--output", type=str, default="", help="Write to a file, not stdout.")
+def suggest_rules(limit: int, output_format: str, output: str) -> None:
+    """
+    Suggest expense patterns for the unlabeled activity.
+
+    Similar unlabeled Groupings are clustered, and each cluster is given a candidate
+    regex & the nearest existing label, ranked by the dollars & rows it would cover.
+    """
+    with instrument.stage("ods_load"):
+        book = ods.get_data(fs.decrypted_file_name())
+
+    credit_df = utils.get_sheet_df(book, fs.activity_page_credit(), fs.credit_dtype())
+    bank_df = utils.get_sheet_df(book, fs.activity_page_bank(), fs.bank_dtype())
+    rows = len(credit_df) + len(bank_df)
+    with instrument.stage("label", rows):
+        df_raw = ct.label_rows(ct.organized_concat_df(credit_df, bank_df))
+
+    unlabeled = df_raw[df_raw.Label == ""]
+    if unlabeled.empty:
+        utils.print_status("Every row is labeled")
+        return
+
+    with instrument.stage("suggest", len(unlabeled)):
+        suggestions = rs.suggest(
+            unlabeled, reference_labels(df_raw[df_raw.Label != ""]), limit
+        )
+
+    utils.write_frame(suggestions, output_format, output)
+    utils.print_status(
+        f"{len(unlabeled)} unlabeled row(s), {unlabeled.Grouping.nunique()} distinct"
+    )
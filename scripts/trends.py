@@ -0,0 +1,68 @@
+import click
+import pandas as pd
+
+from utils import aggregates as ag
+from utils import expenses_store as es
+from utils import instrument
+from utils import rolling as rl
+from utils import utils
+
+
+def latest_months(df: pd.DataFrame, months: int) -> pd.DataFrame:
+    """Rows of the last given number of months, all rows for 0"""
+    if not months or df.empty:
+        return df
+    kept = sorted(df.Month.unique())[-months:]
+    return df[df.Month.isin(kept)]
+
+
+@click.command()
+@click.option(
+    "--by",
+    type=click.Choice(rl.LEVELS),
+    default="Type",
+    show_default=True,
+    help="Category level the statistics are computed for.",
+)
+@click.option(
+    "--category", type=str, multiple=True, help="Only this category, repeatable."
+)
+@click.option(
+    "--months",
+    type=int,
+    default=12,
+    show_default=True,
+    help="Report the last this many months, 0 for all.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["table", "csv", "json"]),
+    default="table",
+    show_default=True,
+)
+@click.option("--output", type=str, default="", help="Write to a file, not stdout.")
+def trends(
+    by: str, category: tuple, months: int, output_format: str, output: str
+) -> None:
+    """
+    Trailing 3, 6 & 12 month averages & medians and the year over year change.
+
+    Computed for every category from the stored monthly aggregates, e.g.\n
+    trends --by Primary --category Fuel --months 24
+    """
+    with instrument.stage("aggregates_load") as stage:
+        cube = ag.load_cube()
+        if cube.empty:
+            cube = ag.build_cube(es.load())
+        stage["rows"] = len(cube)
+
+    with instrument.stage("rolling", len(cube)):
+        df = rl.rolling_stats(cube, by)
+
+    if category:
+        wanted = {name.strip().lower() for name in category}
+        df = df[df.Category.str.lower().isin(wanted)]
+    df = latest_months(df, months).reset_index(drop=True)
+
+    utils.write_frame(df, output_format, output)
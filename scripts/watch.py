@@ -0,0 +1,288 @@
+"""
+Watch a directory for statement exports & ingest them as they arrive.
+
+The workbook, the activity dedup index and the compiled expense patterns stay in memory
+between events, so each batch of new files only parses those files, labels & types their
+new rows and saves the workbook once. Rows already in the expenses sheets are kept as
+they are, run categorize after changing the expense patterns.
+"""
+
+import csv
+import os
+import time
+from typing import Dict, List, Set, Tuple
+
+import click
+import pandas as pd
+import pyexcel_ods3 as ods
+
+from scripts import categorize as ct
+from scripts import import_activity as ia
+from utils import aggregates as ag
+from utils import concurrency
+from utils import expenses_store as es
+from utils import file_settings as fs
+from utils import instrument
+from utils import partitions as pt
+from utils import utils
+
+Signature = Tuple[float, int]
+
+
+def detect_type(csv_file: str) -> str:
+    """ "bank" or "credit" by the CSV header, "" when it is neither export"""
+    try:
+        # utf-8 as the exports are parsed, a binary or other encoding is no export
+        with open(csv_file, newline="", encoding="utf-8") as file:
+            header = set(next(csv.reader(file), []))
+    except (UnicodeDecodeError, csv.Error):
+        return ""
+
+    for data_type, dtypes in (("bank", fs.bank_dtype()), ("credit", fs.credit_dtype())):
+        if set(dtypes) <= header:
+            return data_type
+    return ""
+
+
+def scan(directory: str) -> Dict[str, Signature]:
+    """Modification time & size of each CSV file in directory"""
+    signatures = {}
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.lower().endswith(".csv"):
+            stat = entry.stat()
+            signatures[entry.path] = (stat.st_mtime, stat.st_size)
+    return signatures
+
+
+def _row_keys(df: pd.DataFrame) -> List[tuple]:
+    return list(df.itertuples(index=False, name=None))
+
+
+class Ledger:
+    """The workbook held in memory, with the dedup index of each activity sheet"""
+
+    def __init__(self, file: str) -> None:
+        self.file = file
+        with instrument.stage("ods_load"):
+            self.book = ods.get_data(file)
+
+        self.activity: Dict[str, pd.DataFrame] = {}
+        self.index: Dict[str, Set[tuple]] = {}
+        self.pending: Dict[str, List[pd.DataFrame]] = {"bank": [], "credit": []}
+        for data_type in ("bank", "credit"):
+            sheet_name, dtypes = ia.activity_sheet(data_type)
+            df = utils.get_sheet_df(self.book, sheet_name, dtypes)
+            if df.empty:
+                df = pd.DataFrame(
+                    columns=list(dtypes) + [fs.currency_column(), "data_source_note"]
+                )
+            elif fs.currency_column() not in df:
+                # sheets imported before the Currency column have it blank
+                df.insert(len(dtypes), fs.currency_column(), "")
+            self.activity[data_type] = df
+            self.index[data_type] = set(_row_keys(df))
+
+        self.df_raw = utils.get_sheet_df(
+            self.book, fs.expenses_raw_page(), fs.expenses_raw_dtype()
+        )
+        if not self.df_raw.empty:
+            # sheets categorized before a column was added get it blank until the
+            # next full categorize
+            self.df_raw = self.df_raw.reindex(
+                columns=list(fs.expenses_raw_dtype()), fill_value=""
+            )
+        self.df_simple = utils.get_sheet_df(
+            self.book, fs.expenses_page(), fs.expenses_dtype()
+        )
+        self.cube = ag.load_cube()
+        if self.cube.empty and not self.df_simple.empty:
+            self.cube = ag.combine_cubes([pt.cube(), ag.build_cube(self.df_simple)])
+
+    def add(self, data_type: str, df: pd.DataFrame, data_source_note: str) -> int:
+        """Queue the rows of df not yet in the activity sheet, returning their count"""
+        df = df.assign(data_source_note=data_source_note).drop_duplicates()
+        df = df[self.activity[data_type].columns]
+        keys = _row_keys(df)
+        new = [key not in self.index[data_type] for key in keys]
+        self.index[data_type].update(keys)
+
+        df = df[new]
+        if not df.empty:
+            self.pending[data_type].append(df)
+        return len(df)
+
+    def _new_activity(self, data_type: str) -> pd.DataFrame:
+        frames = self.pending[data_type]
+        if not frames:
+            return self.activity[data_type].iloc[0:0].copy()
+        return pd.concat(frames[::-1], ignore_index=True)
+
+    def commit(self) -> int:
+        """Label, inflate & type the queued rows, then save the workbook once"""
+        new = {data_type: self._new_activity(data_type) for data_type in self.pending}
+        rows = sum(len(df) for df in new.values())
+        if not rows:
+            return 0
+
+        for data_type, df in new.items():
+            if df.empty:
+                continue
+            sheet_name = ia.activity_sheet(data_type)[0]
+            frames = [frame for frame in (df, self.activity[data_type]) if len(frame)]
+            self.activity[data_type] = pd.concat(frames, ignore_index=True)
+            self.book[sheet_name] = utils.df_to_sheet(self.activity[data_type])
+            self.pending[data_type] = []
+
+        # payments are paired within the batch, categorize pairs the whole ledger
+        with instrument.stage("transfers", rows):
+            ct.link_transfers(new["credit"], new["bank"], fs.transfer_window_days())
+        with instrument.stage("label", rows):
+            df_raw = ct.label_rows(ct.organized_concat_df(new["credit"], new["bank"]))
+        ct.find_and_print_unlabeled_rows(df_raw)
+        try:
+            with instrument.stage("inflation", rows):
+                df_raw = ct.inflate_rows(df_raw)
+        except ValueError as error:
+            # keep the imported activity, categorize once the rates are added
+            utils.print_error(f"Rows without an exchange rate\n{error}")
+            self.save()
+            return rows
+        try:
+            with instrument.stage("type", rows):
+                df_simple = ct.simplify_rows(df_raw)
+        except ValueError as error:
+            # keep the imported activity, categorize once the patterns are added
+            utils.print_error(f"Rows without an expense type\n{error}")
+            self.save()
+            return rows
+
+        self.df_raw = pd.concat([self.df_raw, df_raw], ignore_index=True)
+        self.df_raw = self.df_raw.sort_values(["Grouping", "Date"], kind="stable")
+        self.df_simple = ct.sort_expenses(
+            pd.concat([self.df_simple, df_simple], ignore_index=True)
+        )
+        self.book[fs.expenses_raw_page()] = utils.df_to_sheet(self.df_raw)
+        self.book[fs.expenses_page()] = utils.df_to_sheet(self.df_simple)
+
+        months = set(ag.touched_months(pd.DataFrame(), df_simple))
+        self.cube = ag.update_cube(self.cube, self.df_simple, months, pt.cube())
+        self.save()
+        return rows
+
+    def save(self) -> None:
+        with instrument.stage("ods_save"):
+            ods.save_data(self.file, self.book)
+            es.prime(self.df_simple, self.file)
+        ag.save_cube(self.cube)
+
+
+def ingest(
+    ledger: Ledger, csv_files: List[str], notes: Dict[str, str]
+) -> Tuple[int, List[str]]:
+    """
+    Queue every recognized export & commit them as one batch.
+
+    An export that fails to parse is reported & left out of the batch, the others are
+    still ingested.
+    """
+    types = {csv_file: detect_type(csv_file) for csv_file in csv_files}
+    skipped = [csv_file for csv_file, data_type in types.items() if not data_type]
+    parsed = {
+        csv_file: concurrency.submit(
+            "csv_parse", ia.read_activity_csv, csv_file, data_type
+        )
+        for csv_file, data_type in types.items()
+        if data_type
+    }
+    for csv_file, future in parsed.items():
+        data_type = types[csv_file]
+        try:
+            df = future.result()
+            df = ia.drop_archived(df, data_type, notes[data_type])
+            added = ledger.add(data_type, df, notes[data_type])
+        except (ValueError, KeyError, OSError) as error:
+            utils.print_error(f"{csv_file} could not be imported\n{error}")
+            continue
+        utils.print_status(f"{csv_file}: {added} new {data_type} row(s)")
+
+    return ledger.commit(), skipped
+
+
+@click.command()
+@click.argument("directory", type=click.Path(exists=True, file_okay=False))
+@click.option(
+    "--bank-note",
+    type=str,
+    default="bank",
+    show_default=True,
+    help="Data source note of the bank exports.",
+)
+@click.option(
+    "--credit-note",
+    type=str,
+    default="credit",
+    show_default=True,
+    help="Data source note of the credit card exports.",
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=1.0,
+    show_default=True,
+    help="Seconds between directory scans.",
+)
+@click.option(
+    "--debounce",
+    type=float,
+    default=3.0,
+    show_default=True,
+    help="Seconds without changes before a burst of files is ingested.",
+)
+@click.option(
+    "--once",
+    is_flag=True,
+    help="Ingest the files present now & exit.",
+)
+def watch(
+    directory: str,
+    bank_note: str,
+    credit_note: str,
+    interval: float,
+    debounce: float,
+    once: bool,
+) -> None:
+    """
+    Watch DIRECTORY for bank & credit CSV exports, importing & categorizing new rows.
+
+    Files are recognized by their header, and ingested once they stop changing.
+    """
+    notes = {"bank": bank_note, "credit": credit_note}
+    ledger = Ledger(fs.decrypted_file_name())
+    utils.print_status(f"Watching {directory}")
+
+    ingested: Dict[str, Signature] = {}
+    previous = scan(directory)
+    changed_at = time.monotonic() - debounce
+    try:
+        while True:
+            current = scan(directory)
+            if current != previous:
+                previous, changed_at = current, time.monotonic()
+
+            ready = [
+                path
+                for path, signature in sorted(current.items())
+                if ingested.get(path) != signature
+            ]
+            if ready and (once or time.monotonic() - changed_at >= debounce):
+                rows, skipped = ingest(ledger, ready, notes)
+                for path in skipped:
+                    utils.print_error(f"{path} is neither a bank nor credit export")
+                ingested.update({path: current[path] for path in ready})
+                utils.print_status(f"Ingested {len(ready)} file(s), {rows} new row(s)")
+
+            if once:
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        utils.print_status("Stopped watching")
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils import aggregates as ag
+
+
+def expenses_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "data_source_note": ["bank", "bank", "credit", "credit"],
+            "Date": ["2023-01-05", "2023-01-20", "2023-01-20", "2023-02-03"],
+            "Amount": [1000.10, -20.20, -30.30, -40.40],
+            "Description": ["pay", "gas", "food", "food"],
+            "Primary": ["Income", "Fuel", "Restaurant", "Restaurant"],
+            "Secondary": ["Salary", "Gas", "Good", "Good"],
+            "Terciary": ["Acme", "7-11", "Cafe", "Cafe"],
+            "Type": ["Income", "Lifestyle", "Fun", "Fun"],
+        }
+    )
+
+
+class TestBuildCube(unittest.TestCase):
+
+    def test_sums_in_cents(self) -> None:
+        cube = ag.build_cube(expenses_df())
+        self.assertEqual(list(cube.columns), ag.cube_keys() + ["Cents", "Count"])
+        self.assertEqual(cube.Cents.sum(), 100010 - 2020 - 3030 - 4040)
+        self.assertEqual(cube.Count.sum(), 4)
+        self.assertEqual(sorted(cube.Month.unique()), ["2023-01", "2023-02"])
+
+    def test_empty(self) -> None:
+        self.assertTrue(ag.build_cube(pd.DataFrame()).empty)
+
+
+class TestIncrementalUpdate(unittest.TestCase):
+
+    def test_matches_full_build(self) -> None:
+        df_old = expenses_df()
+        df_new = pd.concat(
+            [
+                df_old,
+                pd.DataFrame(
+                    {
+                        "data_source_note": ["credit"],
+                        "Date": ["2023-02-10"],
+                        "Amount": [-5.55],
+                        "Description": ["food"],
+                        "Primary": ["Restaurant"],
+                        "Secondary": ["Good"],
+                        "Terciary": ["Cafe"],
+                        "Type": ["Fun"],
+                    }
+                ),
+            ],
+            ignore_index=True,
+        )
+
+        months = ag.touched_months(df_old, df_new)
+        self.assertEqual(months, {"2023-02"})
+
+        updated = ag.update_cube(ag.build_cube(df_old), df_new, months)
+        self.assertTrue(ag.cubes_equal(updated, ag.build_cube(df_new)))
+
+    def test_no_changes(self) -> None:
+        self.assertEqual(ag.touched_months(expenses_df(), expenses_df()), set())
+
+    def test_removed_row(self) -> None:
+        df_old = expenses_df()
+        df_new = df_old.drop(index=0)
+        self.assertEqual(ag.touched_months(df_old, df_new), {"2023-01"})
+
+
+class TestPersistence(unittest.TestCase):
+
+    def test_round_trip(self) -> None:
+        cube = ag.build_cube(expenses_df())
+        with tempfile.TemporaryDirectory() as directory:
+            file = os.path.join(directory, "aggregates.csv")
+            ag.save_cube(cube, file)
+            self.assertTrue(ag.cubes_equal(ag.load_cube(file), cube))
+
+    def test_cube_to_frame(self) -> None:
+        df = ag.cube_to_frame(ag.build_cube(expenses_df()))
+        self.assertEqual(
+            list(df.columns),
+            ["Date", "Amount", "Primary", "Secondary", "Terciary", "Type"],
+        )
+        self.assertAlmostEqual(df.Amount.sum(), expenses_df().Amount.sum())
+        self.assertTrue(df.Date.dt.is_month_end.all())
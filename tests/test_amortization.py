@@ -0,0 +1,126 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import amortization as am
+from utils import file_settings as fs
+
+
+def asset_row(**values: str) -> dict:
+    row = {column: "" for column in fs.asset_dtype()}
+    row.update(values)
+    return row
+
+
+def assets_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            asset_row(
+                Action="Buy",
+                Date="2020-01-15",
+                Asset="House",
+                Valuation="$400,000",
+                Down="40,000",
+                **{
+                    "Fixed Rate": "6.5%",
+                    "PMI": "150",
+                    "Monthly Recurring Income": "2500",
+                    "Monthly Recurring Expense": "400",
+                },
+            ),
+            asset_row(
+                Action="Buy",
+                Date="2022-06-01",
+                Asset="Condo",
+                Valuation="200000",
+                **{
+                    "Loan Total": "120000",
+                    "Fixed Rate": "3",
+                    "PMI End": "2023-06-01",
+                },
+            ),
+            asset_row(Action="Valuation", Date="2023-01-01", Asset="Car"),
+        ]
+    )
+
+
+class TestToNumber(unittest.TestCase):
+
+    def test_to_number(self) -> None:
+        result = am.to_number(pd.Series(["$1,200.50", "6.5%", "", "abc"]))
+        self.assertListEqual(result.tolist(), [1200.5, 6.5, 0.0, 0.0])
+
+
+class TestLoans(unittest.TestCase):
+
+    def test_loans(self) -> None:
+        df = am.loans(assets_df()).set_index("Asset")
+        self.assertListEqual(sorted(df.index), ["Condo", "House"])
+        self.assertEqual(df.loc["House", "Loan Total"], 360000)
+        self.assertAlmostEqual(df.loc["House", "Fixed Rate"], 0.065)
+        self.assertAlmostEqual(df.loc["Condo", "Fixed Rate"], 0.03)
+
+
+class TestSchedules(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.frames = am.schedules(am.loans(assets_df()))
+
+    def test_payment(self) -> None:
+        payment = self.frames["payment"]["House"]
+        self.assertAlmostEqual(payment[payment > 0].iloc[0], 2275.44, places=2)
+        self.assertEqual((payment > 0).sum(), 360)
+
+    def test_paid_off(self) -> None:
+        house = self.frames["principal"]["House"]
+        self.assertAlmostEqual(house.sum(), 360000, places=2)
+        # the later loan runs its full term too
+        for asset, total in (("House", 360000), ("Condo", 120000)):
+            self.assertAlmostEqual(self.frames["balance"][asset].iloc[-1], 0, places=2)
+            self.assertEqual((self.frames["payment"][asset] > 0).sum(), 360)
+            self.assertAlmostEqual(
+                self.frames["principal"][asset].sum(), total, places=2
+            )
+
+    def test_percent_rate(self) -> None:
+        df = assets_df()
+        df.loc[1, "Fixed Rate"] = "1"
+        rates = am.loans(df).set_index("Asset")["Fixed Rate"]
+        self.assertAlmostEqual(rates["Condo"], 0.01)
+
+    def test_not_started(self) -> None:
+        condo = self.frames["balance"]["Condo"]
+        self.assertTrue((condo[:"2022-05-31"] == 0).all())
+        self.assertEqual(condo["2022-06-30"], 120000)
+
+    def test_pmi(self) -> None:
+        house = self.frames["pmi"]["House"]
+        balance = self.frames["balance"]["House"].shift(1)
+        self.assertTrue((balance[house > 0] > 400000 * am.pmi_ltv()).all())
+        self.assertTrue((house[balance <= 400000 * am.pmi_ltv()] == 0).all())
+        # no PMI premium given for the condo, only an end date
+        self.assertEqual(self.frames["pmi"]["Condo"].sum(), 0)
+
+    def test_sold(self) -> None:
+        df = pd.concat(
+            [
+                assets_df(),
+                pd.DataFrame(
+                    [asset_row(Action="Sell", Date="2030-03-01", Asset="House")]
+                ),
+            ],
+            ignore_index=True,
+        )
+        balance = am.schedules(am.loans(df))["balance"]["House"]
+        self.assertGreater(balance["2030-03-31"], 0)
+        self.assertTrue((balance["2030-04-30":] == 0).all())
+
+    def test_net_cash_flow(self) -> None:
+        frames = self.frames
+        expected = (2100 - frames["payment"]["House"] - frames["pmi"]["House"])[
+            "2020-02-29":
+        ]
+        np.testing.assert_allclose(
+            frames["net_cash_flow"]["House"]["2020-02-29":], expected
+        )
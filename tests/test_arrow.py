@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from typing import Dict, List
+from unittest.mock import patch
+
+import pandas as pd
+
+from scripts import categorize as ct
+from scripts import import_activity as ia
+from utils import arrow
+from utils import synthetic as syn
+from utils import utils
+
+
+def categorized(rows: int = 300) -> Dict[str, List[list]]:
+    """Sheets import & categorize would write for synthetic statements"""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = syn.write_statements(directory, rows)
+        activity = {
+            data_type: ia.merge_activity(
+                pd.DataFrame(), ia.read_activity_csv(paths[data_type], data_type), note
+            )
+            for data_type, note in (("bank", "bank"), ("credit", "credit"))
+        }
+
+    credit, bank = activity["credit"], activity["bank"]
+    ct.link_transfers(credit, bank, 3)
+    df_raw = ct.label_rows(ct.organized_concat_df(credit, bank))
+    grouping = df_raw.Grouping.dtype
+    with patch("scripts.categorize.adjust_for_inflation", lambda row: row["Amount"]):
+        df_raw = ct.inflate_rows(df_raw)
+    return {
+        "grouping": str(grouping),
+        "bank": utils.df_to_sheet(bank),
+        "raw": utils.df_to_sheet(df_raw),
+        "simple": utils.df_to_sheet(ct.simplify_rows(df_raw)),
+    }
+
+
+class TestArrowMode(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.default = categorized()
+
+    def tearDown(self) -> None:
+        arrow.configure()
+
+    def assert_identical(self, sheets: Dict[str, List[list]]) -> None:
+        self.assertEqual(self.default["grouping"], "object")
+        self.assertNotEqual(sheets.pop("grouping"), "object")
+        for name, rows in sheets.items():
+            self.assertEqual(rows, self.default[name], name)
+
+    def test_string_dtype_paths(self) -> None:
+        # pandas' python backed string dtype takes the paths string[pyarrow] takes
+        with patch("utils.arrow.string_dtype", return_value="string[python]"):
+            self.assert_identical(categorized())
+
+    @unittest.skipUnless(arrow.available(), "pyarrow is not installed")
+    def test_identical_results(self) -> None:
+        arrow.configure(True)
+        self.assert_identical(categorized())
+
+    def test_configure_without_pyarrow(self) -> None:
+        with patch("utils.arrow.available", return_value=False):
+            with self.assertRaises(ImportError):
+                arrow.configure(True)
+        self.assertFalse(arrow.enabled())
@@ -0,0 +1,38 @@
+import unittest
+
+from scripts import benchmark as bm
+
+
+class TestMeasure(unittest.TestCase):
+
+    def test_measure(self) -> None:
+        result, metrics = bm.measure(lambda: [0] * 100000)
+        self.assertEqual(len(result), 100000)
+        self.assertGreater(metrics["peak_mb"], 0.5)
+        self.assertGreaterEqual(metrics["wall_s"], 0)
+
+
+class TestCompare(unittest.TestCase):
+
+    def test_regression(self) -> None:
+        baseline = {"1000": {"label": {"wall_s": 1.0}, "type": {"wall_s": 1.0}}}
+        results = {"1000": {"label": {"wall_s": 1.5}, "type": {"wall_s": 1.1}}}
+        regressions = bm.compare(results, baseline, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("label", regressions[0])
+
+    def test_noise_floor(self) -> None:
+        baseline = {"1000": {"label": {"wall_s": 0.001}}}
+        results = {"1000": {"label": {"wall_s": 0.01}}}
+        self.assertEqual(bm.compare(results, baseline, 0.25), [])
+
+
+class TestRunBenchmark(unittest.TestCase):
+
+    def test_stages(self) -> None:
+        results = bm.run_benchmark(200, skip=["inflation", "ods_save", "graph"])
+        self.assertListEqual(
+            list(results),
+            ["csv_parse", "dedup", "transfers", "label", "type", "aggregate"],
+        )
+        self.assertEqual(results["label"]["rows"], 200)
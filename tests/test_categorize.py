@@ -71,3 +71,66 @@ class TestFindAndPrintUnlabeledRows(unittest.TestCase):
         )
         ct.find_and_print_unlabeled_rows(df)
         mock_print_status.assert_not_called()
+
+
+class TestLinkTransfers(unittest.TestCase):
+
+    def test_linked_rows_labeled(self) -> None:
+        credit_df = pd.DataFrame(
+            {
+                "Transaction Date": ["01/05/2024", "01/06/2024"],
+                "Post Date": ["01/05/2024", "01/06/2024"],
+                "Description": ["Payment Thank You", "Airbnb"],
+                "Category": ["", "Travel"],
+                "Type": ["Payment", "Sale"],
+                "Amount": [250.0, -80.0],
+                "Memo": ["", ""],
+                "data_source_note": ["credit", "credit"],
+            }
+        )
+        bank_df = pd.DataFrame(
+            {
+                "Details": ["DEBIT"],
+                "Posting Date": ["01/04/2024"],
+                "Description": ["CARD AUTOPAY"],
+                "Amount": [-250.0],
+                "Type": ["ACCT_XFER"],
+                "Balance": ["1000"],
+                "data_source_note": ["bank"],
+            }
+        )
+
+        ct.link_transfers(credit_df, bank_df, 3)
+        df = ct.label_rows(ct.organized_concat_df(credit_df, bank_df))
+
+        transfers = df[df.Link != ""]
+        self.assertEqual(len(transfers), 2)
+        self.assertEqual(transfers.Link.nunique(), 1)
+        self.assertTrue((transfers.Label == "Transfers: Card Payment").all())
+        self.assertEqual(df[df.Link == ""].Label.tolist(), ["Travel: Lodging: Airbnb"])
+
+
+class TestInflateRows(unittest.TestCase):
+
+    @patch("scripts.categorize.adjust_for_inflation", lambda row: row["Amount"] * 2)
+    def test_converted_then_inflated(self) -> None:
+        df_raw = pd.DataFrame(
+            {
+                "Date": ["2024-01-05", "2024-01-05", "2024-01-06"],
+                "Amount": [-10.0, -20.0, -30.0],
+                "Currency": ["EUR", "", "USD"],
+                "data_source_note": "credit",
+            }
+        )
+        rates = pd.DataFrame(
+            {"Date": pd.to_datetime(["2024-01-01"]), "Currency": ["EUR"], "Rate": [1.1]}
+        )
+        text = ["Type", "Category", "Description", "Grouping", "Merchant", "Label"]
+        df_raw = df_raw.assign(**{column: "" for column in text + ["Link"]})
+        with patch("utils.fx.load_rates", return_value=rates):
+            df = ct.inflate_rows(df_raw)
+
+        self.assertListEqual(df.Currency.tolist(), ["EUR", "USD", "USD"])
+        self.assertListEqual(df.Original.tolist(), [-10.0, -20.0, -30.0])
+        self.assertListEqual(df.Historical.tolist(), [-11.0, -20.0, -30.0])
+        self.assertListEqual(df.Amount.tolist(), [-22.0, -40.0, -60.0])
@@ -0,0 +1,108 @@
+import datetime
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+
+from scripts import categorize as ct
+from scripts import graph as gr
+from utils import aggregates as ag
+from utils import dates as dt
+from utils import file_settings as fs
+from utils import utils
+
+
+class TestParse(unittest.TestCase):
+
+    def test_known_formats(self) -> None:
+        result = dt.parse(pd.Series(["01/05/2024", "2024-01-06", "", "not a date"]))
+        self.assertEqual(result[0], pd.Timestamp("2024-01-05"))
+        self.assertEqual(result[1], pd.Timestamp("2024-01-06"))
+        self.assertTrue(result[2:].isna().all())
+
+    def test_inferred_formats(self) -> None:
+        values = pd.Series(
+            [
+                "2021-01-10 00:00:00",
+                pd.Timestamp("2021-01-11").to_pydatetime(),
+                "1/5/21",
+            ]
+        )
+        result = dt.parse(values)
+        self.assertListEqual(
+            result.tolist(),
+            list(pd.to_datetime(["2021-01-10", "2021-01-11", "2021-01-05"])),
+        )
+
+    def test_typed_passes_through(self) -> None:
+        dates = pd.Series(pd.to_datetime(["2024-01-05"]))
+        self.assertIs(dt.parse(dates), dates)
+
+    def test_parses_each_distinct_text_once(self) -> None:
+        texts = pd.Series(["01/05/2024", "01/06/2024"] * 50000)
+        with patch("pandas.to_datetime", wraps=pd.to_datetime) as to_datetime:
+            result = dt.parse(texts)
+        self.assertEqual(to_datetime.call_count, 1)
+        self.assertEqual(len(to_datetime.call_args[0][0]), 2)
+        self.assertEqual(result.nunique(), 2)
+
+    def test_months(self) -> None:
+        result = dt.months(pd.Series(["2023-12-31", "01/02/2024", ""]))
+        self.assertListEqual(result.tolist(), ["2023-12", "2024-01", ""])
+
+
+class TestTyped(unittest.TestCase):
+
+    def test_sheet_round_trip(self) -> None:
+        book = {
+            fs.expenses_page(): [
+                list(fs.expenses_dtype()),
+                ["card", "2024-01-05", -5.0, "Cafe", "Food", "Coffee", "", "Wants"],
+            ]
+        }
+        df = utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df.Date))
+        self.assertListEqual(
+            utils.df_to_sheet(df),
+            book[fs.expenses_page()][:1] + [book[fs.expenses_page()][1]],
+        )
+
+    def test_datetime_cell(self) -> None:
+        header = list(fs.expenses_dtype())
+        row = ["card", "2024-01-05", -5.0, "Cafe", "Food", "Coffee", "", "Wants"]
+        book = {
+            fs.expenses_page(): [
+                header,
+                row[:1] + [datetime.datetime(2021, 1, 10)] + row[2:],
+            ]
+        }
+        df = utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+        self.assertEqual(utils.df_to_sheet(df)[1][1], "2021-01-10")
+
+        # a value that is not a date is refused rather than saved back blank
+        book[fs.expenses_page()][1][1] = "soon"
+        with self.assertRaisesRegex(ValueError, "Date is not a date: soon"):
+            utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+
+    def test_no_reparse_once_typed(self) -> None:
+        df_raw = pd.DataFrame(
+            {
+                "data_source_note": ["card"] * 4,
+                "Date": pd.to_datetime(["2024-01-05", "2024-01-06"] * 2),
+                "Type": ["Sale"] * 4,
+                "Description": ["Airbnb"] * 4,
+                "Amount": [-40.0, -35.5, -20.0, -10.0],
+                "Category": ["Travel"] * 4,
+                "Link": [""] * 4,
+            }
+        )
+        # every later step of a categorize run must take the typed dates as they are
+        with patch(
+            "scripts.categorize.adjust_for_inflation", lambda row: row["Amount"]
+        ), patch("pandas.to_datetime", side_effect=AssertionError("re-parsed")):
+            df_raw = ct.inflate_rows(ct.label_rows(df_raw))
+            df_simple = ct.simplify_rows(df_raw)
+            ag.build_cube(df_simple)
+            ag.touched_months(df_simple.iloc[:2], df_simple)
+            gr.df_base(df_simple)
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df_simple.Date))
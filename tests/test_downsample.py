@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import downsample as ds
+
+
+class TestMinmaxIndices(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        self.x = np.arange(100_000)
+        self.y = rng.normal(size=100_000)
+
+    def test_bounded_length(self) -> None:
+        keep = ds.minmax_indices(self.x, self.y, 1000)
+        self.assertLessEqual(len(keep), 1002)
+        self.assertTrue(np.all(np.diff(keep) > 0))
+
+    def test_extremes_and_ends_kept(self) -> None:
+        keep = ds.minmax_indices(self.x, self.y, 1000)
+        self.assertIn(self.y.argmax(), keep)
+        self.assertIn(self.y.argmin(), keep)
+        self.assertEqual(keep[0], 0)
+        self.assertEqual(keep[-1], len(self.x) - 1)
+
+    def test_short_input_unchanged(self) -> None:
+        keep = ds.minmax_indices(self.x[:10], self.y[:10], 1000)
+        np.testing.assert_array_equal(keep, np.arange(10))
+
+    def test_disabled(self) -> None:
+        keep = ds.minmax_indices(self.x, self.y, 0)
+        self.assertEqual(len(keep), len(self.x))
+
+
+class TestDownsampleFrame(unittest.TestCase):
+
+    def test_datetime_x(self) -> None:
+        df = pd.DataFrame(
+            {
+                "Date": pd.date_range("2000-01-01", periods=5000, freq="h"),
+                "Amount": np.sin(np.arange(5000)),
+            }
+        )
+        result = ds.downsample_frame(df, "Date", "Amount", 200)
+        self.assertLessEqual(len(result), 202)
+        self.assertEqual(result.Amount.max(), df.Amount.max())
+        self.assertTrue(result.Date.is_monotonic_increasing)
@@ -1,9 +1,12 @@
+import re
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 import pandas as pd
 
 from utils import expense_patterns as ep
+from utils import synthetic as syn
 
 
 class TestApplyExpenseLabel(unittest.TestCase):
@@ -25,6 +28,69 @@ class TestApplyExpenseLabel(unittest.TestCase):
         self.assertEqual(ep.apply_expense_label(""), "")
 
 
+class TestLabelSeries(unittest.TestCase):
+
+    def test_matches_apply_expense_label(self) -> None:
+        descriptions = pd.Series(["Airbnb", "Unknown Vendor", "Airbnb", None])
+        expected = descriptions.map(ep.apply_expense_label).tolist()
+        self.assertEqual(ep.label_series(descriptions).tolist(), expected)
+        self.assertEqual(expected[0], "Travel: Lodging: Airbnb")
+        self.assertEqual(expected[3], "")
+
+
+class TestMerchantKeys(unittest.TestCase):
+
+    def test_volatile_tokens(self) -> None:
+        descriptions = pd.Series(
+            [
+                "BUC-EE GAS #42 AUSTIN TX",
+                "BUC-EE GAS #117 AUSTIN TX",
+                "AIRBNB*7E503B",
+                "AIRBNB*HM2K9Q",
+                "7-ELEVEN GAS",
+                None,
+            ]
+        )
+        self.assertEqual(
+            ep.merchant_keys(descriptions).tolist(),
+            [
+                "BUC-EE GAS #0 AUSTIN",
+                "BUC-EE GAS #0 AUSTIN",
+                "AIRBNB*0",
+                "AIRBNB*0",
+                "7-ELEVEN GAS",
+                "",
+            ],
+        )
+
+    def test_labels_unchanged(self) -> None:
+        descriptions = pd.Series(["Buc-Ee Gas #12 Austin TX", "7 Eleven 3341 Gas"])
+        self.assertEqual(
+            ep.label_series(ep.merchant_keys(descriptions)).tolist(),
+            ep.label_series(descriptions).tolist(),
+        )
+
+        # every built-in pattern's example, raw & keyed
+        examples = syn.merchants()
+        keys = ep.merchant_keys(examples.Description)
+        self.assertListEqual(
+            ep.label_series(examples.Description).tolist(), examples.Label.tolist()
+        )
+        self.assertListEqual(ep.label_series(keys).tolist(), examples.Label.tolist())
+
+    def test_state_codes_only_after_a_city(self) -> None:
+        keys = ep.merchant_keys(pd.Series(["AAA ACG SW", "ACME CO", "GAS AUSTIN TX"]))
+        self.assertListEqual(keys.tolist(), ["AAA ACG SW", "ACME CO", "GAS AUSTIN"])
+
+    def test_label_falls_back_to_description(self) -> None:
+        descriptions = pd.Series(["ACME WIDGETS CO", "AIRBNB*HM2K9Q"])
+        with patch.object(
+            ep, "compiled_patterns", lambda: [(re.compile("(?i)Widgets.Co"), "Acme")]
+        ):
+            labels = ep.label_merchants(ep.merchant_keys(descriptions), descriptions)
+        self.assertListEqual(labels.tolist(), ["Acme", ""])
+
+
 class TestApplyType(unittest.TestCase):
 
     def setUp(self) -> None:
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+import pyexcel_ods3 as ods
+
+from utils import expenses_store as es
+from utils import file_settings as fs
+from utils import utils
+
+
+class TestExpensesStore(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.df = pd.DataFrame(
+            {
+                "data_source_note": ["bank", "credit"],
+                "Date": ["2023-01-05", "2023-02-10"],
+                "Amount": [-10.1, 2000.0],
+                "Description": ["BUC-EE GAS", "PAYROLL"],
+                "Primary": ["Fuel", "Income"],
+                "Secondary": ["Gas", ""],
+                "Terciary": ["Buc-Ee", ""],
+                "Type": ["Lifestyle", "Income"],
+            }
+        )
+        ods.save_data(
+            fs.decrypted_file_name(), {fs.expenses_page(): utils.df_to_sheet(self.df)}
+        )
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_columnar(self) -> None:
+        df = es.columnar(self.df)
+        self.assertEqual(df.Cents.tolist(), [-1010, 200000])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df.Date))
+        self.assertEqual(df.Primary.dtype, "category")
+
+    def test_load_primes_store(self) -> None:
+        df = es.load()
+        self.assertTrue(os.path.exists(es.store_path()))
+        pd.testing.assert_frame_equal(es.load(), df)
+
+    def test_stale_store_ignored(self) -> None:
+        es.prime(self.df.iloc[:1])
+        self.assertEqual(len(es.load()), 1)
+
+        ods.save_data(
+            fs.decrypted_file_name(),
+            {fs.expenses_page(): utils.df_to_sheet(self.df.iloc[:2])},
+        )
+        stat = os.stat(fs.decrypted_file_name())
+        os.utime(fs.decrypted_file_name(), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        self.assertEqual(len(es.load()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
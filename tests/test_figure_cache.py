@@ -0,0 +1,97 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from utils import figure_cache as fc
+
+
+def pivot() -> pd.DataFrame:
+    return pd.DataFrame(
+        {"Fun": [1.0, 2.0], "Lifestyle": [3.0, 4.0]},
+        index=pd.to_datetime(["2023-01-31", "2023-02-28"]),
+    )
+
+
+class TestFingerprint(unittest.TestCase):
+
+    def test_stable(self) -> None:
+        self.assertEqual(
+            fc.fingerprint(pivot(), "month", (6, 3)),
+            fc.fingerprint(pivot(), "month", (6, 3)),
+        )
+
+    def test_sensitive_to_data(self) -> None:
+        changed = pivot()
+        changed.iloc[-1, 0] = 2.5
+        self.assertNotEqual(fc.fingerprint(pivot()), fc.fingerprint(changed))
+
+    def test_sensitive_to_labels_and_parameters(self) -> None:
+        renamed = pivot().rename(columns={"Fun": "Travel"})
+        self.assertNotEqual(fc.fingerprint(pivot()), fc.fingerprint(renamed))
+        self.assertNotEqual(
+            fc.fingerprint(pivot(), "month"), fc.fingerprint(pivot(), "year")
+        )
+
+
+class TestCachedFigure(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        patcher = patch("utils.figure_cache.fs.cache_dir")
+        patcher.start().return_value = self.directory.name
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(plt.close, "all")
+        fc.set_enabled(True)
+
+    def _draw(self) -> MagicMock:
+        def draw():
+            fig, ax = plt.subplots(figsize=(2, 1))
+            pivot().plot(ax=ax)
+            return fig
+
+        return MagicMock(side_effect=draw)
+
+    def test_drawn_once(self) -> None:
+        draw = self._draw()
+        fc.cached_figure("key", (2, 1), draw)
+        fc.cached_figure("key", (2, 1), draw)
+        draw.assert_called_once()
+
+    def test_new_key_redraws(self) -> None:
+        draw = self._draw()
+        fc.cached_figure("key", (2, 1), draw)
+        fc.cached_figure("other", (2, 1), draw)
+        self.assertEqual(draw.call_count, 2)
+
+    def test_unused_renders_pruned(self) -> None:
+        draw = self._draw()
+        fc.cached_figure("old", (2, 1), draw)
+        fc.cached_figure("used", (2, 1), draw)
+        month_ago = time.time() - (fc.MAX_AGE_DAYS + 1) * 24 * 60 * 60
+        for key in ("old", "used"):
+            os.utime(fc.figure_path(key), (month_ago, month_ago))
+
+        # showing a render keeps it, storing a new one prunes the unused
+        fc.cached_figure("used", (2, 1), draw)
+        fc.cached_figure("new", (2, 1), draw)
+        self.assertFalse(os.path.exists(fc.figure_path("old")))
+        self.assertTrue(os.path.exists(fc.figure_path("used")))
+        self.assertTrue(os.path.exists(fc.figure_path("new")))
+
+    def test_disabled(self) -> None:
+        draw = self._draw()
+        fc.set_enabled(False)
+        fc.cached_figure("key", (2, 1), draw)
+        fc.cached_figure("key", (2, 1), draw)
+        self.assertEqual(draw.call_count, 2)
+        fc.set_enabled(True)
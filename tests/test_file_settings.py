@@ -15,6 +15,16 @@ class TestFunctions(unittest.TestCase):
         self.assertIsInstance(result, str)
         self.assertEqual(result, "finance_encrypted.ods")
 
+    def test_aggregates_file_name(self) -> None:
+        result = fs.aggregates_file_name()
+        self.assertIsInstance(result, str)
+        self.assertEqual(result, "finance_aggregates.csv")
+
+    def test_cache_dir(self) -> None:
+        result = fs.cache_dir()
+        self.assertIsInstance(result, str)
+        self.assertEqual(result, ".finance_cache")
+
     def test_activity_page_bank(self) -> None:
         result = fs.activity_page_bank()
         self.assertIsInstance(result, str)
@@ -43,12 +53,42 @@ class TestFunctions(unittest.TestCase):
         self.assertIsInstance(result["Date"], str)
         self.assertIsInstance(result["Loan Total"], str)
 
+    def test_asset_page(self) -> None:
+        result = fs.asset_page()
+        self.assertIsInstance(result, str)
+        self.assertEqual(result, "assets")
+
+    def test_loan_term_months(self) -> None:
+        self.assertEqual(fs.loan_term_months(), 360)
+
     def test_expenses_raw_page(self) -> None:
         result = fs.expenses_raw_page()
         self.assertIsInstance(result, str)
         self.assertEqual(result, "expenses_raw")
 
+    def test_expenses_raw_dtype(self) -> None:
+        result = fs.expenses_raw_dtype()
+        self.assertIsInstance(result, dict)
+        self.assertIsInstance(result["Label"], str)
+        self.assertIsInstance(result["Historical"], type(float))
+
     def test_expenses_page(self) -> None:
         result = fs.expenses_page()
         self.assertIsInstance(result, str)
         self.assertEqual(result, "expenses")
+
+    def test_expenses_dtype(self) -> None:
+        result = fs.expenses_dtype()
+        self.assertIsInstance(result, dict)
+        self.assertIsInstance(result["Terciary"], str)
+        self.assertIsInstance(result["Amount"], type(float))
+
+    def test_sheet_date_columns(self) -> None:
+        result = fs.sheet_date_columns()
+        self.assertIsInstance(result, dict)
+        for sheet_name, dtypes in (
+            (fs.activity_page_bank(), fs.bank_dtype()),
+            (fs.activity_page_credit(), fs.credit_dtype()),
+            (fs.expenses_page(), fs.expenses_dtype()),
+        ):
+            self.assertTrue(set(result[sheet_name]) <= set(dtypes))
@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import forecast as fcst
+
+
+def cube(months: int = 36) -> pd.DataFrame:
+    """Income of 3000 a month, 6000 in December, & spending of 1000 to 1400"""
+    index = pd.period_range("2021-01", periods=months, freq="M")
+    rng = np.random.default_rng(0)
+    income = np.where(index.month == 12, 600000, 300000)
+    spending = -rng.integers(100000, 140000, months)
+    rows = []
+    for type_name, cents in (("Income", income), ("Fun", spending), ("Transfers", 5)):
+        rows.append(
+            pd.DataFrame(
+                {"Month": index.strftime("%Y-%m"), "Type": type_name, "Cents": cents}
+            )
+        )
+    return pd.concat(rows, ignore_index=True)
+
+
+class TestFit(unittest.TestCase):
+
+    def test_history_excludes_transfers(self) -> None:
+        matrix = fcst.history(cube(), 24)
+        self.assertListEqual(list(matrix.columns), ["Fun", "Income"])
+        self.assertEqual(len(matrix), 24)
+
+    def test_seasonality(self) -> None:
+        expected, residuals = fcst.fit(fcst.history(cube()))
+        income = expected[:, 1]
+        # three Decembers of 6000 shrunk toward the overall mean of 3250
+        self.assertAlmostEqual(income[11], (3 * 6000 + 3250) / 4)
+        self.assertAlmostEqual(income[0], (3 * 3000 + 3250) / 4)
+        self.assertEqual(residuals.shape, (36, 2))
+
+
+class TestProject(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.matrix = fcst.history(cube())
+
+    def test_bands(self) -> None:
+        projection = fcst.project(self.matrix, horizon=24, paths=2000, start=1000)
+        monthly = projection["monthly"]
+        self.assertEqual(len(monthly), 24)
+        self.assertEqual(monthly.Month.iloc[0], "2024-01")
+        bands = monthly[[f"Balance{percentile}" for percentile in fcst.PERCENTILES]]
+        self.assertTrue((bands.diff(axis=1).iloc[:, 1:] >= 0).all().all())
+        # December's income shows in its net flow
+        december = monthly[monthly.Month.str.endswith("-12")]
+        self.assertTrue((december.Net50 > monthly.Net50.median()).all())
+
+        types = projection["types"]
+        self.assertListEqual(types.Year.unique().tolist(), [1, 2])
+        income = types[types.Type == "Income"].P50
+        self.assertTrue(((income > 38000) & (income < 40000)).all())
+
+    def test_seeded(self) -> None:
+        first = fcst.project(self.matrix, 12, 500, seed=3)["monthly"]
+        pd.testing.assert_frame_equal(
+            first, fcst.project(self.matrix, 12, 500, seed=3)["monthly"]
+        )
+
+    def test_runway(self) -> None:
+        spending = self.matrix[["Fun"]]
+        runway = fcst.project(spending, 24, 1000, start=5000)["runway"].iloc[0]
+        self.assertEqual(runway.DepletedPct, 100)
+        self.assertTrue(3 <= runway.MedianRunway <= 5)
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from utils import fx
+
+
+def rates() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2023-01-01", "2023-01-01", "2023-02-01"]),
+            "Currency": ["EUR", "GBP", "EUR"],
+            "Rate": [1.1, 1.25, 1.2],
+        }
+    )
+
+
+class TestCurrencies(unittest.TestCase):
+
+    def test_blank_is_base(self) -> None:
+        codes = fx.currencies(pd.Series([" eur", "", None, "USD"]))
+        self.assertListEqual(codes.tolist(), ["EUR", "USD", "USD", "USD"])
+
+
+class TestConvert(unittest.TestCase):
+
+    def test_as_of(self) -> None:
+        amounts = pd.Series([-10.0, -10.0, -10.0, -10.0])
+        dates = pd.Series(["2023-01-15", "2023-02-01", "2023-03-01", "2023-01-02"])
+        codes = pd.Series(["EUR", "EUR", "GBP", "USD"])
+        result = fx.convert(amounts, dates, codes, rates())
+        self.assertListEqual(result.round(2).tolist(), [-11.0, -12.0, -12.5, -10.0])
+
+    def test_base_only_needs_no_rates(self) -> None:
+        amounts = pd.Series([5.0, 6.0])
+        result = fx.convert(amounts, pd.Series(["", ""]), pd.Series(["USD", "USD"]))
+        self.assertListEqual(result.tolist(), [5.0, 6.0])
+
+    def test_missing_rate(self) -> None:
+        with self.assertRaisesRegex(ValueError, "EUR on or before 2022-12-31"):
+            fx.convert(
+                pd.Series([1.0]),
+                pd.Series(["2022-12-31"]),
+                pd.Series(["EUR"]),
+                rates(),
+            )
+
+
+class TestLoadRates(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.file = os.path.join(self.directory.name, "fx.csv")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_load(self) -> None:
+        with open(self.file, "w") as file:
+            file.write("Date,Currency,Rate\n2023-02-01,eur,1.2\n01/01/2023,EUR,1.1\n")
+        df = fx.load_rates(self.file)
+        self.assertListEqual(df.Rate.tolist(), [1.1, 1.2])
+        self.assertListEqual(df.Currency.tolist(), ["EUR", "EUR"])
+
+    def test_invalid_row(self) -> None:
+        with open(self.file, "w") as file:
+            file.write("Date,Currency,Rate\n2023-02-01,EUR,1.2\nsoon,EUR,0\n")
+        with self.assertRaisesRegex(ValueError, r"row\(s\) \[3\]"):
+            fx.load_rates(self.file)
+
+    def test_no_file(self) -> None:
+        self.assertTrue(fx.load_rates(self.file).empty)
@@ -3,8 +3,9 @@ from typing import Any
 
 import pandas as pd
 
-from scripts.graph import (_sample, apply_stand_dev, df_base, df_expenses,
-                           df_income, df_income_simple, df_lifestyle)
+from scripts.graph import (_sample, apply_stand_dev, df_base, df_cumsum_lines,
+                           df_expenses, df_income, df_income_simple,
+                           df_lifestyle)
 
 
 def sample_df() -> pd.DataFrame:
@@ -128,3 +129,27 @@ class TestApplyStandDevFunction(unittest.TestCase):
         self.assertTrue(result.shape[0] > 0)
         self.assertTrue(all(result.Amount <= 3000))
         self.assertTrue(all(result.Amount >= -600))
+
+
+class TestDfCumsumLinesFunction(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.df: pd.DataFrame = pd.DataFrame(
+            {
+                "Date": pd.date_range(start="2000-01-01", periods=20000, freq="h"),
+                "Amount": [100, -40, -50, 20] * 5000,
+            }
+        )
+
+    def test_one_point_per_date(self) -> None:
+        df = pd.concat([self.df.head(4), self.df.head(4)])
+        lines = df_cumsum_lines(df)
+        self.assertFalse(lines["amounts"].duplicated(["Category", "Date"]).any())
+        self.assertEqual(len(lines["sums"]), 4)
+
+    def test_downsampled(self) -> None:
+        lines = df_cumsum_lines(self.df, max_points=500)
+        self.assertLessEqual(len(lines["sums"]), 502)
+        for _, group in lines["amounts"].groupby("Category"):
+            self.assertLessEqual(len(group), 502)
+        self.assertEqual(lines["sums"].Sum.iloc[-1], self.df.Amount.sum())
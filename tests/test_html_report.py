@@ -0,0 +1,67 @@
+import json
+import unittest
+
+import pandas as pd
+
+from utils import html_report as hr
+
+
+def cube() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Month": ["2024-01", "2024-01", "2024-01", "2024-02"],
+            "Type": ["Income", "Income", "Fun", "Fun"],
+            "Primary": ["Income", "Income", "Dining", "Dining"],
+            "Secondary": ["Salary", "Salary", "Bar", "Restaurant"],
+            "Terciary": ["Acme</script>", "Acme</script>", "Bar", "Pub"],
+            "data_source_note": ["bank", "credit", "credit", "credit"],
+            "Cents": [100000, 50000, -2500, -4000],
+            "Count": [1, 1, 1, 2],
+        }
+    )
+
+
+class TestPayload(unittest.TestCase):
+
+    def test_reduce_cube(self) -> None:
+        df = hr.reduce_cube(cube())
+        self.assertEqual(len(df), 3)
+        income = df[df.Type == "Income"].iloc[0]
+        self.assertEqual((income.Source, income.Cents), ("Acme</script>", 150000))
+        # only income keeps its Terciary
+        self.assertTrue((df[df.Type == "Fun"].Source == "").all())
+
+    def test_round_trip(self) -> None:
+        data = hr.payload({"all": cube(), "std": cube().iloc[:3]})
+        self.assertListEqual(data["months"], ["2024-01", "2024-02"])
+        self.assertEqual(len(data["keys"]), 2)
+
+        encoded = data["cubes"]["all"]
+        cells = {
+            (data["months"][m], tuple(data["keys"][k]), c)
+            for m, k, c in zip(encoded["m"], encoded["k"], encoded["c"])
+        }
+        self.assertIn(("2024-02", ("Fun", "Dining", ""), -4000), cells)
+        self.assertIn(("2024-01", ("Income", "Income", "Acme</script>"), 150000), cells)
+        self.assertEqual(len(data["cubes"]["std"]["c"]), 2)
+
+    def test_empty(self) -> None:
+        data = hr.payload({"all": cube().iloc[:0]})
+        self.assertEqual(data["cubes"]["all"]["c"], [])
+
+
+class TestRender(unittest.TestCase):
+
+    def test_self_contained(self) -> None:
+        data = hr.payload({"all": cube(), "std": cube()})
+        page = hr.render(data, ["#000000"], "Report <2024>")
+
+        self.assertNotIn("<script src", page)
+        self.assertNotIn("<link", page)
+        self.assertIn("<title>Report &lt;2024&gt;</title>", page)
+        # the embedded data can not close its script element
+        self.assertEqual(page.count("</script>"), 1)
+
+        start = page.index("const DATA = ") + len("const DATA = ")
+        text = page[start : page.index(";\n", start)]
+        self.assertEqual(json.loads(text), data)
@@ -0,0 +1,89 @@
+import unittest
+
+import pandas as pd
+
+from utils import concurrency, instrument
+
+
+class TestStage(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        instrument.configure()
+
+    def test_disabled(self) -> None:
+        instrument.configure()
+        with instrument.stage("label", 10):
+            pass
+        self.assertEqual(instrument.records(), [])
+
+    def test_enabled(self) -> None:
+        instrument.configure(timings=True)
+        with instrument.stage("label") as stage:
+            stage["rows"] = 10
+        records = instrument.records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["name"], "label")
+        self.assertEqual(records[0]["rows"], 10)
+        self.assertGreaterEqual(records[0]["wall_s"], 0)
+
+    def test_nested_peak(self) -> None:
+        instrument.configure(timings=True)
+        with instrument.stage("outer"):
+            with instrument.stage("inner"):
+                data = [0] * 200000
+            del data
+        inner, outer = sorted(instrument.records(), key=lambda r: r["depth"])[::-1]
+        self.assertEqual(inner["depth"], 1)
+        self.assertGreater(inner["peak_mb"], 1)
+        self.assertGreaterEqual(outer["peak_mb"], inner["peak_mb"])
+
+    def test_worker_thread(self) -> None:
+        instrument.configure(timings=True)
+        with instrument.stage("outer"):
+            future = concurrency.submit("parse", lambda: pd.DataFrame({"A": [1, 2]}))
+            self.assertEqual(len(future.result()), 2)
+        parse, outer = sorted(instrument.records(), key=lambda r: r["name"])[::-1]
+        self.assertEqual(parse["depth"], 0)
+        self.assertEqual(parse["rows"], 2)
+        self.assertTrue(parse["thread"].startswith("finance"))
+        self.assertNotEqual(parse["thread"], outer["thread"])
+
+    def test_trace_enables(self) -> None:
+        instrument.configure(trace_file="trace.json")
+        self.assertTrue(instrument.enabled())
+
+
+class TestTimed(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        instrument.configure()
+
+    def test_name_and_rows(self) -> None:
+        @instrument.timed
+        def graph_income(df: pd.DataFrame, variant: str, note: str) -> int:
+            return len(df)
+
+        instrument.configure(timings=True)
+        self.assertEqual(graph_income(pd.DataFrame({"A": [1, 2]}), "month", "\n"), 2)
+        record = instrument.records()[0]
+        self.assertEqual(record["name"], "graph_income(month)")
+        self.assertEqual(record["rows"], 2)
+
+
+class TestChromeTrace(unittest.TestCase):
+
+    def tearDown(self) -> None:
+        instrument.configure()
+
+    def test_events(self) -> None:
+        instrument.configure(timings=True)
+        with instrument.stage("ods_load", 5):
+            pass
+        events = instrument.chrome_trace()["traceEvents"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["args"]["rows"], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+
+import pandas as pd
+
+from utils import file_settings as fs
+from utils import net_worth as nw
+
+
+def asset_row(**values: str) -> dict:
+    row = {column: "" for column in fs.asset_dtype()}
+    row.update(values)
+    return row
+
+
+def assets_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            asset_row(
+                Action="Buy",
+                Date="2022-01-10",
+                Asset="Car",
+                Valuation="20000",
+                Ethan="100",
+            ),
+            asset_row(
+                Action="Valuation", Date="2022-03-05", Asset="Car", Valuation="18000"
+            ),
+            asset_row(Action="Sell", Date="2022-05-20", Asset="Car"),
+            asset_row(
+                Action="Buy",
+                Date="2022-02-01",
+                Asset="Condo",
+                Valuation="200000",
+                Ethan="0.25",
+                Ioulia="0.75",
+                **{"Loan Total": "100000", "Fixed Rate": "0"},
+            ),
+            asset_row(
+                Action="Valuation",
+                Date="2022-04-30",
+                Asset="Checking",
+                Type="Cash",
+                Valuation="5000",
+            ),
+        ]
+    )
+
+
+def flow() -> pd.Series:
+    return pd.Series(
+        1000.0,
+        index=["2022-01", "2022-02", "2022-03", "2022-04", "2022-05", "2022-06"],
+    )
+
+
+class TestTimeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        df = nw.timeline(assets_df(), flow())
+        self.df = df.set_index(["Month", "Asset"])
+
+    def value(self, month: str, asset: str, column: str = "Equity") -> float:
+        return self.df.loc[(pd.Timestamp(month), asset), column]
+
+    def test_valuation_as_of(self) -> None:
+        self.assertEqual(self.value("2022-01-31", "Car"), 20000)
+        self.assertEqual(self.value("2022-02-28", "Car"), 20000)
+        self.assertEqual(self.value("2022-03-31", "Car"), 18000)
+        # sold in May, and nothing held before it was bought
+        self.assertEqual(self.value("2022-05-31", "Car"), 0)
+        self.assertEqual(self.value("2022-01-31", "Condo"), 0)
+
+    def test_loan(self) -> None:
+        self.assertEqual(self.value("2022-02-28", "Condo", "Loan"), 100000)
+        self.assertLess(self.value("2022-06-30", "Condo", "Loan"), 100000)
+        self.assertEqual(
+            self.value("2022-06-30", "Condo"),
+            200000 - self.value("2022-06-30", "Condo", "Loan"),
+        )
+
+    def test_cash_anchor(self) -> None:
+        # the April balance re-anchors the cumulative flow, before & after
+        self.assertEqual(self.value("2022-04-30", "Cash"), 5000)
+        self.assertEqual(self.value("2022-06-30", "Cash"), 7000)
+        self.assertEqual(self.value("2022-01-31", "Cash"), 2000)
+
+    def test_no_assets(self) -> None:
+        df = nw.timeline(pd.DataFrame(), flow())
+        self.assertEqual(set(df.Asset), {fs.cash_asset_type()})
+        self.assertListEqual(df.Equity.tolist(), [1000.0 * n for n in range(1, 7)])
+
+    def test_only_cash_rows(self) -> None:
+        df = nw.timeline(assets_df().iloc[[4]], flow())
+        self.assertEqual(set(df.Asset), {fs.cash_asset_type()})
+        cash = df.set_index("Month").Equity
+        self.assertEqual(cash[pd.Timestamp("2022-04-30")], 5000)
+        self.assertEqual(cash[pd.Timestamp("2022-06-30")], 7000)
+
+    def test_empty(self) -> None:
+        df = nw.timeline(assets_df().iloc[:0], flow().iloc[:0])
+        self.assertListEqual(list(df.columns), nw.COLUMNS)
+        self.assertTrue(df.empty)
+
+
+class TestNominalFlow(unittest.TestCase):
+
+    def test_historical_amounts(self) -> None:
+        df_raw = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(["2022-01-05", "2022-01-20", "2022-03-01"]),
+                "Historical": [1000.0, -250.0, -100.0],
+                # inflation adjusted, in today's dollars
+                "Amount": [1300.0, -325.0, -125.0],
+            }
+        )
+        result = nw.nominal_flow(df_raw)
+        self.assertDictEqual(result.to_dict(), {"2022-01": 750.0, "2022-03": -100.0})
+        self.assertTrue(nw.nominal_flow(df_raw.iloc[:0]).empty)
+
+
+class TestOwners(unittest.TestCase):
+
+    def test_shares(self) -> None:
+        df = nw.shares(assets_df(), ["Ethan", "Ioulia"])
+        self.assertListEqual(df.loc["Car"].tolist(), [1.0, 0.0])
+        self.assertListEqual(df.loc["Condo"].tolist(), [0.25, 0.75])
+        self.assertNotIn("Checking", df.index)
+
+    def test_by_owner(self) -> None:
+        df = nw.timeline(assets_df(), flow())
+        owners = nw.by_owner(df, nw.shares(assets_df(), ["Ethan", "Ioulia"]))
+        march = owners.loc[pd.Timestamp("2022-03-31")]
+        condo = df[(df.Month == "2022-03-31") & (df.Asset == "Condo")].Equity.iloc[0]
+        cash = df[(df.Month == "2022-03-31") & (df.Asset == "Cash")].Equity.iloc[0]
+        self.assertAlmostEqual(march.Ethan, 18000 + condo * 0.25 + cash / 2)
+        self.assertAlmostEqual(march.Ioulia, condo * 0.75 + cash / 2)
+        self.assertAlmostEqual(
+            owners.sum(axis=1).iloc[-1], df.groupby("Month").Equity.sum().iloc[-1]
+        )
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from scripts.graph import apply_stand_dev
+from utils import outliers as ol
+
+
+def expenses_df() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    dates = pd.date_range("2022-01-01", periods=720, freq="D")
+    df = pd.DataFrame(
+        {
+            "Date": np.tile(dates, 2),
+            "Amount": np.r_[-rng.normal(60, 10, 720), -rng.normal(15, 3, 720)],
+            "Type": np.repeat(["Lifestyle", "Fun"], 720),
+            "Primary": np.repeat(["Groceries", "Restaurant"], 720),
+        }
+    )
+    # a house purchase & a lavish dinner
+    extra = pd.DataFrame(
+        {
+            "Date": pd.to_datetime(["2023-06-01", "2023-06-02"]),
+            "Amount": [-400000.0, -400.0],
+            "Type": ["Lifestyle", "Fun"],
+            "Primary": ["Groceries", "Restaurant"],
+        }
+    )
+    return pd.concat([df, extra], ignore_index=True)
+
+
+class TestControl(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.df = expenses_df()
+
+    def test_per_category(self) -> None:
+        controlled = ol.control(self.df, "Type")
+        self.assertNotIn(-400000.0, controlled.Amount.values)
+        self.assertNotIn(-400.0, controlled.Amount.values)
+        self.assertGreater(len(controlled), 0.98 * len(self.df))
+
+        # the global filter is distorted by the house, keeping the dinner
+        self.assertIn(-400.0, apply_stand_dev(self.df, 5).Amount.values)
+
+    def test_window(self) -> None:
+        controlled = ol.control(self.df, "Primary", window_months=6)
+        self.assertNotIn(-400000.0, controlled.Amount.values)
+        self.assertGreater(len(controlled), 0.98 * len(self.df))
+
+    def test_equal_amounts_kept(self) -> None:
+        df = pd.DataFrame({"Type": ["Fun"] * 5, "Amount": [-9.99] * 5})
+        self.assertEqual(len(ol.control(df)), 5)
+
+    def test_blank_category_kept(self) -> None:
+        blank = pd.DataFrame(
+            {
+                "Date": pd.to_datetime(["2023-06-03", "2023-06-04"]),
+                "Amount": [-900000.0, 900000.0],
+                "Type": [None, np.nan],
+                "Primary": [None, np.nan],
+            }
+        )
+        df = pd.concat([self.df, blank], ignore_index=True)
+        for window in [0, 6]:
+            controlled = ol.control(df, "Type", window_months=window)
+            self.assertIn(-900000.0, controlled.Amount.values)
+            self.assertIn(900000.0, controlled.Amount.values)
+        self.assertEqual(len(ol.control(blank)), 2)
+
+    def test_bounds(self) -> None:
+        limits = ol.bounds(self.df, "Type")
+        self.assertEqual(sorted(limits.index), ["Fun", "Lifestyle"])
+        self.assertTrue((limits.Lower < limits.Upper).all())
@@ -0,0 +1,134 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+import pyexcel_ods3 as ods
+from click.testing import CliRunner
+
+from scripts import archive as ar
+from scripts import categorize as ct
+from scripts import import_activity as ia
+from utils import aggregates as ag
+from utils import file_settings as fs
+from utils import partitions as pt
+from utils import synthetic as syn
+from utils import utils
+
+
+class TestPartitions(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.paths = syn.write_statements(self.directory.name, 400)
+        self.book = syn.workbook(400)
+        self.bank = utils.get_sheet_df(
+            self.book, fs.activity_page_bank(), fs.bank_dtype()
+        )
+        self.years = pt.row_years(self.bank, fs.activity_page_bank())
+        self.year = int(self.years.min())
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        for root, _, files in os.walk(self.directory.name):
+            for name in files:
+                os.chmod(os.path.join(root, name), stat.S_IRUSR | stat.S_IWUSR)
+        self.directory.cleanup()
+
+    def test_freeze(self) -> None:
+        rows = pt.freeze(self.book, self.year)
+        in_year = (self.years == self.year).sum()
+        self.assertEqual(rows[fs.activity_page_bank()], in_year)
+        self.assertEqual(
+            len(self.book[fs.activity_page_bank()]) - 1, len(self.bank) - in_year
+        )
+        self.assertEqual(pt.closed_years(), [self.year])
+
+        archived = pt.read_sheet(fs.activity_page_bank())
+        expected = self.bank[self.years == self.year].reset_index(drop=True)
+        pd.testing.assert_frame_equal(archived, expected)
+
+        path = os.path.join(fs.archive_dir(), str(self.year), "activity_bank.csv.gz")
+        self.assertFalse(os.stat(path).st_mode & stat.S_IWUSR)
+        self.assertEqual(pt.verify(), [])
+
+    def test_refuses_archived_and_open_years(self) -> None:
+        pt.freeze(self.book, self.year)
+        with self.assertRaises(ValueError):
+            pt.freeze(self.book, self.year)
+        with self.assertRaises(ValueError):
+            pt.freeze(self.book, pd.Timestamp.today().year)
+
+    def test_archive_years_together(self) -> None:
+        ods.save_data(fs.decrypted_file_name(), self.book)
+        today = pd.Timestamp.today().year
+
+        # the open year fails the command before the closed one is touched
+        result = CliRunner().invoke(ar.archive, [str(self.year), str(today)])
+        self.assertEqual(result.exit_code, 1)
+        self.assertEqual(pt.closed_years(), [])
+        book = ods.get_data(fs.decrypted_file_name())
+        self.assertEqual(
+            len(book[fs.activity_page_bank()]), len(self.book[fs.activity_page_bank()])
+        )
+
+        result = CliRunner().invoke(ar.archive, [str(self.year)])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(pt.closed_years(), [self.year])
+        book = ods.get_data(fs.decrypted_file_name())
+        self.assertEqual(
+            len(book[fs.activity_page_bank()]) - 1,
+            len(self.bank) - (self.years == self.year).sum(),
+        )
+
+    @patch("scripts.categorize.adjust_for_inflation", lambda row: row["Amount"])
+    def test_new_row_in_archived_month(self) -> None:
+        credit = utils.get_sheet_df(
+            self.book, fs.activity_page_credit(), fs.credit_dtype()
+        )
+        df_raw = ct.label_rows(ct.organized_concat_df(credit, self.bank))
+        self.book[fs.expenses_page()] = utils.df_to_sheet(
+            ct.simplify_rows(ct.inflate_rows(df_raw))
+        )
+        pt.freeze(self.book, self.year)
+        df_old = utils.get_sheet_df(self.book, fs.expenses_page(), fs.expenses_dtype())
+        ag.save_cube(ag.combine_cubes([pt.cube(), ag.build_cube(df_old)]))
+
+        # a late import dated in the closed year
+        row = df_old.iloc[:1].assign(
+            Date=pd.Timestamp(f"{self.year}-12-30"), Description="Airbnb"
+        )
+        df_new = pd.concat([df_old, row], ignore_index=True)
+        ct.update_aggregates(df_old, df_new)
+
+        expected = ag.combine_cubes([pt.cube(), ag.build_cube(df_new)])
+        self.assertTrue(ag.cubes_equal(ag.load_cube(), expected))
+        month = ag.load_cube()
+        month = month[month.Month == f"{self.year}-12"]
+        self.assertGreater(month.Count.sum(), 1)
+
+    def test_verify_detects_changes(self) -> None:
+        pt.freeze(self.book, self.year)
+        path = os.path.join(fs.archive_dir(), str(self.year), "activity_bank.csv.gz")
+        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+        with open(path, "ab") as file:
+            file.write(b"\0")
+        self.assertEqual(len(pt.verify()), 1)
+        with self.assertRaises(ValueError):
+            pt.read_sheet(fs.activity_page_bank())
+
+    def test_drop_archived(self) -> None:
+        pt.freeze(self.book, self.year)
+        df = ia.read_activity_csv(self.paths["bank"], "bank")
+        kept = ia.drop_archived(df, "bank", "synthetic bank")
+        self.assertEqual(len(kept), len(df) - (self.years == self.year).sum())
+        self.assertTrue(
+            (pt.row_years(kept, fs.activity_page_bank()) != self.year).all()
+        )
+
+        # another data source note is not a duplicate
+        self.assertEqual(len(ia.drop_archived(df, "bank", "other")), len(df))
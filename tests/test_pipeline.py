@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pyexcel_ods3 as ods
+from click.testing import CliRunner
+
+from scripts import pipeline as pl
+from utils import file_settings as fs
+from utils import synthetic as syn
+from utils import utils
+
+
+class TestImportStatements(unittest.TestCase):
+
+    def test_merge_in_memory(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = syn.write_statements(directory, 100)
+            book = syn.workbook(100)
+            bank_rows = len(book[fs.activity_page_bank()]) - 1
+
+            activity = pl.import_statements(
+                book, {"bank": [(paths["bank"], "synthetic bank")]}
+            )
+
+        # the same export again adds nothing
+        self.assertEqual(len(activity["bank"]), bank_rows)
+        self.assertEqual(len(book[fs.activity_page_bank()]) - 1, bank_rows)
+        self.assertIn("credit", activity)
+
+
+class TestPipeline(unittest.TestCase):
+
+    @patch("scripts.categorize.adjust_for_inflation", lambda row: row["Amount"])
+    @patch("scripts.pipeline.utils.open")
+    @patch("scripts.pipeline.ods.save_data", wraps=ods.save_data)
+    def test_saves_once(self, mock_save, mock_open) -> None:
+        runner = CliRunner()
+        with tempfile.TemporaryDirectory() as directory:
+            paths = syn.write_statements(directory, 200)
+            ods.save_data(
+                paths["workbook"], {fs.asset_page(): [list(fs.asset_dtype())]}
+            )
+            mock_save.reset_mock()
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                result = runner.invoke(
+                    pl.pipeline,
+                    [
+                        "--bank",
+                        paths["bank"],
+                        "bank",
+                        "--credit",
+                        paths["credit"],
+                        "credit",
+                        "--no-graph",
+                    ],
+                )
+                book = ods.get_data(fs.decrypted_file_name())
+                aggregates = os.path.exists(fs.aggregates_file_name())
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(mock_save.call_count, 1)
+        mock_open.assert_not_called()
+        self.assertTrue(aggregates)
+        df = utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+        self.assertEqual(len(df), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import quantile_sketch as qs
+
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(1)
+        self.df = pd.DataFrame(
+            {
+                "Type": np.repeat(["Fun", "Income"], 5000),
+                "Amount": np.r_[
+                    -rng.lognormal(3, 1, 5000), rng.lognormal(8, 0.3, 5000)
+                ],
+            }
+        )
+
+    def test_keys_ordered(self) -> None:
+        values = np.array([-1000.0, -2.5, -0.001, 0.0, 0.004, 0.01, 3.0, 1e6])
+        self.assertTrue((np.diff(qs.keys(values)) >= 0).all())
+        self.assertEqual(qs.keys(np.array([0.001]))[0], 0)
+
+    def test_relative_accuracy(self) -> None:
+        values = np.array([-250.75, 0.01, 3.5, 1234.56])
+        estimates = qs.key_values(qs.keys(values))
+        np.testing.assert_allclose(estimates, values, rtol=qs.ALPHA)
+
+    def test_quantiles(self) -> None:
+        found = qs.quantiles(qs.sketch(self.df, ["Type"]), ["Type"], [0.1, 0.5, 0.9])
+        for name, group in self.df.groupby("Type"):
+            np.testing.assert_allclose(
+                found.loc[name].to_numpy(),
+                np.quantile(group.Amount, [0.1, 0.5, 0.9], method="lower"),
+                rtol=qs.ALPHA * 1.5,
+            )
+
+    def test_merge_equals_whole(self) -> None:
+        halves = [qs.sketch(half, ["Type"]) for half in (self.df[::2], self.df[1::2])]
+        merged = qs.merge(halves, ["Type"]).sort_values(["Type", "Key"])
+        whole = qs.sketch(self.df, ["Type"]).sort_values(["Type", "Key"])
+        pd.testing.assert_frame_equal(
+            merged.reset_index(drop=True),
+            whole.reset_index(drop=True),
+            check_dtype=False,
+        )
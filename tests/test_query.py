@@ -0,0 +1,58 @@
+import unittest
+
+import pandas as pd
+
+from scripts import query as qr
+from utils import expenses_store as es
+
+
+class TestQuery(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.df = es.columnar(
+            pd.DataFrame(
+                {
+                    "data_source_note": ["bank", "credit", "credit", "credit"],
+                    "Date": ["2022-12-31", "2023-01-05", "2023-06-10", "2023-06-11"],
+                    "Amount": [-30.0, -40.0, -250.0, -45.5],
+                    "Description": [
+                        "BUC-EE GAS",
+                        "BUC-EE GAS #12",
+                        "AMAZON MKTP*1A2B",
+                        "7 ELEVEN GAS",
+                    ],
+                    "Primary": ["Fuel", "Fuel", "Shopping", "Fuel"],
+                    "Secondary": ["Gas", "Gas", "Retail", "Gas"],
+                    "Terciary": ["Buc-Ee", "Buc-Ee", "Amazon", "7-11"],
+                    "Type": ["Lifestyle", "Lifestyle", "Retail", "Lifestyle"],
+                }
+            )
+        )
+
+    def test_date_bounds(self) -> None:
+        lower, upper = qr.date_bounds("2023", "2023-06")
+        self.assertEqual(lower, pd.Timestamp("2023-01-01"))
+        self.assertEqual(upper.date(), pd.Timestamp("2023-06-30").date())
+
+    def test_year_and_primary(self) -> None:
+        df = qr.filter_expenses(self.df, "2023", "2023", primary=["fuel"])
+        self.assertEqual(df.Amount.sum(), -85.5)
+
+    def test_description_and_amount(self) -> None:
+        df = qr.filter_expenses(self.df, description="amazon", min_amount=200)
+        self.assertEqual(df.Description.tolist(), ["AMAZON MKTP*1A2B"])
+        df = qr.filter_expenses(self.df, description="gas", max_amount=40)
+        self.assertEqual(len(df), 2)
+
+    def test_group(self) -> None:
+        grouped = qr.group_expenses(self.df, ["year", "Primary"])
+        self.assertEqual(
+            grouped.columns.tolist(), ["year", "Primary", "Amount", "Count"]
+        )
+        fuel = grouped[(grouped.year == "2023") & (grouped.Primary == "Fuel")]
+        self.assertEqual(fuel.Amount.item(), -85.5)
+        self.assertEqual(fuel.Count.item(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import recurring as rc
+
+
+def _series(description, start, periods, freq, amount, primary="Subscription"):
+    dates = pd.date_range(start, periods=periods, freq=freq)
+    return pd.DataFrame(
+        {
+            "Date": dates.strftime("%Y-%m-%d"),
+            "Amount": amount,
+            "Description": [f"{description}*{i:04X}" for i in range(periods)],
+            "Primary": primary,
+            "Secondary": "Video",
+            "Type": "Fun",
+        }
+    )
+
+
+class TestNormalizeDescriptions(unittest.TestCase):
+
+    def test_volatile_tokens(self) -> None:
+        result = rc.normalize_descriptions(
+            pd.Series(["NETFLIX.COM*1A2B", "NETFLIX.COM*9Z8Y", "Shell 0042 Oil"])
+        )
+        self.assertEqual(
+            result.tolist(), ["NETFLIX.COM*0", "NETFLIX.COM*0", "Shell 0 Oil"]
+        )
+
+
+class TestDetect(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = np.random.default_rng(0)
+        noise = pd.DataFrame(
+            {
+                "Date": pd.to_datetime("2020-01-01")
+                + pd.to_timedelta(rng.integers(0, 1460, 300), unit="D"),
+                "Amount": -rng.lognormal(3, 1, 300).round(2),
+                "Description": "GROCERY STORE",
+                "Primary": "Shopping",
+                "Secondary": "Groceries",
+                "Type": "Lifestyle",
+            }
+        )
+        noise["Date"] = noise.Date.dt.strftime("%Y-%m-%d")
+        self.df = pd.concat(
+            [
+                noise,
+                _series("NETFLIX", "2021-01-15", 48, "MS", -15.49),
+                _series("GYM", "2023-10-02", 13, "W-MON", -12.0),
+                _series("DOMAIN", "2020-03-01", 4, "YS", -20.0),
+                _series("MAGAZINE", "2021-01-05", 10, "MS", -5.0),
+                _series("NEWSERVICE", "2024-10-01", 3, "MS", -9.99),
+            ],
+            ignore_index=True,
+        )
+        # payroll & transfers are never subscriptions
+        payroll = _series("PAYROLL", "2021-01-01", 48, "MS", 3000.0)
+        self.df = pd.concat([self.df, payroll.assign(Type="Income")])
+
+    def test_cadence_status_and_cost(self) -> None:
+        found = rc.detect(self.df, as_of="2024-12-20").set_index("Merchant")
+        # the reference after "*" of each charge is one merchant key
+
+        self.assertEqual(
+            sorted(found.index),
+            ["DOMAIN*0", "GYM*0", "MAGAZINE*0", "NETFLIX*0", "NEWSERVICE*0"],
+        )
+        self.assertEqual(found.loc["NETFLIX*0", "Cadence"], "monthly")
+        self.assertEqual(found.loc["NETFLIX*0", "Status"], "active")
+        self.assertAlmostEqual(found.loc["NETFLIX*0", "Annual"], -185.88)
+        self.assertEqual(found.loc["GYM*0", "Cadence"], "weekly")
+        self.assertEqual(found.loc["DOMAIN*0", "Cadence"], "annual")
+        self.assertEqual(found.loc["DOMAIN*0", "Status"], "active")
+        self.assertEqual(found.loc["MAGAZINE*0", "Status"], "lapsed")
+        self.assertEqual(found.loc["NEWSERVICE*0", "Status"], "new")
+
+    def test_inconsistent_amounts(self) -> None:
+        df = _series("UTILITY", "2022-01-01", 12, "MS", -50.0)
+        df["Amount"] = [-50.0, -120.0, -20.0, -90.0] * 3
+        self.assertTrue(rc.detect(df).empty)
@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from utils import rolling as rl
+
+
+def cube_df() -> pd.DataFrame:
+    months = pd.period_range("2021-01", periods=30, freq="M").strftime("%Y-%m")
+    rng = np.random.default_rng(0)
+    fuel = pd.DataFrame(
+        {
+            "Month": months,
+            "Type": "Lifestyle",
+            "Primary": "Fuel",
+            "Cents": rng.integers(-50000, 0, len(months)),
+        }
+    )
+    # a category with months missing & split over two cube rows in one month
+    food = pd.DataFrame(
+        {
+            "Month": ["2021-03", "2021-03", "2022-08"],
+            "Type": "Fun",
+            "Primary": "Restaurant",
+            "Cents": [-1000, -500, -2500],
+        }
+    )
+    return pd.concat([fuel, food], ignore_index=True)
+
+
+class TestRollingStats(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.cube = cube_df()
+        self.df = rl.rolling_stats(self.cube, "Primary")
+
+    def test_shape(self) -> None:
+        self.assertEqual(list(self.df.columns), rl.columns())
+        self.assertEqual(len(self.df), 30 * 2)
+
+    def test_matches_pandas_rolling(self) -> None:
+        fuel = self.df[self.df.Category == "Fuel"].set_index("Month")
+        amount = self.cube[self.cube.Primary == "Fuel"].set_index("Month").Cents / 100
+        for window in rl.WINDOWS:
+            np.testing.assert_allclose(
+                fuel[f"Mean{window}"], amount.rolling(window).mean(), atol=0.01
+            )
+            np.testing.assert_allclose(
+                fuel[f"Median{window}"], amount.rolling(window).median(), atol=0.01
+            )
+
+    def test_missing_months_are_zero(self) -> None:
+        food = self.df[self.df.Category == "Restaurant"].set_index("Month")
+        self.assertEqual(food.Amount["2021-03"], -15.0)
+        self.assertEqual(food.Amount["2021-04"], 0.0)
+        self.assertEqual(food.Mean3["2021-05"], -5.0)
+
+    def test_year_over_year(self) -> None:
+        food = self.df[self.df.Category == "Restaurant"].set_index("Month")
+        self.assertTrue(np.isnan(food.YoY["2022-11"]))
+        # 2022-01..2022-12 holds -25.00, 2021-01..2021-12 held -15.00, more spending
+        self.assertEqual(food.YoY["2022-12"], 10.0)
+        self.assertAlmostEqual(food.YoYPct["2022-12"], 66.67)
+
+    def test_empty(self) -> None:
+        self.assertTrue(rl.rolling_stats(self.cube.iloc[:0]).empty)
@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from utils import expense_patterns as ep
+from utils import file_settings as fs
+from utils import rule_file
+
+
+class TestRuleFile(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        ep.active_rules.cache_clear()
+        ep.compiled_patterns.cache_clear()
+        self.raw = {
+            "patterns": [
+                {"pattern": "(?i)Buc.*Ee.*Gas", "label": "Fuel: Gas: Buc-Ee"},
+                {"pattern": "(?i)Buc.*Ee", "label": "Shopping: Kiosk: Buc-Ee"},
+            ],
+            "types": [
+                {"type": "Lifestyle", "primary": ["Fuel"]},
+                {"type": "Retail", "primary": ["Shopping"]},
+                {"type": "Fun", "secondary": ["Kiosk"]},
+            ],
+        }
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+        ep.active_rules.cache_clear()
+        ep.compiled_patterns.cache_clear()
+
+    def write(self, raw: dict) -> None:
+        with open(fs.rules_file_name(), "w") as file:
+            json.dump(raw, file)
+
+    def test_validate(self) -> None:
+        bundle = rule_file.validate(self.raw)
+        self.assertEqual(
+            bundle["patterns"][0], ("(?i)Buc.*Ee.*Gas", "Fuel: Gas: Buc-Ee")
+        )
+        self.assertEqual(bundle["types"][2], ("Fun", "Secondary", ["Kiosk"]))
+
+    def test_invalid(self) -> None:
+        for broken in (
+            {"pattern": "(?i)Buc(", "label": "Fuel"},
+            {"pattern": "(?i)Shell", "label": ""},
+            {"pattern": "(?i)Buc.*Ee", "label": "Fuel"},
+            {"pattern": "(?i)Shell"},
+        ):
+            raw = {"patterns": self.raw["patterns"] + [broken], "types": []}
+            with self.assertRaises(ValueError):
+                rule_file.validate(raw, "rules.json")
+        with self.assertRaises(ValueError):
+            rule_file.validate({"patterns": [], "types": [{"type": "Fun"}]})
+        with self.assertRaises(ValueError):
+            rule_file.validate(
+                {**self.raw, "merchants": [{"pattern": "\\d+", "replace": None}]}
+            )
+
+    def test_cached_bundle(self) -> None:
+        self.write(self.raw)
+        bundle = rule_file.load(fs.rules_file_name())
+        with mock.patch.object(rule_file, "validate") as validate:
+            self.assertEqual(rule_file.load(fs.rules_file_name()), bundle)
+        validate.assert_not_called()
+
+        # an edited file is validated again
+        self.raw["patterns"].pop()
+        self.write(self.raw)
+        self.assertEqual(len(rule_file.load(fs.rules_file_name())["patterns"]), 1)
+
+    def test_dump_round_trip(self) -> None:
+        bundle = ep.default_rules()
+        self.assertEqual(rule_file.validate(json.loads(rule_file.dump(bundle))), bundle)
+
+    def test_active_rules(self) -> None:
+        self.write(self.raw)
+        df = pd.DataFrame(
+            {"Primary": ["Fuel", "Shopping"], "Secondary": ["Gas", "Kiosk"]}
+        )
+        self.assertEqual(ep.apply_expense_label("BUC-EE #12 GAS"), "Fuel: Gas: Buc-Ee")
+        self.assertEqual(
+            ep.apply_expense_label("BUC-EE #12"), "Shopping: Kiosk: Buc-Ee"
+        )
+        ep.apply_type(df)
+        self.assertEqual(df.Type.tolist(), ["Lifestyle", "Fun"])
+
+        # the file leaves the merchant rules out, the built-in ones apply
+        self.assertEqual(ep.active_rules()["merchants"], ep.merchant_rules)
+
+    def test_merchant_rules(self) -> None:
+        self.write({**self.raw, "merchants": [{"pattern": "#\\d+", "replace": ""}]})
+        keys = ep.merchant_keys(pd.Series(["BUC-EE #12 GAS", "BUC-EE #7 GAS"]))
+        self.assertEqual(keys.tolist(), ["BUC-EE GAS", "BUC-EE GAS"])
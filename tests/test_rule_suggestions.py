@@ -0,0 +1,70 @@
+import re
+import unittest
+
+import pandas as pd
+
+from utils import rule_suggestions as rs
+
+
+class TestNormalize(unittest.TestCase):
+
+    def test_letters_only(self) -> None:
+        result = rs.normalize(
+            pd.Series(["Shell Oil 57442#1 Gas Austin TX", "SQ *CORNER-SHOP"])
+        )
+        self.assertEqual(result.tolist(), ["SHELL OIL GAS AUSTIN", "SQ CORNER SHOP"])
+
+
+class TestCandidateRegex(unittest.TestCase):
+
+    def test_shared_tokens(self) -> None:
+        regex = rs.candidate_regex(["SQ CORNER SHOP AUSTIN TX", "SQ CORNER SHOP"])
+        self.assertEqual(regex, r"(?i)Sq.*Corner.*Shop")
+        self.assertTrue(re.search(regex, "SQ *CORNER SHOP #12 DENVER CO"))
+
+
+class TestClusters(unittest.TestCase):
+
+    def test_similar_texts_cluster(self) -> None:
+        texts = [
+            "HOLIDAY STATION AUSTIN TX",
+            "HOLIDAY STATION DENVER CO",
+            "HOLIDAY STATION",
+            "KWIK TRIP SEATTLE WA",
+            "KWIK TRIP",
+        ]
+        labels = rs.clusters(rs.signatures(texts))
+        self.assertEqual(len(set(labels[:3])), 1)
+        self.assertEqual(labels[3], labels[4])
+        self.assertNotEqual(labels[0], labels[3])
+
+
+class TestSuggest(unittest.TestCase):
+
+    def test_ranked_with_nearest_label(self) -> None:
+        unlabeled = pd.DataFrame(
+            {
+                "Grouping": [
+                    "HOLIDAY STATION #12 AUSTIN TX",
+                    "HOLIDAY STATION #9 DENVER CO",
+                    "KWIK TRIP #3",
+                    "BUC-EE GAS STATION #44",
+                ],
+                "Amount": [-40.0, -35.0, -10.0, -5.0],
+            }
+        )
+        reference = pd.DataFrame(
+            {"Grouping": ["BUC-EE GAS #1"], "Label": ["Fuel: Gas: Buc-Ee"]}
+        )
+        found = rs.suggest(unlabeled, reference)
+
+        self.assertEqual(found.columns.tolist(), rs.COLUMNS)
+        self.assertEqual(found.Regex.iloc[0], r"(?i)Holiday.*Station")
+        self.assertEqual(found.Rows.iloc[0], 2)
+        self.assertEqual(found.Dollars.iloc[0], 75.0)
+        buc_ee = found[found.Regex.str.contains("Buc")]
+        self.assertEqual(buc_ee.Label.item(), "Fuel: Gas: Buc-Ee")
+
+    def test_empty(self) -> None:
+        unlabeled = pd.DataFrame({"Grouping": [], "Amount": []})
+        self.assertTrue(rs.suggest(unlabeled, unlabeled).empty)
@@ -0,0 +1,69 @@
+import os
+import re
+import tempfile
+import unittest
+
+import pandas as pd
+
+from scripts import import_activity as ia
+from utils import expense_patterns as ep
+from utils import file_settings as fs
+from utils import synthetic as syn
+
+
+class TestPatternExample(unittest.TestCase):
+
+    def test_examples_match(self) -> None:
+        for pattern in (
+            r"(?i)Buc-Ee.*Gas",
+            r"(?i)Claim.*\d.*Health",
+            r"(?i)Alamo.*(Rest|Retail)",
+        ):
+            self.assertRegex(syn.pattern_example(pattern), re.compile(pattern))
+
+    def test_merchants_cover_patterns(self) -> None:
+        self.assertGreater(len(syn.merchants()), len(ep.patterns_expense) // 2)
+
+
+class TestStatements(unittest.TestCase):
+
+    def test_schemas(self) -> None:
+        self.assertListEqual(
+            syn.bank_csv_df(50).columns.tolist(), list(fs.bank_dtype())
+        )
+        self.assertListEqual(
+            syn.credit_csv_df(50).columns.tolist(), list(fs.credit_dtype())
+        )
+
+    def test_seeded(self) -> None:
+        pd.testing.assert_frame_equal(
+            syn.credit_csv_df(100, 3), syn.credit_csv_df(100, 3)
+        )
+        self.assertFalse(syn.credit_csv_df(100, 3).equals(syn.credit_csv_df(100, 4)))
+
+    def test_labeled(self) -> None:
+        labels = syn.credit_csv_df(300).Description.apply(ep.apply_expense_label)
+        self.assertTrue((labels != "").all())
+
+    def test_unlabeled_share(self) -> None:
+        labels = syn.bank_csv_df(2000, unlabeled=0.5).Description.apply(
+            ep.apply_expense_label
+        )
+        self.assertAlmostEqual((labels == "").mean(), 0.5, delta=0.1)
+
+    def test_written_files_import(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = syn.write_statements(directory, 100)
+            self.assertTrue(os.path.exists(paths["workbook"]))
+            bank = ia._get_csv_df_bank(paths["bank"])
+            credit = ia._get_csv_df_credit(paths["credit"])
+            self.assertEqual(len(bank) + len(credit), 100)
+            self.assertTrue((credit[fs.currency_column()] == "").all())
+
+    def test_currency_column_import(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "credit.csv")
+            df = syn.credit_csv_df(10)
+            df.assign(**{fs.currency_column(): "EUR"}).to_csv(path, index=False)
+            credit = ia._get_csv_df_credit(path)
+        self.assertTrue((credit[fs.currency_column()] == "EUR").all())
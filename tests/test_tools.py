@@ -0,0 +1,59 @@
+import os
+import re
+import subprocess
+import sys
+import unittest
+from typing import Set, Tuple
+
+import click
+
+import tools
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# seconds of cumulative import time (python -X importtime), generous for slow machines
+HELP_BUDGET = 0.25
+ENCRYPT_BUDGET = 0.5
+
+HEAVY_MODULES = {"pandas", "numpy", "matplotlib", "seaborn", "pyexcel_ods3", "scipy"}
+
+
+def import_profile(*args: str) -> Tuple[Set[str], float]:
+    """Top level modules imported & total import seconds for a tools.py invocation"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "tools.py", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules, total = set(), 0
+    for line in result.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+\d+ \|\s+(\S+)", line)
+        if match:
+            total += int(match.group(1))
+            modules.add(match.group(2).split(".")[0])
+    return modules, total / 1e6
+
+
+class TestLazyCommands(unittest.TestCase):
+
+    def test_commands_resolve(self) -> None:
+        for name in tools.LAZY_COMMANDS:
+            command = tools.cli.get_command(click.Context(tools.cli), name)
+            self.assertIsInstance(command, click.Command)
+            self.assertEqual(command.name, name)
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_help(self) -> None:
+        modules, seconds = import_profile("--help")
+        self.assertFalse(modules & HEAVY_MODULES)
+        self.assertLess(seconds, HELP_BUDGET)
+
+    def test_encrypt(self) -> None:
+        modules, seconds = import_profile("encrypt", "--help")
+        self.assertIn("cryptography", modules)
+        self.assertFalse(modules & HEAVY_MODULES)
+        self.assertLess(seconds, ENCRYPT_BUDGET)
@@ -0,0 +1,62 @@
+import unittest
+
+import pandas as pd
+
+from utils import transfers as tr
+
+
+class TestLinkIds(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.bank = pd.DataFrame(
+            {
+                "Posting Date": [
+                    "01/10/2024",
+                    "01/11/2024",
+                    "02/01/2024",
+                    "03/01/2024",
+                ],
+                "Amount": [-500.0, -500.0, -20.0, 100.0],
+            }
+        )
+        self.credit = pd.DataFrame(
+            {
+                "Post Date": ["01/12/2024", "01/09/2024", "02/10/2024", "03/02/2024"],
+                "Amount": [500.0, 500.0, 20.0, 100.0],
+            }
+        )
+
+    def test_pairs_one_to_one(self) -> None:
+        bank, credit = tr.link_ids(self.bank, self.credit, 3)
+        self.assertEqual(bank.tolist(), ["T1", "T2", "", ""])
+        self.assertEqual(credit.tolist(), ["T2", "T1", "", ""])
+
+    def test_window(self) -> None:
+        bank, credit = tr.link_ids(self.bank, self.credit, 9)
+        # 20.00 is 9 days apart, 100.00 has the same sign on both sides
+        self.assertEqual(bank.tolist()[2:], ["T3", ""])
+        self.assertEqual(credit.tolist()[2:], ["T3", ""])
+
+    def test_empty(self) -> None:
+        bank, credit = tr.link_ids(self.bank.iloc[0:0], self.credit, 3)
+        self.assertTrue(bank.empty)
+        self.assertEqual(credit.tolist(), ["", "", "", ""])
+
+    def test_reverse_sign(self) -> None:
+        # a deposit & a card purchase of the same amount are not a payment
+        bank = pd.DataFrame({"Posting Date": ["01/10/2024"], "Amount": [50.0]})
+        credit = pd.DataFrame({"Post Date": ["01/11/2024"], "Amount": [-50.0]})
+        bank_links, credit_links = tr.link_ids(bank, credit, 3)
+        self.assertEqual(bank_links.tolist(), [""])
+        self.assertEqual(credit_links.tolist(), [""])
+
+    def test_payment_type(self) -> None:
+        credit = self.credit.assign(Type=["Payment", "Return", "Payment", "Sale"])
+        bank, credit_links = tr.link_ids(self.bank, credit, 3)
+        # the one payment pairs the nearer of the two debits
+        self.assertEqual(bank.tolist(), ["", "T1", "", ""])
+        self.assertEqual(credit_links.tolist(), ["T1", "", "", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -52,3 +52,17 @@ class TestFunctions(unittest.TestCase):
             pass  # Expected since "dummy_file.ods" doesn't exist
         except Exception as e:
             self.fail(f"open() raised {e}")
+
+    def test_get_sheet_df_short_rows(self) -> None:
+        book = {"sheet": [["Date", "Amount", "Note"], ["2023-01-01", 5.0]]}
+        df = utils.get_sheet_df(
+            book, "sheet", {"Date": "str", "Amount": float, "Note": "str"}
+        )
+        self.assertListEqual(df.columns.tolist(), ["Date", "Amount", "Note"])
+        self.assertEqual(df.Note.iloc[0], "")
+
+    @patch("builtins.print")
+    def test_write_frame(self, mock_print) -> None:
+        df = pd.DataFrame({"Primary": ["Fuel"], "Amount": [-10.5]})
+        utils.write_frame(df, "csv")
+        mock_print.assert_called_once_with("Primary,Amount\nFuel,-10.5\n")
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+import pyexcel_ods3 as ods
+from click.testing import CliRunner
+
+from scripts import categorize as ct
+from scripts import import_activity as ia
+from scripts import watch as wt
+from utils import file_settings as fs
+from utils import synthetic as syn
+from utils import utils
+
+
+class TestDetectType(unittest.TestCase):
+
+    def test_headers(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            paths = syn.write_statements(directory, 20)
+            other = os.path.join(directory, "other.csv")
+            pd.DataFrame({"Date": ["01/01/2024"]}).to_csv(other, index=False)
+
+            self.assertEqual(wt.detect_type(paths["bank"]), "bank")
+            self.assertEqual(wt.detect_type(paths["credit"]), "credit")
+            self.assertEqual(wt.detect_type(other), "")
+
+            binary = os.path.join(directory, "binary.csv")
+            with open(binary, "wb") as file:
+                file.write(b"\xff\xfe\x00\x81 not an export")
+            self.assertEqual(wt.detect_type(binary), "")
+
+
+@patch("scripts.categorize.adjust_for_inflation", lambda row: row["Amount"])
+class TestLedger(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = syn.write_statements(self.directory.name, 200)
+        ods.save_data(self.paths["workbook"], {fs.asset_page(): [["Action"]]})
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_add_skips_duplicates(self) -> None:
+        ledger = wt.Ledger(fs.decrypted_file_name())
+        df = ia.read_activity_csv(self.paths["bank"], "bank")
+        self.assertEqual(ledger.add("bank", df, "bank"), len(df))
+        self.assertEqual(ledger.add("bank", df, "bank"), 0)
+
+    def test_incremental_matches_full(self) -> None:
+        ledger = wt.Ledger(fs.decrypted_file_name())
+        rows, skipped = wt.ingest(
+            ledger, [self.paths["bank"]], {"bank": "bank", "credit": "credit"}
+        )
+        self.assertEqual(rows, 60)
+        rows, skipped = wt.ingest(
+            ledger, [self.paths["credit"]], {"bank": "bank", "credit": "credit"}
+        )
+        self.assertEqual((rows, skipped), (140, []))
+
+        credit_df = ia.read_activity_csv(self.paths["credit"], "credit")
+        bank_df = ia.read_activity_csv(self.paths["bank"], "bank")
+        df_raw = ct.label_rows(
+            ct.organized_concat_df(
+                credit_df.assign(data_source_note="credit"),
+                bank_df.assign(data_source_note="bank"),
+            )
+        )
+        expected = ct.simplify_rows(ct.inflate_rows(df_raw))
+
+        book = ods.get_data(fs.decrypted_file_name())
+        saved = utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype())
+        columns = list(fs.expenses_dtype())
+        pd.testing.assert_frame_equal(
+            saved[columns].sort_values(columns).reset_index(drop=True),
+            expected[columns].sort_values(columns).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    def test_missing_rate_keeps_activity(self) -> None:
+        ledger = wt.Ledger(fs.decrypted_file_name())
+        with patch(
+            "scripts.categorize.inflate_rows",
+            side_effect=ValueError("No rate in finance_fx.csv for EUR"),
+        ):
+            rows, _ = wt.ingest(
+                ledger, [self.paths["bank"]], {"bank": "bank", "credit": "credit"}
+            )
+        self.assertEqual(rows, 60)
+
+        book = ods.get_data(fs.decrypted_file_name())
+        self.assertEqual(len(book[fs.activity_page_bank()]) - 1, 60)
+        self.assertNotIn(fs.expenses_page(), book)
+
+    def test_malformed_export_skipped(self) -> None:
+        df = pd.read_csv(self.paths["bank"], dtype=str, keep_default_na=False)
+        df.loc[0, "Posting Date"] = "13/45/2024"
+        df.to_csv(self.paths["bank"], index=False)
+
+        ledger = wt.Ledger(fs.decrypted_file_name())
+        rows, _ = wt.ingest(
+            ledger,
+            [self.paths["bank"], self.paths["credit"]],
+            {"bank": "bank", "credit": "credit"},
+        )
+        # the credit export is still ingested
+        self.assertEqual(rows, 140)
+
+    def test_watch_once(self) -> None:
+        result = CliRunner().invoke(wt.watch, [".", "--once"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue(os.path.exists(fs.aggregates_file_name()))
+
+
+if __name__ == "__main__":
+    unittest.main()
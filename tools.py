@@ -1,22 +1,141 @@
+import importlib
+from typing import Dict, List, Tuple
+
 import click
 
-from scripts import categorize, encrypt, graph, import_activity
+from utils import arrow, instrument
+
+# name: ("module:attribute", short help), imported only once the command is invoked
+LAZY_COMMANDS: Dict[str, Tuple[str, str]] = {
+    "encrypt": (
+        "scripts.encrypt:encrypt",
+        "Encrypt finance.ods to finance_encrypted.ods",
+    ),
+    "decrypt": (
+        "scripts.encrypt:decrypt",
+        "Decrypt finance_encrypted.ods to finance.ods",
+    ),
+    "import-activity": (
+        "scripts.import_activity:import_activity",
+        "Import CSV financial activity data, ignoring duplicate entries",
+    ),
+    "categorize": (
+        "scripts.categorize:categorize",
+        "Label & type the imported activity",
+    ),
+    "suggest-rules": (
+        "scripts.suggest_rules:suggest_rules",
+        "Suggest expense patterns for unlabeled activity",
+    ),
+    "export-rules": (
+        "scripts.rules:export_rules",
+        "Write the categorization rules to an editable rules file",
+    ),
+    "check-rules": (
+        "scripts.rules:check_rules",
+        "Validate the rules file & prepare its cached bundle",
+    ),
+    "graph": ("scripts.graph:graph", "Graph the categorized expenses"),
+    "pipeline": (
+        "scripts.pipeline:pipeline",
+        "Import, categorize & graph in one process",
+    ),
+    "query": (
+        "scripts.query:query",
+        "Filter, group & sum the categorized expenses",
+    ),
+    "trends": (
+        "scripts.trends:trends",
+        "Trailing averages & year over year change per category",
+    ),
+    "report": (
+        "scripts.report:report",
+        "Write the figures to a single interactive HTML file",
+    ),
+    "forecast": (
+        "scripts.forecast:forecast",
+        "Simulate future cash flow & savings from the history",
+    ),
+    "subscriptions": (
+        "scripts.subscriptions:subscriptions",
+        "Find recurring charges & their annualized cost",
+    ),
+    "aggregate": (
+        "scripts.aggregate:aggregate",
+        "Verify or rebuild the stored monthly aggregates",
+    ),
+    "archive": (
+        "scripts.archive:archive",
+        "Freeze closed years into read-only archives",
+    ),
+    "watch": (
+        "scripts.watch:watch",
+        "Import & categorize statements as they arrive in a directory",
+    ),
+    "synthesize": (
+        "scripts.benchmark:synthesize",
+        "Write seeded synthetic statements & workbook",
+    ),
+    "benchmark": (
+        "scripts.benchmark:benchmark",
+        "Time every pipeline stage over synthetic ledgers",
+    ),
+}
+
+
+class LazyGroup(click.Group):
+    """Click group that imports a subcommand's module (and its dependencies) on use"""
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted(set(super().list_commands(ctx)) | set(LAZY_COMMANDS))
 
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command:
+        if cmd_name not in LAZY_COMMANDS:
+            return super().get_command(ctx, cmd_name)
 
-@click.group()
-def cli() -> None:
+        module_name, attribute = LAZY_COMMANDS[cmd_name][0].split(":")
+        return getattr(importlib.import_module(module_name), attribute)
+
+    def format_commands(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        """List commands from their registered help, without importing them"""
+        rows = [(name, LAZY_COMMANDS[name][1]) for name in sorted(LAZY_COMMANDS)]
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup)
+@click.option(
+    "--timings",
+    is_flag=True,
+    help="Print wall time, CPU time, rows & peak memory of each stage.",
+)
+@click.option(
+    "--trace",
+    type=str,
+    default="",
+    help="Write the stage timings to a Chrome trace JSON file.",
+)
+@click.option(
+    "--arrow",
+    "arrow_strings",
+    is_flag=True,
+    help="Parse CSVs with pyarrow & hold text as Arrow strings (needs pyarrow).",
+)
+@click.pass_context
+def cli(ctx: click.Context, timings: bool, trace: str, arrow_strings: bool) -> None:
     """
     Run financial analysis on finance.ods within the git directoy.
     For results to be seen, file must be closed before running any scripts.
     """
-    pass
-
+    try:
+        arrow.configure(arrow_strings)
+    except ImportError as error:
+        raise click.UsageError(str(error)) from error
+    instrument.configure(timings, trace)
+    ctx.call_on_close(instrument.report)
 
-cli.add_command(encrypt.encrypt)
-cli.add_command(encrypt.decrypt)
-cli.add_command(import_activity.import_activity)
-cli.add_command(categorize.categorize)
-cli.add_command(graph.graph)
 
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,150 @@
+"""
+Persistent monthly aggregate cube of the categorized expenses.
+
+The cube holds one row per (Month, Type, Primary, Secondary, Terciary, data_source_note)
+with the summed amount in integer cents and the transaction count. Amounts are kept in
+cents so an incrementally updated cube is identical to one built from scratch.
+"""
+
+import os
+from typing import Iterable, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from utils import dates as dt
+from utils import file_settings as fs
+
+
+def cube_keys() -> list:
+    return ["Month", "Type", "Primary", "Secondary", "Terciary", "data_source_note"]
+
+
+def _empty_cube() -> pd.DataFrame:
+    df = pd.DataFrame(columns=cube_keys() + ["Cents", "Count"])
+    return df.astype({"Cents": "int64", "Count": "int64"})
+
+
+def _months(dates: pd.Series) -> pd.Series:
+    return dt.months(dates)
+
+
+def _canonical(cube: pd.DataFrame) -> pd.DataFrame:
+    """Fixed row order & dtypes, so cubes compare equal regardless of how they were built"""
+    cube = cube[cube_keys() + ["Cents", "Count"]]
+    cube = cube.astype({key: str for key in cube_keys()})
+    cube = cube.astype({"Cents": "int64", "Count": "int64"})
+    return cube.sort_values(cube_keys()).reset_index(drop=True)
+
+
+def build_cube(df_arg: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate categorized expenses (the expenses sheet) into the monthly cube"""
+    if df_arg.empty:
+        return _empty_cube()
+
+    df = df_arg[["Date", "Amount"] + cube_keys()[1:]].copy()
+    df["Month"] = _months(df.Date)
+    df["Cents"] = np.round(df.Amount.astype(float) * 100).astype("int64")
+    df["Count"] = 1
+    for key in cube_keys():
+        df[key] = df[key].astype(object).fillna("").astype(str)
+
+    cube = df.groupby(cube_keys(), as_index=False)[["Cents", "Count"]].sum()
+    return _canonical(cube)
+
+
+def touched_months(df_old: pd.DataFrame, df_new: pd.DataFrame) -> Set[str]:
+    """Months holding rows that were added, removed or changed between two expenses frames"""
+    columns = ["Date", "Amount"] + cube_keys()[1:]
+
+    def _row_counts(df: pd.DataFrame) -> pd.Series:
+        rows = df[columns].copy()
+        rows["Date"] = dt.parse(rows.Date)
+        rows["Amount"] = np.round(rows.Amount.astype(float) * 100).astype("int64")
+        for key in cube_keys()[1:]:
+            rows[key] = rows[key].fillna("").astype(str)
+        return rows.value_counts()
+
+    if df_old.empty or df_new.empty:
+        frames = [df.Date for df in (df_old, df_new) if not df.empty]
+        return set(_months(pd.concat(frames))) if frames else set()
+
+    counts = pd.concat(
+        [_row_counts(df_old), _row_counts(df_new)], axis=1, keys=["old", "new"]
+    ).fillna(0)
+    changed = counts[counts.old != counts.new]
+    if changed.empty:
+        return set()
+
+    return set(changed.index.get_level_values("Date").strftime("%Y-%m"))
+
+
+def update_cube(
+    cube: pd.DataFrame,
+    df_new: pd.DataFrame,
+    months: Iterable[str],
+    archived: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """
+    Rebuild only the given months of the cube from the new expenses frame.
+
+    :param archived: cube of the archived years, whose cells of the given months are
+    added back, as a new row may be dated in a closed year
+    """
+    months = set(months)
+    if not months:
+        return _canonical(cube)
+
+    kept = cube[~cube.Month.isin(months)]
+    rebuilt = build_cube(df_new[_months(df_new.Date).isin(months)])
+    if archived is not None:
+        rebuilt = combine_cubes([archived[archived.Month.isin(months)], rebuilt])
+    frames = [frame for frame in (kept, rebuilt) if not frame.empty]
+    if not frames:
+        return _empty_cube()
+
+    return _canonical(pd.concat(frames, ignore_index=True))
+
+
+def combine_cubes(cubes: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """One cube of the cells of several, summed where they share a cell"""
+    frames = [cube for cube in cubes if not cube.empty]
+    if not frames:
+        return _empty_cube()
+
+    combined = pd.concat(frames, ignore_index=True)
+    combined = combined.astype({key: str for key in cube_keys()})
+    return _canonical(
+        combined.groupby(cube_keys(), as_index=False)[["Cents", "Count"]].sum()
+    )
+
+
+def cubes_equal(left: pd.DataFrame, right: pd.DataFrame) -> bool:
+    return _canonical(left).equals(_canonical(right))
+
+
+def load_cube(file: str = "") -> pd.DataFrame:
+    file = file or fs.aggregates_file_name()
+    if not os.path.exists(file):
+        return _empty_cube()
+
+    cube = pd.read_csv(
+        file,
+        dtype={key: str for key in cube_keys()},
+        keep_default_na=False,
+    )
+    return _canonical(cube)
+
+
+def save_cube(cube: pd.DataFrame, file: str = "") -> None:
+    file = file or fs.aggregates_file_name()
+    _canonical(cube).to_csv(file, index=False)
+
+
+def cube_to_frame(cube: pd.DataFrame) -> pd.DataFrame:
+    """Present the cube in the shape of graph.df_base, one row per month & category"""
+    df = cube.copy()
+    df["Date"] = pd.to_datetime(df.Month, format="%Y-%m") + pd.offsets.MonthEnd(0)
+    df["Amount"] = df.Cents / 100
+    df = df[["Date", "Amount", "Primary", "Secondary", "Terciary", "Type"]]
+    return df.sort_values("Date").reset_index(drop=True)
@@ -0,0 +1,168 @@
+"""
+Property & loan engine over the asset sheet.
+
+Every schedule is computed for all assets at once on a (asset x month) grid with the
+closed form fixed rate amortization, so dozens of assets over a 30 year horizon cost a
+handful of array operations rather than a Python loop per month.
+
+Asset sheet conventions
+    - a row with a Loan Total (or a Valuation & Down) originates the asset's loan on Date,
+      the latest such row wins (e.g. a refinance)
+    - Fixed Rate is the annual percent, 6.5 or "6.5%" (so 1 is 1%, not 100%)
+    - PMI is the monthly premium, paid until PMI End or, without one, until the balance
+      falls to pmi_ltv() of the valuation
+    - an Action of "Sell" ends the asset's schedule on its Date
+"""
+
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from utils import file_settings as fs
+
+
+def pmi_ltv() -> float:
+    """Loan to value at which PMI is automatically dropped"""
+    return 0.78
+
+
+def to_number(series: pd.Series) -> pd.Series:
+    """Sheet strings such as "$1,200.50" or "6.5%" to floats, blanks to 0"""
+    cleaned = series.astype(str).str.replace(r"[$,%\s]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").fillna(0.0)
+
+
+def loans(df_assets: pd.DataFrame) -> pd.DataFrame:
+    """One row per asset with a loan, the numeric terms the engine needs"""
+    df = df_assets.copy()
+    df["Date"] = pd.to_datetime(df.Date, errors="coerce")
+    for column in (
+        "Valuation",
+        "Loan Total",
+        "Down",
+        "Fixed Rate",
+        "PMI",
+        "Monthly Recurring Income",
+        "Monthly Recurring Expense",
+    ):
+        df[column] = to_number(df[column])
+
+    df["Loan Total"] = np.where(
+        (df["Loan Total"] == 0) & (df.Valuation > 0) & (df.Down > 0),
+        df.Valuation - df.Down,
+        df["Loan Total"],
+    )
+    df["Fixed Rate"] = df["Fixed Rate"] / 100
+    df["PMI End"] = pd.to_datetime(df["PMI End"], errors="coerce")
+
+    sold = df[df.Action.str.strip().str.lower() == "sell"].groupby("Asset").Date.min()
+
+    df = df[(df["Loan Total"] > 0) & df.Date.notna()]
+    df = df.sort_values("Date").groupby("Asset").tail(1)
+    df["Sold"] = df.Asset.map(sold)
+
+    return df[
+        [
+            "Asset",
+            "Date",
+            "Valuation",
+            "Loan Total",
+            "Fixed Rate",
+            "PMI",
+            "PMI End",
+            "Monthly Recurring Income",
+            "Monthly Recurring Expense",
+            "Sold",
+        ]
+    ].reset_index(drop=True)
+
+
+def _month_number(dates: pd.Series, missing: int) -> np.ndarray:
+    """Months since year 0, missing dates become the given value"""
+    numbers = dates.dt.year * 12 + dates.dt.month - 1
+    return numbers.fillna(missing).astype("int64").to_numpy()
+
+
+def _balance_after(
+    principal: np.ndarray, rate: np.ndarray, payment: np.ndarray, k: np.ndarray
+) -> np.ndarray:
+    """Remaining balance after k payments, closed form of the fixed rate recurrence"""
+    safe_rate = np.where(rate > 0, rate, 1.0)
+    growth = (1 + rate) ** k
+    balance = np.where(
+        rate > 0,
+        principal * growth - payment * (growth - 1) / safe_rate,
+        principal - payment * k,
+    )
+    return np.clip(balance, 0, None)
+
+
+def schedules(
+    df_loans: pd.DataFrame, horizon_months: int = 0
+) -> Dict[str, pd.DataFrame]:
+    """
+    Monthly amortization, PMI, equity & net cash flow of every loan.
+
+    Each frame is indexed by calendar month end with one column per asset, from the
+    first loan's start for horizon_months, or until every loan is paid off. Months
+    before an asset's loan starts, or after it was sold, are 0.
+    """
+    term = fs.loan_term_months()
+    never = 10**9  # month number of a date that never comes
+
+    start = _month_number(df_loans.Date, 0)
+    first = start.min() if len(start) else 0
+    # by default until the latest loan is paid off
+    last = first + horizon_months if horizon_months else start.max(initial=0) + term
+    months = np.arange(first, last + 1)
+
+    # payments due by each calendar month, one row per asset
+    elapsed = months[None, :] - start[:, None]
+    held = months[None, :] <= _month_number(df_loans.Sold, never)[:, None]
+    owned = (elapsed >= 0) & held
+    paying = (elapsed >= 1) & (elapsed <= term) & held
+
+    principal = df_loans["Loan Total"].to_numpy()[:, None]
+    rate = (df_loans["Fixed Rate"].to_numpy() / 12)[:, None]
+    safe_rate = np.where(rate > 0, rate, 1.0)
+    payment = np.where(
+        rate > 0,
+        principal * safe_rate / (1 - (1 + safe_rate) ** -term),
+        principal / term,
+    )
+
+    balance = _balance_after(principal, rate, payment, np.clip(elapsed, 0, term))
+    previous = _balance_after(principal, rate, payment, np.clip(elapsed - 1, 0, term))
+    balance = np.where(owned, balance, 0.0)
+
+    interest = np.where(paying, previous * rate, 0.0)
+    payment_made = np.where(paying, np.minimum(payment, previous + interest), 0.0)
+
+    valuation = df_loans.Valuation.to_numpy()[:, None]
+    has_pmi_end = df_loans["PMI End"].notna().to_numpy()[:, None]
+    pmi_until = _month_number(df_loans["PMI End"], never)[:, None]
+    above_ltv = previous > valuation * pmi_ltv()
+    pmi_due = paying & np.where(has_pmi_end, months[None, :] < pmi_until, above_ltv)
+    pmi = np.where(pmi_due, df_loans.PMI.to_numpy()[:, None], 0.0)
+
+    income = df_loans["Monthly Recurring Income"].to_numpy()[:, None]
+    expense = df_loans["Monthly Recurring Expense"].to_numpy()[:, None]
+    recurring = np.where(owned, income - expense, 0.0)
+
+    # period ordinals count months from 1970-01
+    index = pd.PeriodIndex.from_ordinals(months - 1970 * 12, freq="M")
+    index = index.to_timestamp(how="end").normalize()
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values.T, index=index, columns=df_loans.Asset.tolist())
+
+    return {
+        "balance": frame(balance),
+        "payment": frame(payment_made),
+        "interest": frame(interest),
+        "principal": frame(payment_made - interest),
+        "pmi": frame(pmi),
+        "equity": frame(np.where(owned, valuation - balance, 0.0)),
+        "net_cash_flow": frame(recurring - payment_made - pmi),
+    }
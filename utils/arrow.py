@@ -0,0 +1,57 @@
+"""
+Optional Arrow backed strings for CSV import & sheet frames (tools.py --arrow).
+
+With pyarrow installed & the mode on, statement exports are parsed by the pyarrow CSV
+engine and text columns are held as string[pyarrow], so building Groupings, stripping &
+splitting labels run as Arrow compute kernels rather than loops over Python objects.
+Frames reach the workbook as plain values, so results are identical in either mode.
+
+Imports nothing heavy, tools.py configures it before any command runs.
+"""
+
+import importlib.util
+from typing import TYPE_CHECKING, Any, Dict, Iterable
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_STATE = {"enabled": False}
+
+
+def available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def configure(enabled: bool = False) -> None:
+    if enabled and not available():
+        raise ImportError("Arrow mode needs pyarrow, pip install pyarrow")
+    _STATE["enabled"] = enabled
+
+
+def enabled() -> bool:
+    return _STATE["enabled"]
+
+
+def string_dtype() -> Any:
+    """dtype of text columns, str (object) unless Arrow mode is on"""
+    return "string[pyarrow]" if enabled() else str
+
+
+def csv_options() -> Dict[str, Any]:
+    """Extra pandas.read_csv arguments of the mode"""
+    return {"engine": "pyarrow"} if enabled() else {}
+
+
+def is_text(series: "pd.Series") -> bool:
+    """Whether a column holds text, as Python objects or as a pandas string dtype"""
+    import pandas as pd
+
+    return series.dtype == "object" or isinstance(series.dtype, pd.StringDtype)
+
+
+def strings(df: "pd.DataFrame", columns: Iterable[str]) -> "pd.DataFrame":
+    """df with the given columns in the mode's string dtype, unchanged when it is off"""
+    if string_dtype() is str:
+        return df
+    columns = [column for column in columns if column in df.columns]
+    return df.astype({column: string_dtype() for column in columns})
@@ -0,0 +1,37 @@
+"""
+Small shared thread pool, overlapping the independent steps of a command.
+
+Loading the workbook, parsing statement CSVs and decrypting are independent until their
+results are joined, and much of each runs outside the GIL (zip inflate, pandas' CSV
+parser, the cipher), so running them side by side brings a command's latency toward its
+longest step rather than the sum of them all.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from utils import instrument
+
+MAX_WORKERS = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="finance")
+    return _executor
+
+
+def submit(name: str, func: Callable[..., Any], *args: Any) -> Future:
+    """Run func(*args) in the pool as a stage of that name, rows of a frame result"""
+
+    def run() -> Any:
+        with instrument.stage(name) as stage:
+            result = func(*args)
+            if hasattr(result, "columns"):
+                stage["rows"] = len(result)
+        return result
+
+    return executor().submit(run)
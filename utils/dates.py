@@ -0,0 +1,97 @@
+"""
+Dates of the sheets & exports, parsed once into datetime64 and formatted only on save.
+
+The bank & credit exports write dates as MM/DD/YYYY and the workbook as YYYY-MM-DD, so
+text is parsed against those known formats rather than inferred row by row, and only
+what is left, such as a date cell read back as "2021-01-10 00:00:00" or a hand typed
+1/5/21, is inferred. A ledger has far fewer distinct dates than rows, so each distinct
+text is parsed once and the result broadcast back. Columns already typed pass through
+untouched, which lets frames stay typed through every in-memory step and cache until
+they are written to the sheet.
+"""
+
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from utils import file_settings as fs
+
+
+def formats() -> tuple:
+    """Known date formats, the most common first"""
+    return fs.export_date_format(), fs.sheet_date_format()
+
+
+def parse(values: pd.Series) -> pd.Series:
+    """datetime64 of each date, NaT for blanks & text that is not a date"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+
+    codes, texts = pd.factorize(values.astype(object), use_na_sentinel=True)
+    texts = pd.Series(texts, dtype=object).astype(str).str.strip()
+    parsed = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[ns]")
+    for date_format in formats():
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(
+            texts[missing], format=date_format, errors="coerce"
+        )
+    missing = parsed.isna() & (texts != "")
+    if missing.any():
+        parsed[missing] = pd.to_datetime(
+            texts[missing], format="mixed", errors="coerce"
+        )
+
+    # a blank or missing value has code -1 and maps to NaT
+    result = np.append(parsed.to_numpy(), np.datetime64("NaT", "ns"))[codes]
+    return pd.Series(result, index=values.index, name=values.name)
+
+
+def typed(df: pd.DataFrame, columns: Iterable[str]) -> pd.DataFrame:
+    """
+    df with its date columns parsed, the others as they were.
+
+    :raises ValueError: when a non-blank value is not a date, rather than save it blank
+    """
+    columns = [column for column in columns if column in df.columns]
+    if not columns:
+        return df
+
+    parsed = {}
+    for column in columns:
+        parsed[column] = parse(df[column])
+        blank = df[column].isna() | (df[column].astype(str).str.strip() == "")
+        invalid = df[column][parsed[column].isna() & ~blank].unique()
+        if len(invalid):
+            raise ValueError(f"{column} is not a date: {', '.join(map(str, invalid))}")
+    return df.assign(**parsed)
+
+
+def text(dates: pd.Series) -> pd.Series:
+    """Sheet text of each date, blank for NaT, formatted once per distinct date"""
+    codes, distinct = pd.factorize(dates, use_na_sentinel=True)
+    labels = np.append(distinct.strftime(fs.sheet_date_format()).to_numpy(object), "")
+    return pd.Series(labels[codes], index=dates.index, name=dates.name)
+
+
+def as_text(df: pd.DataFrame) -> pd.DataFrame:
+    """df with every datetime column formatted as sheet text, for writing it out"""
+    columns = [
+        column
+        for column in df.columns
+        if pd.api.types.is_datetime64_any_dtype(df[column])
+    ]
+    if not columns:
+        return df
+    return df.assign(**{column: text(df[column]) for column in columns})
+
+
+def months(dates: pd.Series) -> pd.Series:
+    """YYYY-MM of each date, formatted once per distinct month"""
+    dates = parse(dates)
+    numbers = dates.dt.year * 12 + dates.dt.month - 1
+    codes, distinct = pd.factorize(numbers, use_na_sentinel=True)
+    labels = [f"{int(n) // 12:04d}-{int(n) % 12 + 1:02d}" for n in distinct] + [""]
+    return pd.Series(np.array(labels, dtype=object)[codes], index=dates.index)
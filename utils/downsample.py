@@ -0,0 +1,46 @@
+""" Shape preserving downsampling of long series before they are handed to matplotlib """
+
+import numpy as np
+import pandas as pd
+
+
+def minmax_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Positions of the points to keep, the minimum & maximum y of each equal-width x bucket.
+
+    x must be sorted ascending. The first & last points are always kept, so the drawn
+    line spans the same range and keeps every peak & trough a pixel column would show.
+    """
+    n = len(x)
+    if max_points <= 0 or n <= max_points:
+        return np.arange(n)
+
+    n_buckets = max(max_points // 2, 1)
+    x = np.asarray(x, dtype="float64")
+    span = x[-1] - x[0]
+    if span > 0:
+        bucket = ((x - x[0]) / span * n_buckets).astype("int64")
+        bucket = np.minimum(bucket, n_buckets - 1)
+    else:
+        bucket = np.zeros(n, dtype="int64")
+
+    # sorted by bucket, then by y: each bucket's first & last entries are its min & max
+    order = np.lexsort((np.asarray(y), bucket))
+    sorted_bucket = bucket[order]
+    starts = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+
+    return np.unique(np.concatenate([order[starts], order[ends], [0, n - 1]]))
+
+
+def downsample_frame(df: pd.DataFrame, x: str, y: str, max_points: int) -> pd.DataFrame:
+    """Downsample a frame sorted by x, keeping the min/max y per x bucket"""
+    if df.empty:
+        return df
+
+    x_values = df[x].to_numpy()
+    if np.issubdtype(x_values.dtype, np.datetime64):
+        x_values = x_values.astype("datetime64[ns]").astype("int64")
+
+    keep = minmax_indices(x_values, df[y].to_numpy(), max_points)
+    return df.iloc[keep]
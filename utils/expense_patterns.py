@@ -11,13 +11,28 @@ Some example of categorization:
     "Wallmart": "Shopping: Retail: Wallmart",
     "Burger":  "Restaurant: A burger joint"
 }
+
+Patterns are matched against the merchant key of each row rather than its raw
+description: store numbers, dates & reference codes are replaced by the merchant rules
+below, so the many variants of one merchant are labeled (and cached) as one string.
+Patterns should not depend on those volatile tokens. A key matching no pattern falls
+back to its raw description.
+
+When finance_rules.json exists (see utils/rule_file.py) its patterns & Type rules are
+used instead of the ones here.
 """
 
+import os
 import re
+from functools import lru_cache
+from typing import Any, Dict, List, Pattern, Tuple
 
 import numpy as np
 import pandas as pd
 
+from utils import file_settings as fs
+from utils import rule_file
+
 # python >= 3.7 preserves dictionary order, order in terms of priority
 patterns_restaurant = {
     r"(?i)Regex_For_Some_Restaurant": "Restaurant: Just: Ok: Restaurant X",
@@ -129,55 +144,127 @@ patterns_expense = {
 }
 
 
+# (type, column, values) applied in order, a later rule overrides an earlier one
+type_rules = [
+    (
+        "Lifestyle",
+        "Primary",
+        [
+            "Automotive",
+            "Fuel",
+            "Charity",
+            "Tax",
+            "Health",
+            "Mortgage",
+            "Insurance",
+            "Utilities",
+            "Contractor",
+            "Service",
+        ],
+    ),
+    # Subscription: Utility & Health, Shopping: Groceries & Home
+    ("Lifestyle", "Secondary", ["Utility", "Health", "Groceries", "Home"]),
+    ("Fun", "Primary", ["Restaurant", "Kiosk", "Entertainment"]),
+    ("Fun", "Secondary", ["Video"]),
+    ("Travel", "Primary", ["Travel"]),
+    ("Transfers", "Primary", ["Transfers"]),
+    ("Income", "Primary", ["Income"]),
+    ("Retail", "Primary", ["Shopping"]),
+]
+
+
+STATE_CODES = (
+    "(?:AK|AL|AR|AZ|CA|CO|CT|DC|DE|FL|GA|HI|IA|ID|IL|IN|KS|KY|LA|MA|MD|ME|MI|MN|MO|MS|MT"
+    "|NC|ND|NE|NH|NJ|NM|NV|NY|OH|OK|OR|PA|PR|RI|SC|SD|TN|TX|UT|VA|VT|WA|WI|WV|WY)"
+)
+
+# (regex, replacement) applied in order to a description to derive its merchant key
+merchant_rules = [
+    # reference codes mixing letters & digits, e.g. "*7E503B"
+    (r"\b(?=[A-Za-z]*\d)(?=\d*[A-Za-z])[A-Za-z\d]{4,}\b", "0"),
+    # store numbers, dates & amounts, single digits (7-Eleven) are kept
+    (r"\d{2,}", "0"),
+    # trailing state code after a city, e.g. "GAS AUSTIN TX", not "AAA ACG SW"
+    (r"(\S\s+\S+)\s+" + STATE_CODES + "$", r"\1"),
+]
+
+
+def default_rules() -> Dict[str, Any]:
+    """The built-in rules, as a rules file bundle"""
+    return {
+        "patterns": list(patterns_expense.items()),
+        "types": list(type_rules),
+        "merchants": list(merchant_rules),
+    }
+
+
+@lru_cache(maxsize=1)
+def active_rules() -> Dict[str, Any]:
+    """Rules of the rules file when there is one, otherwise the built-in rules"""
+    if os.path.exists(fs.rules_file_name()):
+        # a rules file without merchant rules keeps the built-in ones
+        return {
+            "merchants": list(merchant_rules),
+            **rule_file.load(fs.rules_file_name()),
+        }
+    return default_rules()
+
+
+@lru_cache(maxsize=1)
+def compiled_patterns() -> List[Tuple[Pattern, str]]:
+    """Active patterns compiled once, on first use, in priority order"""
+    return [(re.compile(pattern), name) for pattern, name in active_rules()["patterns"]]
+
+
 def apply_expense_label(description: str) -> str:
-    for pattern, name in patterns_expense.items():
-        if pd.notna(description) and re.search(pattern, description):
+    if pd.isna(description):
+        return ""
+    for pattern, name in compiled_patterns():
+        if pattern.search(description):
             return name
     return ""
 
 
+def merchant_keys(descriptions: pd.Series) -> pd.Series:
+    """
+    Merchant key of each description, each distinct description normalized once.
+
+    e.g. "BUC-EE GAS #42 AUSTIN TX", "BUC-EE GAS #117 AUSTIN TX" -> "BUC-EE GAS #0 AUSTIN"
+    """
+    codes, distinct = pd.factorize(descriptions.astype(object), use_na_sentinel=True)
+    keys = pd.Series(distinct, dtype=object).astype(str)
+    for pattern, replacement in active_rules()["merchants"]:
+        keys = keys.str.replace(pattern, replacement, regex=True)
+    keys = keys.str.replace(r"\s+", " ", regex=True).str.strip()
+    keys = np.append(keys.to_numpy(object), "")
+    return pd.Series(keys[codes], index=descriptions.index, name=descriptions.name)
+
+
+def label_series(descriptions: pd.Series) -> pd.Series:
+    """Label each description, matching every distinct description only once"""
+    unique = descriptions.drop_duplicates()
+    labels = dict(zip(unique, unique.map(apply_expense_label)))
+    return descriptions.map(labels).fillna("").astype(str)
+
+
+def label_merchants(keys: pd.Series, descriptions: pd.Series) -> pd.Series:
+    """
+    Label of each merchant key, or of its description when the key matches no pattern.
+
+    A merchant rule may drop a token a pattern needs (e.g. "ACME CO"), so those rows
+    are labeled as they were before merchant keys.
+    """
+    labels = label_series(keys)
+    unmatched = (labels == "").to_numpy()
+    if unmatched.any():
+        labels[unmatched] = label_series(descriptions[unmatched]).to_numpy()
+    return labels
+
+
 def apply_type(df: pd.DataFrame) -> None:
     df["Type"] = ""
-
-    # lifestyle
-    df.Type = np.where(df.Primary == "Automotive", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Fuel", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Charity", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Tax", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Health", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Mortgage", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Insurance", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Utilities", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Contractor", "Lifestyle", df.Type)
-    df.Type = np.where(df.Primary == "Service", "Lifestyle", df.Type)
-    df.Type = np.where(
-        df.Secondary == "Utility", "Lifestyle", df.Type
-    )  # Subscription: Utility
-    df.Type = np.where(
-        df.Secondary == "Health", "Lifestyle", df.Type
-    )  # Subscription: Health
-    df.Type = np.where(
-        df.Secondary == "Groceries", "Lifestyle", df.Type
-    )  # Shopping: Groceries
-    df.Type = np.where(df.Secondary == "Home", "Lifestyle", df.Type)  # Shopping: Home
-
-    # fun
-    df.Type = np.where(df.Primary == "Restaurant", "Fun", df.Type)
-    df.Type = np.where(df.Primary == "Kiosk", "Fun", df.Type)
-    df.Type = np.where(df.Primary == "Entertainment", "Fun", df.Type)
-    df.Type = np.where(df.Secondary == "Video", "Fun", df.Type)
-
-    # travel
-    df.Type = np.where(df.Primary == "Travel", "Travel", df.Type)
-
-    # transfers
-    df.Type = np.where(df.Primary == "Transfers", "Transfers", df.Type)
-
-    # income
-    df.Type = np.where(df.Primary == "Income", "Income", df.Type)
-
-    # shopping
-    df.Type = np.where(df.Primary == "Shopping", "Retail", df.Type)
+    for type_name, column, values in active_rules()["types"]:
+        df.Type = np.where(df[column].isin(values), type_name, df.Type)
 
     uncategorized = df[df.Type == ""][["Type", "Primary", "Secondary"]].copy()
     if not uncategorized.empty:
@@ -0,0 +1,85 @@
+"""
+Columnar on disk copy of the expenses sheet, for commands that only read it.
+
+Parsing finance.ods dominates read-only commands, so the typed frame (datetime dates,
+integer cents & categorical labels) is pickled in the cache directory together with the
+modification time & size of the workbook it came from. Any save of the workbook
+invalidates it, and commands that save the expenses sheet prime it again.
+"""
+
+import os
+import pickle
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from utils import dates as dt
+from utils import file_settings as fs
+from utils import partitions as pt
+from utils import utils
+
+# bump when the stored frame changes shape
+STORE_VERSION = 1
+
+CATEGORIES = ["data_source_note", "Primary", "Secondary", "Terciary", "Type"]
+
+
+def store_path() -> str:
+    return os.path.join(fs.cache_dir(), "expenses.pkl")
+
+
+def _signature(file: str) -> Tuple[int, int]:
+    stat = os.stat(file)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def columnar(df_sheet: pd.DataFrame) -> pd.DataFrame:
+    """The expenses sheet with typed columns, Description categorical as it repeats"""
+    df = df_sheet.reindex(columns=list(fs.expenses_dtype())).copy()
+    df["Date"] = dt.parse(df.Date)
+    df["Amount"] = df.Amount.astype(float)
+    df["Cents"] = (df.Amount * 100).round().astype("int64")
+    for column in CATEGORIES + ["Description"]:
+        df[column] = df[column].fillna("").astype(str).astype("category")
+    return df.reset_index(drop=True)
+
+
+def _read(file: str) -> Optional[pd.DataFrame]:
+    try:
+        with open(store_path(), "rb") as stored:
+            entry = pickle.load(stored)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    if entry.get("version") != STORE_VERSION:
+        return None
+    if entry.get("signature") != _signature(file):
+        return None
+    return entry["frame"]
+
+
+def prime(df_sheet: pd.DataFrame, file: str = "") -> pd.DataFrame:
+    """Store the expenses of the workbook as it is saved now, after the archived ones"""
+    file = file or fs.decrypted_file_name()
+    df = columnar(pt.with_archived_expenses(df_sheet))
+    os.makedirs(os.path.dirname(store_path()), exist_ok=True)
+    with open(store_path(), "wb") as stored:
+        entry = {"version": STORE_VERSION, "signature": _signature(file), "frame": df}
+        pickle.dump(entry, stored, protocol=pickle.HIGHEST_PROTOCOL)
+    return df
+
+
+def load(file: str = "") -> pd.DataFrame:
+    """Typed expenses, from the store when the workbook is unchanged since priming"""
+    file = file or fs.decrypted_file_name()
+    df = _read(file)
+    if df is not None:
+        return df
+
+    # imported here, the store exists to skip the ods parse
+    import pyexcel_ods3 as ods
+
+    book = ods.get_data(file)
+    return prime(
+        utils.get_sheet_df(book, fs.expenses_page(), fs.expenses_dtype()), file
+    )
@@ -0,0 +1,94 @@
+"""
+On disk cache of rendered figures.
+
+A figure is keyed by a fingerprint of the exact data it draws (e.g. the aggregated
+pivot) together with every parameter that changes its look. On a hit the stored image
+is shown instead of re-drawing, so only figures whose inputs changed are rendered.
+Each hit refreshes the render's modification time, and renders unused for MAX_AGE_DAYS
+are removed whenever a new one is stored, so old fingerprints do not pile up.
+"""
+
+import hashlib
+import os
+import time
+from typing import Any, Callable, Tuple
+
+import matplotlib.pyplot as plt
+import pandas as pd
+from matplotlib.figure import Figure
+
+from utils import file_settings as fs
+
+# bump when drawing code changes in a way the fingerprint can not see
+CACHE_VERSION = 1
+
+# renders not shown for this long are pruned
+MAX_AGE_DAYS = 30
+
+_enabled = True
+
+
+def set_enabled(enabled: bool) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable hash of frames/series (values, index & labels) and plain parameters"""
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            digest.update(pd.util.hash_pandas_object(part, index=True).values.tobytes())
+            labels = part.columns if isinstance(part, pd.DataFrame) else [part.name]
+            digest.update(repr(list(labels)).encode())
+            digest.update(repr(part.dtypes).encode())
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def figure_path(key: str) -> str:
+    return os.path.join(fs.cache_dir(), "figures", f"{key}.png")
+
+
+def show_image(path: str, figsize: Tuple[float, float]) -> Figure:
+    """Display a stored render at its original size"""
+    fig = plt.figure(figsize=figsize)
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.imshow(plt.imread(path))
+    ax.axis("off")
+    return fig
+
+
+def prune(max_age_days: float = MAX_AGE_DAYS) -> int:
+    """Remove the renders not used for max_age_days, returns how many were removed"""
+    directory = os.path.dirname(figure_path(""))
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_days * 24 * 60 * 60
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.name.endswith(".png") and entry.stat().st_mtime < cutoff:
+            os.remove(entry.path)
+            removed += 1
+    return removed
+
+
+def cached_figure(
+    key: str, figsize: Tuple[float, float], draw: Callable[[], Figure]
+) -> Figure:
+    """Show the stored render for key, or draw the figure & store it"""
+    if not _enabled:
+        return draw()
+
+    path = figure_path(key)
+    if os.path.exists(path):
+        os.utime(path)
+        return show_image(path, figsize)
+
+    fig = draw()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fig.savefig(path, dpi=fig.dpi)
+    prune()
+    return fig
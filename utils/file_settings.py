@@ -1,6 +1,6 @@
 """ Centralized, configurable location for LibreOffice Calc file/sheet/etc names """
 
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 
 def decrypted_file_name() -> str:
@@ -11,6 +11,42 @@ def encrypted_file_name() -> str:
     return "finance_encrypted.ods"
 
 
+def aggregates_file_name() -> str:
+    return "finance_aggregates.csv"
+
+
+def cache_dir() -> str:
+    return ".finance_cache"
+
+
+def archive_dir() -> str:
+    """Read-only archives of the closed years, see utils/partitions.py"""
+    return "finance_archive"
+
+
+def rules_file_name() -> str:
+    return "finance_rules.json"
+
+
+def report_file_name() -> str:
+    return "finance_report.html"
+
+
+def fx_file_name() -> str:
+    """Local table of exchange rates, see utils/fx.py"""
+    return "finance_fx.csv"
+
+
+def base_currency() -> str:
+    """Currency expenses are reported in, that of rows without a Currency"""
+    return "USD"
+
+
+def currency_column() -> str:
+    """Optional export & activity column with the ISO code of each row's currency"""
+    return "Currency"
+
+
 def activity_page_bank() -> str:
     return "activity_bank"
 
@@ -63,9 +99,83 @@ def asset_dtype() -> Dict[str, Any]:
     }
 
 
+def export_date_format() -> str:
+    """Date format of the bank & credit CSV exports"""
+    return "%m/%d/%Y"
+
+
+def sheet_date_format() -> str:
+    """Date format dates are written to the workbook & archives in"""
+    return "%Y-%m-%d"
+
+
+def sheet_date_columns() -> Dict[str, List[str]]:
+    """Date columns of each sheet, typed datetime64 while in memory"""
+    return {
+        activity_page_bank(): ["Posting Date"],
+        activity_page_credit(): ["Transaction Date", "Post Date"],
+        expenses_raw_page(): ["Date"],
+        expenses_page(): ["Date"],
+    }
+
+
+def asset_owners() -> List[str]:
+    """Asset sheet columns holding each owner's share of an asset"""
+    return ["Ethan", "Ioulia"]
+
+
+def cash_asset_type() -> str:
+    """Asset sheet Type of rows recording the cash balance on their Date"""
+    return "Cash"
+
+
+def transfer_window_days() -> int:
+    """Most days between the bank & credit card rows of one card payment"""
+    return 3
+
+
+def asset_page() -> str:
+    return "assets"
+
+
+def loan_term_months() -> int:
+    return 360
+
+
 def expenses_raw_page() -> str:
     return "expenses_raw"
 
 
+def expenses_raw_dtype() -> Dict[str, Any]:
+    return {
+        "data_source_note": "str",
+        "Date": "str",
+        "Currency": "str",
+        "Original": float,
+        "Historical": float,
+        "Amount": float,
+        "Type": "str",
+        "Category": "str",
+        "Description": "str",
+        "Grouping": "str",
+        "Merchant": "str",
+        "Label": "str",
+        "Link": "str",
+    }
+
+
 def expenses_page() -> str:
     return "expenses"
+
+
+def expenses_dtype() -> Dict[str, Any]:
+    return {
+        "data_source_note": "str",
+        "Date": "str",
+        "Amount": float,
+        "Description": "str",
+        "Primary": "str",
+        "Secondary": "str",
+        "Terciary": "str",
+        "Type": "str",
+    }
@@ -0,0 +1,116 @@
+"""
+Conversion of foreign currency amounts to the base currency with a local rate table.
+
+finance_fx.csv holds one row per rate, kept by hand or from a bank's rate export, and is
+never fetched over the network:
+    Date,Currency,Rate
+    2023-01-02,EUR,1.0683
+
+Rate is the base currency paid for one unit of the currency. A row is converted at the
+latest rate of its currency on or before its date. All foreign rows are converted with
+one as-of merge by currency, sorted on date, rather than a lookup per row. Rows in the
+base currency, or with a blank Currency, are left as they are.
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import dates as dt
+from utils import file_settings as fs
+
+COLUMNS = ["Date", "Currency", "Rate"]
+
+
+def _fail(file: str, message: str) -> None:
+    raise ValueError(f"{file}: {message}")
+
+
+def currencies(values: pd.Series) -> pd.Series:
+    """Upper case ISO code of each row, the base currency for blanks"""
+    codes = values.fillna("").astype(str).str.strip().str.upper()
+    return codes.where(codes != "", fs.base_currency())
+
+
+def load_rates(file: Optional[str] = None) -> pd.DataFrame:
+    """
+    The rate table in date order, empty when there is no file.
+
+    :raises ValueError: when a row's date or rate is invalid
+    """
+    file = file or fs.fx_file_name()
+    if not os.path.exists(file):
+        return pd.DataFrame(
+            {
+                "Date": pd.Series(dtype="datetime64[ns]"),
+                "Currency": pd.Series(dtype=object),
+                "Rate": pd.Series(dtype=float),
+            }
+        )
+
+    df = pd.read_csv(file, dtype=str, keep_default_na=False)
+    missing = [column for column in COLUMNS if column not in df.columns]
+    if missing:
+        _fail(file, f"missing column(s) {missing}")
+
+    df = pd.DataFrame(
+        {
+            "Date": dt.parse(df.Date),
+            "Currency": currencies(df.Currency),
+            "Rate": pd.to_numeric(df.Rate, errors="coerce"),
+        }
+    )
+    invalid = df.Date.isna() | ~(df.Rate > 0)
+    if invalid.any():
+        # +2 for the header & 1 based rows
+        rows = (np.flatnonzero(invalid) + 2).tolist()
+        _fail(file, f"invalid date or rate on row(s) {rows}")
+    return df.sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def convert(
+    amounts: pd.Series,
+    dates: pd.Series,
+    codes: pd.Series,
+    rates: Optional[pd.DataFrame] = None,
+) -> pd.Series:
+    """
+    Amounts in the base currency, each at its currency's rate as of its date.
+
+    :param codes: currency of each amount, as returned by currencies
+    :raises ValueError: when a foreign row has no rate on or before its date
+    """
+    converted = amounts.to_numpy(dtype=float, copy=True)
+    foreign = (codes != fs.base_currency()).to_numpy()
+    if foreign.any():
+        rates = load_rates() if rates is None else rates
+        rows = pd.DataFrame(
+            {
+                "Date": dt.parse(dates).to_numpy()[foreign],
+                "Currency": codes.to_numpy()[foreign],
+                "Position": np.flatnonzero(foreign),
+            }
+        )
+        undated = rows.Date.isna()
+        merged = pd.merge_asof(
+            rows[~undated].sort_values("Date", kind="stable"),
+            rates,
+            on="Date",
+            by="Currency",
+            direction="backward",
+        )
+
+        unrated = merged[merged.Rate.isna()]
+        if undated.any() or not unrated.empty:
+            earliest = unrated.groupby("Currency").Date.min().dt.strftime("%Y-%m-%d")
+            missing = [f"{code} on or before {day}" for code, day in earliest.items()]
+            missing += [
+                f"{code} rows without a date"
+                for code in rows[undated].Currency.unique()
+            ]
+            raise ValueError(f"No rate in {fs.fx_file_name()} for {', '.join(missing)}")
+        converted[merged.Position.to_numpy()] *= merged.Rate.to_numpy()
+
+    return pd.Series(converted, index=amounts.index, name=amounts.name)
@@ -0,0 +1,300 @@
+"""
+Single file HTML report of the categorized expenses, drawn in the browser.
+
+The page embeds monthly cubes rather than transactions, reduced to the levels the
+figures use (Month, Type, Primary & the income Source) and dictionary encoded: the
+month & key tables are written once and each cube is three integer arrays. A decade of
+history is a few thousand cells whatever the number of transactions, so the file stays
+in the tens of kilobytes and opens at once.
+
+The views are those of graph household, computed from the cubes by the embedded script:
+income by source, expenses by Type, as a share of all expenses & of income, lifestyle by
+Primary and monthly income, expenses & their running sum. Yearly sampling sums the
+months, and the outlier control switches to the cube of rows within 5 standard
+deviations (see scripts/graph.py apply_stand_dev). There are no external scripts or
+styles, the page works offline.
+"""
+
+import html
+import json
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+# the levels of the cube the views read
+LEVELS = ["Month", "Type", "Primary", "Source"]
+
+
+def reduce_cube(cube: pd.DataFrame) -> pd.DataFrame:
+    """Cents per Month, Type, Primary & Source, Source being the Terciary of income"""
+    df = cube.assign(Source=cube.Terciary.where(cube.Primary == "Income", ""))
+    df = df.groupby(LEVELS, as_index=False, observed=True).Cents.sum()
+    return df[df.Cents != 0].reset_index(drop=True)
+
+
+def payload(cubes: Dict[str, pd.DataFrame]) -> dict:
+    """
+    The cubes dictionary encoded against shared month & key tables.
+
+    :param cubes: name to aggregate cube, e.g. "all" & "std"
+    :return: {"months": [...], "keys": [[Type, Primary, Source], ...], "cubes": {name:
+    {"m": month positions, "k": key positions, "c": cents}}}
+    """
+    reduced = {name: reduce_cube(cube) for name, cube in cubes.items()}
+    frames = list(reduced.values())
+    combined = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if combined.empty:
+        empty = {"m": [], "k": [], "c": []}
+        return {"months": [], "keys": [], "cubes": {name: empty for name in cubes}}
+
+    months = pd.Index(sorted(combined.Month.unique()))
+    keys = pd.MultiIndex.from_frame(
+        combined[LEVELS[1:]].drop_duplicates().sort_values(LEVELS[1:])
+    )
+    encoded = {}
+    for name, df in reduced.items():
+        encoded[name] = {
+            "m": months.get_indexer(df.Month).tolist(),
+            "k": keys.get_indexer(pd.MultiIndex.from_frame(df[LEVELS[1:]])).tolist(),
+            "c": df.Cents.astype(np.int64).tolist(),
+        }
+    return {
+        "months": months.tolist(),
+        "keys": [list(key) for key in keys],
+        "cubes": encoded,
+    }
+
+
+def render(data: dict, palette: List[str], title: str = "Finance report") -> str:
+    """The page with data embedded, as compact JSON safe inside a script element"""
+    text = json.dumps(data, separators=(",", ":")).replace("</", "<\\/")
+    return (
+        TEMPLATE.replace("__TITLE__", html.escape(title))
+        .replace("__PALETTE__", json.dumps(palette))
+        .replace("__DATA__", text)
+    )
+
+
+TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+body { font: 13px sans-serif; margin: 16px; color: #222; }
+h1 { font-size: 18px; }
+.controls { margin-bottom: 12px; }
+.controls label { margin-right: 12px; }
+.figure { display: inline-block; margin: 0 16px 24px 0; vertical-align: top; }
+.figure h2 { font-size: 13px; margin: 0 0 4px; white-space: pre-line; }
+.legend span { display: inline-block; margin-right: 10px; }
+.legend i { display: inline-block; width: 10px; height: 10px; margin-right: 4px; }
+.readout { color: #555; min-height: 16px; }
+svg text { font-size: 10px; fill: #444; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div class="controls">
+  Sample
+  <label><input type="radio" name="sample" value="month" checked> month</label>
+  <label><input type="radio" name="sample" value="year"> year</label>
+  Outliers
+  <label><input type="radio" name="control" value="all" checked> all rows</label>
+  <label><input type="radio" name="control" value="std">
+    control for 5 standard deviations</label>
+</div>
+<div id="figures"></div>
+<script>
+const PALETTE = __PALETTE__;
+const DATA = __DATA__;
+const WIDTH = 640, HEIGHT = 280, LEFT = 64, RIGHT = 12, TOP = 8, BOTTOM = 28;
+
+function selected(name) {
+  return document.querySelector(`input[name=${name}]:checked`).value;
+}
+
+// values per series name & period, periods being months or years
+function pivot(cube, sample, nameOf, value) {
+  const labels = [...new Set(DATA.months.map(m => sample === "year" ? m.slice(0, 4) : m))];
+  const position = new Map(labels.map((label, i) => [label, i]));
+  const series = {};
+  for (let i = 0; i < cube.c.length; i++) {
+    const key = DATA.keys[cube.k[i]];
+    const name = nameOf(key[0], key[1], key[2], cube.c[i]);
+    if (name === null) continue;
+    const month = DATA.months[cube.m[i]];
+    const p = position.get(sample === "year" ? month.slice(0, 4) : month);
+    (series[name] = series[name] || new Array(labels.length).fill(0))[p] +=
+      value(cube.c[i]) / 100;
+  }
+  const names = Object.keys(series).sort();
+  return {labels, names, values: names.map(name => series[name])};
+}
+
+function normalized(frame, totals, scale) {
+  const values = frame.values.map(row => row.map((v, i) => v / totals[i] * scale));
+  return {...frame, values};
+}
+
+function columnTotals(frame) {
+  return frame.labels.map((_, i) => frame.values.reduce((sum, row) => sum + row[i], 0));
+}
+
+const expense = type => type !== "Income" && type !== "Transfers";
+
+function views(cube, sample) {
+  const income = pivot(cube, sample,
+    (type, primary, source) => primary === "Income" ? source || "Income" : null, c => c);
+  const expenses = pivot(cube, sample,
+    type => expense(type) ? type : null, c => Math.abs(c));
+  const incomeTotal = pivot(cube, sample,
+    (type, primary) => primary === "Income" ? "Income" : null, c => c).values[0] ||
+    expenses.labels.map(() => 0);
+  const lifestyle = pivot(cube, sample,
+    (type, primary) => type === "Lifestyle" ? primary : null, c => Math.abs(c));
+  const flows = pivot(cube, sample,
+    (type, primary, source, c) => c > 0 ? "Income" : "Expense", c => c);
+  let running = 0;
+  const sums = flows.labels.map((_, i) =>
+    running += flows.values.reduce((sum, row) => sum + row[i], 0));
+  return [
+    ["Income, Expenses, and Sum\\nIgnoring Vacation Savings.", "Amount ($)",
+      {...flows, names: [...flows.names, "Sum"], values: [...flows.values, sums]}, "line"],
+    ["Income", "Income", income, "area"],
+    ["Expenses", "Expense", expenses, "area"],
+    ["Expense Percentages", "Percentage of Expenses",
+      normalized(expenses, columnTotals(expenses), 1), "area"],
+    ["Expense as perc of income", "Percentage of Expenses",
+      normalized(expenses, incomeTotal, 100), "area"],
+    ["Lifestyle Percentages", "Percentage of Expenses",
+      normalized(lifestyle, columnTotals(lifestyle), 1), "area"],
+  ];
+}
+
+function ticks(low, high, count) {
+  if (low === high) { high = low + 1; }
+  const raw = (high - low) / count, power = Math.pow(10, Math.floor(Math.log10(raw)));
+  const step = [1, 2, 5, 10].map(f => f * power).find(s => s >= raw);
+  const result = [];
+  // from the step below low to the first step at or above high
+  for (let v = Math.floor(low / step) * step; ; v += step) {
+    result.push(v);
+    if (v >= high - step * 1e-9) return result;
+  }
+}
+
+function format(value) {
+  return Math.abs(value) >= 1000 || value === 0 ?
+    value.toLocaleString(undefined, {maximumFractionDigits: 0}) :
+    value.toLocaleString(undefined, {maximumSignificantDigits: 3});
+}
+
+function svgElement(name, attributes) {
+  const element = document.createElementNS("http://www.w3.org/2000/svg", name);
+  for (const [key, value] of Object.entries(attributes)) element.setAttribute(key, value);
+  return element;
+}
+
+function figure(title, ylabel, frame, kind) {
+  const container = document.createElement("div");
+  container.className = "figure";
+  const heading = document.createElement("h2");
+  heading.textContent = title;
+  container.appendChild(heading);
+
+  const n = frame.labels.length;
+  const values = frame.values.map(row => row.map(v => Number.isFinite(v) ? v : 0));
+  // stacked areas draw each series on top of the previous ones
+  const tops = values.map((row, s) =>
+    row.map((v, i) => kind === "area" ? values.slice(0, s + 1)
+      .reduce((sum, r) => sum + r[i], 0) : v));
+  const all = tops.flat().concat([0]);
+  const yTicks = ticks(Math.min(...all), Math.max(...all), 5);
+  const low = yTicks[0], high = yTicks[yTicks.length - 1];
+  const x = i => LEFT + (n > 1 ? i * (WIDTH - LEFT - RIGHT) / (n - 1) : 0);
+  const y = v => TOP + (high - v) / (high - low || 1) * (HEIGHT - TOP - BOTTOM);
+
+  const svg = svgElement("svg", {width: WIDTH, height: HEIGHT});
+  for (const tick of yTicks) {
+    svg.appendChild(svgElement("line", {x1: LEFT, x2: WIDTH - RIGHT, y1: y(tick),
+      y2: y(tick), stroke: "#ddd"}));
+    const label = svgElement("text", {x: LEFT - 4, y: y(tick) + 3, "text-anchor": "end"});
+    label.textContent = format(tick);
+    svg.appendChild(label);
+  }
+  const every = Math.max(1, Math.ceil(n / 8));
+  frame.labels.forEach((text, i) => {
+    if (i % every) return;
+    const label = svgElement("text", {x: x(i), y: HEIGHT - BOTTOM + 14,
+      "text-anchor": "middle"});
+    label.textContent = text;
+    svg.appendChild(label);
+  });
+  const axis = svgElement("text", {x: 12, y: HEIGHT / 2,
+    transform: `rotate(-90 12 ${HEIGHT / 2})`, "text-anchor": "middle"});
+  axis.textContent = ylabel;
+  svg.appendChild(axis);
+
+  tops.forEach((row, s) => {
+    const color = PALETTE[s % PALETTE.length];
+    const upper = row.map((v, i) => `${x(i)},${y(v)}`);
+    if (kind === "area") {
+      const below = s ? tops[s - 1] : row.map(() => 0);
+      const lower = below.map((v, i) => `${x(i)},${y(v)}`).reverse();
+      svg.appendChild(svgElement("polygon", {points: upper.concat(lower).join(" "),
+        fill: color, "fill-opacity": 0.8, stroke: color}));
+    } else {
+      svg.appendChild(svgElement("polyline", {points: upper.join(" "), fill: "none",
+        stroke: color, "stroke-width": 1.5}));
+    }
+  });
+
+  const cursor = svgElement("line", {y1: TOP, y2: HEIGHT - BOTTOM, stroke: "#888",
+    visibility: "hidden"});
+  svg.appendChild(cursor);
+  const readout = document.createElement("div");
+  readout.className = "readout";
+  svg.addEventListener("mousemove", event => {
+    const box = svg.getBoundingClientRect();
+    const step = n > 1 ? (WIDTH - LEFT - RIGHT) / (n - 1) : 1;
+    const i = Math.min(n - 1, Math.max(0, Math.round((event.clientX - box.left - LEFT) / step)));
+    cursor.setAttribute("x1", x(i));
+    cursor.setAttribute("x2", x(i));
+    cursor.setAttribute("visibility", "visible");
+    readout.textContent = frame.labels[i] + "  " +
+      frame.names.map((name, s) => `${name} ${format(values[s][i])}`).join(" \\u00b7 ");
+  });
+  container.appendChild(svg);
+  container.appendChild(readout);
+
+  const legend = document.createElement("div");
+  legend.className = "legend";
+  frame.names.forEach((name, s) => {
+    const entry = document.createElement("span");
+    entry.innerHTML = `<i style="background:${PALETTE[s % PALETTE.length]}"></i>`;
+    entry.appendChild(document.createTextNode(name));
+    legend.appendChild(entry);
+  });
+  container.appendChild(legend);
+  return container;
+}
+
+function draw() {
+  const sample = selected("sample"), control = selected("control");
+  const disclaimer = control === "std" ? "\\nControl for 5 standard deviation" : "";
+  const figures = document.getElementById("figures");
+  figures.replaceChildren();
+  for (const [title, ylabel, frame, kind] of views(DATA.cubes[control], sample)) {
+    const heading = kind === "area" ? `${title}, sample ${sample}` : title;
+    figures.appendChild(figure(heading + disclaimer, ylabel, frame, kind));
+  }
+}
+
+document.querySelectorAll("input").forEach(input => input.addEventListener("change", draw));
+draw();
+</script>
+</body>
+</html>
+"""
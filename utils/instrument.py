@@ -0,0 +1,189 @@
+"""
+Per stage instrumentation shared by every command.
+
+Stages are wrapped with `stage`, which records wall time, CPU time, row count and the
+tracemalloc peak above the memory in use when the stage began. Recording is off unless
+enabled through the --timings / --trace options of tools.py, so wrapped code costs a
+context manager when nobody is looking.
+
+Stages may run on several threads (see utils/concurrency.py), each nesting on its own
+stack. tracemalloc is process wide, so the peaks of overlapping stages overlap too.
+"""
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+
+from utils import utils
+
+_enabled = False
+_trace_file = ""
+_records: List[Dict[str, Any]] = []
+_local = threading.local()
+_lock = threading.Lock()
+_open = 0
+_started_tracing = False
+_origin = time.perf_counter()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def configure(timings: bool = False, trace_file: str = "") -> None:
+    global _enabled, _trace_file
+    _enabled = timings or bool(trace_file)
+    _trace_file = trace_file
+    _records.clear()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def records() -> List[Dict[str, Any]]:
+    return list(_records)
+
+
+def _stack() -> List[Dict[str, int]]:
+    """Measurements open on the calling thread, innermost last"""
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+@contextmanager
+def measured(name: str = "", rows: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Measure the enclosed block into the yielded dict, rows may be set inside the block.
+
+    Nested blocks each report their own peak, and a parent's peak includes its children.
+    """
+    global _open, _started_tracing
+    stack = _stack()
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _open += 1
+
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+    stack.append({"current": current, "peak": current})
+
+    metrics: Dict[str, Any] = {
+        "name": name,
+        "rows": rows,
+        "depth": len(stack) - 1,
+        "thread": threading.current_thread().name,
+    }
+    # CPU time of the calling thread, so overlapping stages do not count each other
+    start, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield metrics
+    finally:
+        wall, cpu = time.perf_counter() - start, time.thread_time() - cpu
+        entry = stack.pop()
+        with _lock:
+            peak = max(tracemalloc.get_traced_memory()[1], entry["peak"])
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+            _open -= 1
+            if not _open and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+        metrics.update(
+            {
+                "start_s": round(start - _origin, 6),
+                "wall_s": round(wall, 4),
+                "cpu_s": round(cpu, 4),
+                "peak_mb": round((peak - entry["current"]) / 2**20, 2),
+            }
+        )
+
+
+@contextmanager
+def stage(name: str, rows: int = 0) -> Iterator[Dict[str, Any]]:
+    """Record the enclosed pipeline stage when instrumentation is enabled"""
+    if not _enabled:
+        yield {"name": name, "rows": rows}
+        return
+
+    with measured(name, rows) as metrics:
+        yield metrics
+    with _lock:
+        _records.append(metrics)
+
+
+def timed(func: F) -> F:
+    """Record each call of func as a stage, named with its string arguments"""
+
+    @wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if not _enabled:
+            return func(*args, **kwargs)
+
+        labels = [" ".join(arg.split()) for arg in args if isinstance(arg, str)]
+        labels = [label for label in labels if label]
+        name = f"{func.__name__}({', '.join(labels)})" if labels else func.__name__
+        rows = next((len(arg) for arg in args if hasattr(arg, "columns")), 0)
+        with stage(name, rows):
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def summary() -> str:
+    lines = [f"{'stage':<60} {'rows':>9} {'wall s':>9} {'cpu s':>9} {'peak MB':>9}"]
+    for record in sorted(_records, key=lambda record: record["start_s"]):
+        name = ("  " * record["depth"] + record["name"])[:60]
+        lines.append(
+            f"{name:<60} {record['rows']:>9} {record['wall_s']:>9.3f} "
+            f"{record['cpu_s']:>9.3f} {record['peak_mb']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def chrome_trace() -> Dict[str, Any]:
+    """Records as complete ("X") events, viewable in chrome://tracing or Perfetto"""
+    threads = {
+        name: tid
+        for tid, name in enumerate(dict.fromkeys(r["thread"] for r in _records))
+    }
+    return {
+        "traceEvents": [
+            {
+                "name": record["name"],
+                "ph": "X",
+                "ts": int(record["start_s"] * 1e6),
+                "dur": int(record["wall_s"] * 1e6),
+                "pid": os.getpid(),
+                "tid": threads[record["thread"]],
+                "args": {
+                    "rows": record["rows"],
+                    "cpu_s": record["cpu_s"],
+                    "peak_mb": record["peak_mb"],
+                },
+            }
+            for record in _records
+        ],
+        "displayTimeUnit": "ms",
+    }
+
+
+def report() -> None:
+    """Print the summary table & write the trace file, if enabled"""
+    if not _enabled or not _records:
+        return
+
+    utils.print_status(f"Timings\n{summary()}")
+    if _trace_file:
+        with open(_trace_file, "w") as file:
+            json.dump(chrome_trace(), file)
+        utils.print_status(f"Trace written to {_trace_file}")
@@ -0,0 +1,211 @@
+"""
+Net worth timeline of the household, per asset & per owner, month by month.
+
+Three sources are joined on a grid of month ends:
+    - asset values, the latest Valuation (or Buy) of each asset as of each month & 0
+      from the month it is sold, found with one as-of merge by asset
+    - loan balances, from the amortization schedules (see utils/amortization.py)
+    - cash, the cumulative net flow of the expenses_raw rows in nominal dollars (their
+      Historical amounts, not the inflation adjusted Amount the cube sums), as the
+      valuations & loan balances are. Asset sheet rows of the cash Type record the
+      actual balance at the end of their month and re-anchor the cumulative flow from
+      there on, again with an as-of merge
+
+Each asset's equity is split between the owners by their share columns (equally when
+all are blank) and cash equally, as one (months x assets) by (assets x owners) product.
+Every step is an array operation or a sorted merge, so the whole timeline is rebuilt in
+tens of milliseconds after a new valuation or month, with no state kept between builds.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils import amortization as am
+from utils import dates as dt
+from utils import file_settings as fs
+
+COLUMNS = ["Month", "Asset", "Value", "Loan", "Equity"]
+
+
+def _sheet(df_assets: pd.DataFrame) -> pd.DataFrame:
+    """The asset sheet with every column, blank where the sheet has none"""
+    return df_assets.reindex(columns=list(fs.asset_dtype()), fill_value="").fillna("")
+
+
+def _month_end(dates: pd.Series) -> pd.Series:
+    return dates + pd.offsets.MonthEnd(0)
+
+
+def is_cash(df_assets: pd.DataFrame) -> pd.Series:
+    return df_assets.Type.str.strip().str.lower() == fs.cash_asset_type().lower()
+
+
+def events(df_assets: pd.DataFrame) -> pd.DataFrame:
+    """
+    Dated rows of the asset sheet with their numeric Valuation, in date order.
+
+    :return: Date, Asset, Action (lower case), Valuation & Cash, whether the row records
+    the cash balance
+    """
+    df = _sheet(df_assets)
+    df = pd.DataFrame(
+        {
+            "Date": dt.parse(df.Date),
+            "Asset": df.Asset,
+            "Action": df.Action.str.strip().str.lower(),
+            "Valuation": am.to_number(df.Valuation),
+            "Cash": is_cash(df),
+        }
+    )
+    return df[df.Date.notna()].sort_values("Date", kind="stable")
+
+
+def valuations(df_events: pd.DataFrame) -> pd.DataFrame:
+    """Value of each asset from each event on, 0 once sold, columns Month, Asset, Value"""
+    df = df_events[~df_events.Cash]
+    sold = df.Action == "sell"
+    df = df[(df.Valuation > 0) | sold]
+    return pd.DataFrame(
+        {"Month": df.Date, "Asset": df.Asset, "Value": df.Valuation.where(~sold, 0.0)}
+    )
+
+
+def month_grid(first: pd.Timestamp, last: pd.Timestamp) -> pd.DatetimeIndex:
+    return pd.date_range(_month_end(first), _month_end(last), freq="ME", name="Month")
+
+
+def nominal_flow(df_raw: pd.DataFrame) -> pd.Series:
+    """Net flow of each month (YYYY-MM), the sum of its expenses_raw Historical amounts"""
+    if df_raw.empty:
+        return pd.Series(dtype=float)
+    months = dt.months(df_raw.Date).to_numpy()
+    flow = df_raw.Historical.astype(float).groupby(months).sum()
+    return flow[flow.index != ""]
+
+
+def cash(
+    flow: pd.Series, df_events: pd.DataFrame, months: pd.DatetimeIndex
+) -> np.ndarray:
+    """Cash at the end of each month, the cumulative flow re-anchored at each balance"""
+    if not flow.empty:
+        monthly = flow.copy()
+        monthly.index = _month_end(pd.to_datetime(monthly.index, format="%Y-%m"))
+        flow = monthly.reindex(months, fill_value=0.0)
+    else:
+        flow = pd.Series(0.0, index=months)
+    cumulative = flow.cumsum()
+
+    anchors = df_events[df_events.Cash]
+    if anchors.empty:
+        return cumulative.to_numpy()
+
+    anchors = anchors.assign(Month=_month_end(anchors.Date))
+    anchors["Offset"] = (
+        anchors.Valuation.to_numpy()
+        - cumulative.reindex(anchors.Month, fill_value=0.0).to_numpy()
+    )
+    offsets = pd.merge_asof(
+        cumulative.rename("Cumulative").reset_index(),
+        anchors[["Month", "Offset"]],
+        on="Month",
+        direction="backward",
+    ).Offset
+    # months before the first recorded balance count back from it
+    offsets = offsets.fillna(anchors.Offset.iloc[0])
+    return cumulative.to_numpy() + offsets.to_numpy()
+
+
+def timeline(
+    df_assets: pd.DataFrame, flow: pd.Series, last: Optional[pd.Timestamp] = None
+) -> pd.DataFrame:
+    """
+    Value, loan balance & equity of every asset and of cash, at each month end.
+
+    :param flow: net flow of each month, as returned by nominal_flow
+    :param last: last month of the timeline, the latest asset event or flow month by
+    default
+    :return: COLUMNS, one row per month & asset, cash as the asset of the cash Type
+    """
+    df_assets = _sheet(df_assets)
+    df_events = events(df_assets)
+    values = valuations(df_events)
+    df_loans = am.loans(df_assets[~is_cash(df_assets)])
+    bounds = list(df_events.Date.iloc[[0, -1]]) if len(df_events) else []
+    if not flow.empty:
+        flow_months = pd.to_datetime(flow.index, format="%Y-%m")
+        bounds += [flow_months.min(), flow_months.max()]
+    if not bounds:
+        return pd.DataFrame(columns=COLUMNS)
+    months = month_grid(min(bounds), last if last is not None else max(bounds))
+
+    # month major rows, each month listing the assets in the same order
+    assets = list(dict.fromkeys(list(values.Asset) + list(df_loans.Asset)))
+    grid = pd.DataFrame(
+        {
+            "Month": np.repeat(months.to_numpy(), len(assets)),
+            # object so the merge keys match, even without any asset but cash
+            "Asset": np.tile(np.array(assets, dtype=object), len(months)),
+        }
+    )
+    grid = pd.merge_asof(grid, values, on="Month", by="Asset", direction="backward")
+    grid["Value"] = grid.Value.fillna(0.0)
+
+    grid["Loan"] = 0.0
+    if not df_loans.empty:
+        first_loan = df_loans.Date.min()
+        horizon = (months[-1].year - first_loan.year) * 12
+        horizon += months[-1].month - first_loan.month
+        balance = am.schedules(df_loans, max(horizon, 1))["balance"]
+        balance = balance.reindex(index=months, columns=assets, fill_value=0.0)
+        grid["Loan"] = balance.to_numpy().ravel()
+
+    held = pd.DataFrame(
+        {
+            "Month": months,
+            "Asset": fs.cash_asset_type(),
+            "Value": cash(flow, df_events, months),
+            "Loan": 0.0,
+        }
+    )
+    df = pd.concat([grid, held] if assets else [held], ignore_index=True)
+    df["Equity"] = df.Value - df.Loan
+    return df.sort_values(["Month", "Asset"], kind="stable")[COLUMNS].reset_index(
+        drop=True
+    )
+
+
+def shares(df_assets: pd.DataFrame, owners: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Each owner's fraction of each asset, from the latest row giving any share.
+
+    :return: indexed by asset with a column per owner, rows summing to 1
+    """
+    owners = owners or fs.asset_owners()
+    df_assets = _sheet(df_assets)
+    df = df_assets[~is_cash(df_assets)]
+    parts = pd.DataFrame(
+        {owner: am.to_number(df[owner]) if owner in df else 0.0 for owner in owners},
+        index=df.index,
+    )
+    parts = parts.where(parts <= 1, parts / 100)
+    given = parts.sum(axis=1) > 0
+    latest = parts[given].groupby(df.Asset[given]).last()
+
+    assets = pd.Index(df.Asset.unique(), name="Asset")
+    latest = latest.reindex(assets).fillna(0.0)
+    blank = latest.sum(axis=1) == 0
+    latest[blank] = 1.0
+    return latest.div(latest.sum(axis=1), axis=0)
+
+
+def by_owner(df_timeline: pd.DataFrame, df_shares: pd.DataFrame) -> pd.DataFrame:
+    """Net worth of each owner at each month end, indexed by month with a column per owner"""
+    if df_timeline.empty:
+        return pd.DataFrame(columns=df_shares.columns)
+    equity = df_timeline.pivot(index="Month", columns="Asset", values="Equity")
+    owners = df_shares.reindex(equity.columns)
+    # cash & assets without a sheet row split equally
+    owners = owners.fillna(1.0 / len(df_shares.columns))
+    return equity.fillna(0.0) @ owners
@@ -0,0 +1,86 @@
+"""
+Robust outlier control per category, in place of one global mean & standard deviation.
+
+Each Type (or Primary) gets Tukey fences from its own quartiles, read from a quantile
+sketch, so a house purchase only widens the bounds of its own category. With a window,
+the quartiles of each month come from the sketches of the trailing months, merged.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import dates as dt
+from utils import quantile_sketch as qs
+
+# interquartile ranges beyond the quartiles that still count as ordinary
+FENCE = 3.0
+
+QUARTILES = (0.25, 0.75)
+
+
+def month_numbers(dates: pd.Series) -> np.ndarray:
+    dates = dt.parse(dates)
+    return (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()
+
+
+def bounds(
+    df: pd.DataFrame, by: str = "Type", fence: float = FENCE, window_months: int = 0
+) -> pd.DataFrame:
+    """
+    Lower & Upper amount of each category, of each category & month with a window.
+
+    :param window_months: quartiles of the trailing months (the month included), 0 for
+    all of the history
+    """
+    columns = [by] + (["MonthNumber"] if window_months else [])
+    rows = df[[by, "Amount"]].copy()
+    if window_months:
+        rows["MonthNumber"] = month_numbers(df.Date)
+
+    table = qs.sketch(rows, columns)
+    if window_months:
+        # a month's counts also count toward the windows of the months following it
+        table = qs.merge(
+            (
+                table.assign(MonthNumber=table.MonthNumber + shift)
+                for shift in range(window_months)
+            ),
+            columns,
+        )
+
+    quartiles = qs.quantiles(table, columns, QUARTILES)
+    if quartiles.empty:
+        return pd.DataFrame(columns=["Lower", "Upper"])
+
+    # widened by the sketch's accuracy, so a category of equal amounts keeps them all
+    slack = qs.ALPHA / (1 - qs.ALPHA)
+    first, third = quartiles[QUARTILES[0]], quartiles[QUARTILES[1]]
+    spread = third - first
+    return pd.DataFrame(
+        {
+            "Lower": first - slack * first.abs() - fence * spread,
+            "Upper": third + slack * third.abs() + fence * spread,
+        }
+    )
+
+
+def control(
+    df: pd.DataFrame, by: str = "Type", fence: float = FENCE, window_months: int = 0
+) -> pd.DataFrame:
+    """Rows of df within the bounds of their category, all rows without a category"""
+    if df.empty:
+        return df.copy()
+
+    limits = bounds(df, by, fence, window_months)
+    keys = [df[by]]
+    if window_months:
+        keys.append(pd.Series(month_numbers(df.Date), index=df.index))
+    position = limits.index.get_indexer(
+        pd.MultiIndex.from_arrays(keys) if window_months else keys[0]
+    )
+
+    # -1 for a blank category picks the open bounds appended last, keeping its rows
+    lower = np.append(limits.Lower.to_numpy(), -np.inf)[position]
+    upper = np.append(limits.Upper.to_numpy(), np.inf)[position]
+    amount = df.Amount.to_numpy(dtype=float)
+    return df[(amount >= lower) & (amount <= upper)].copy()
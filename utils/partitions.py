@@ -0,0 +1,248 @@
+"""
+Closed years of the ledger, frozen out of the workbook into read-only archives.
+
+Freezing a year moves its rows of the activity & expenses sheets into one gzip CSV per
+sheet under the archive directory, together with the year's monthly cube. The files are
+written byte for byte reproducibly, made read-only and listed in manifest.json with
+their row count & sha256, which is checked whenever a file is read. The workbook then
+only holds the open years, so commands that only touch recent activity no longer load
+or save the full history. Archives are read only when a command's data spans them.
+"""
+
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+import pickle
+import stat
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from utils import aggregates as ag
+from utils import dates as dt
+from utils import file_settings as fs
+from utils import utils
+
+MANIFEST_VERSION = 1
+
+
+def sheets() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    """Archived sheet: (date column, dtypes)"""
+    return {
+        fs.activity_page_bank(): ("Posting Date", fs.bank_dtype()),
+        fs.activity_page_credit(): ("Post Date", fs.credit_dtype()),
+        fs.expenses_raw_page(): ("Date", fs.expenses_raw_dtype()),
+        fs.expenses_page(): ("Date", fs.expenses_dtype()),
+    }
+
+
+def manifest_path() -> str:
+    return os.path.join(fs.archive_dir(), "manifest.json")
+
+
+def load_manifest() -> Dict[str, Any]:
+    if not os.path.exists(manifest_path()):
+        return {"version": MANIFEST_VERSION, "years": {}}
+    with open(manifest_path(), encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_manifest(manifest: Dict[str, Any]) -> None:
+    os.makedirs(fs.archive_dir(), exist_ok=True)
+    with open(manifest_path(), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def closed_years() -> List[int]:
+    return sorted(int(year) for year in load_manifest()["years"])
+
+
+def row_years(df: pd.DataFrame, sheet_name: str) -> pd.Series:
+    """Year of each row by the sheet's date column, NaN when it does not parse"""
+    if df.empty:
+        return pd.Series(dtype=float, index=df.index)
+    column = sheets()[sheet_name][0]
+    return dt.parse(df[column]).dt.year
+
+
+def _write(path: str, df: pd.DataFrame) -> Dict[str, Any]:
+    # mtime 0 so the same rows always give the same bytes & checksum
+    text = dt.as_text(df).to_csv(index=False)
+    content = gzip.compress(text.encode("utf-8"), mtime=0)
+    # left read-only by a freeze whose book was never saved, so not in the manifest
+    if os.path.exists(path):
+        os.remove(path)
+    with open(path, "wb") as file:
+        file.write(content)
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    return {
+        "file": os.path.basename(path),
+        "rows": len(df),
+        "sha256": hashlib.sha256(content).hexdigest(),
+    }
+
+
+def _read(year: int, entry: Dict[str, Any]) -> bytes:
+    path = os.path.join(fs.archive_dir(), str(year), entry["file"])
+    with open(path, "rb") as file:
+        content = file.read()
+    if hashlib.sha256(content).hexdigest() != entry["sha256"]:
+        raise ValueError(f"{path} does not match its checksum in {manifest_path()}")
+    return gzip.decompress(content)
+
+
+def check(years: Iterable[int], manifest: Dict[str, Any]) -> None:
+    """
+    :raises ValueError: when a year is already archived or not closed yet
+    """
+    for year in years:
+        if str(year) in manifest["years"]:
+            raise ValueError(f"{year} is already archived")
+        if year >= datetime.date.today().year:
+            raise ValueError(f"{year} is not closed yet")
+
+
+def freeze(
+    book: Dict[str, list], year: int, manifest: Optional[Dict[str, Any]] = None
+) -> Dict[str, int]:
+    """
+    Move the rows of year out of the book's sheets into the year's archive.
+
+    Without a manifest the year is listed in manifest.json at once. With one, its entry
+    is only added to it, for the caller to save_manifest once the book is saved, so a
+    failure in between leaves no year both archived & in the workbook.
+
+    :return: rows archived per sheet
+    """
+    save = manifest is None
+    manifest = load_manifest() if save else manifest
+    check([year], manifest)
+
+    directory = os.path.join(fs.archive_dir(), str(year))
+    os.makedirs(directory, exist_ok=True)
+
+    entries, kept, archived = {}, {}, {}
+    for sheet_name, (_, dtypes) in sheets().items():
+        df = utils.get_sheet_df(book, sheet_name, dtypes)
+        in_year = row_years(df, sheet_name) == year
+        archived[sheet_name], kept[sheet_name] = df[in_year], df[~in_year]
+        entries[sheet_name] = _write(
+            os.path.join(directory, f"{sheet_name}.csv.gz"), archived[sheet_name]
+        )
+    cube = _write(
+        os.path.join(directory, "cube.csv.gz"),
+        ag.build_cube(archived[fs.expenses_page()]),
+    )
+
+    for sheet_name, df in kept.items():
+        if sheet_name in book:
+            book[sheet_name] = utils.df_to_sheet(df)
+
+    manifest["years"][str(year)] = {"sheets": entries, "cube": cube}
+    if save:
+        save_manifest(manifest)
+    return {sheet_name: entry["rows"] for sheet_name, entry in entries.items()}
+
+
+def verify() -> List[str]:
+    """Problems found reading every archived file, none when all match the manifest"""
+    problems = []
+    for year, entry in load_manifest()["years"].items():
+        for file_entry in list(entry["sheets"].values()) + [entry["cube"]]:
+            try:
+                _read(int(year), file_entry)
+            except (OSError, ValueError) as error:
+                problems.append(str(error))
+    return problems
+
+
+def read_sheet(sheet_name: str, years: Optional[Iterable[int]] = None) -> pd.DataFrame:
+    """Archived rows of a sheet, of the given closed years or all of them"""
+    manifest = load_manifest()["years"]
+    wanted = {str(year) for year in years} if years is not None else set(manifest)
+    dtypes = sheets()[sheet_name][1]
+
+    frames = []
+    for year in sorted(wanted & set(manifest)):
+        entry = manifest[year]["sheets"][sheet_name]
+        if not entry["rows"]:
+            continue
+        content = _read(int(year), entry)
+        df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False)
+        for column, dtype in dtypes.items():
+            if column in df.columns and type(dtype) is not str:
+                df[column] = df[column].astype(float)
+        frames.append(dt.typed(df, fs.sheet_date_columns()[sheet_name]))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def _digest() -> str:
+    if not os.path.exists(manifest_path()):
+        return ""
+    with open(manifest_path(), "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def expenses() -> pd.DataFrame:
+    """Every archived expenses row, memoized in the cache until the manifest changes"""
+    digest = _digest()
+    if not digest:
+        return pd.DataFrame()
+
+    path = os.path.join(fs.cache_dir(), "archived_expenses.pkl")
+    try:
+        with open(path, "rb") as stored:
+            entry = pickle.load(stored)
+        if entry.get("digest") == digest:
+            return entry["frame"]
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    df = read_sheet(fs.expenses_page())
+    os.makedirs(fs.cache_dir(), exist_ok=True)
+    with open(path, "wb") as stored:
+        pickle.dump(
+            {"digest": digest, "frame": df}, stored, protocol=pickle.HIGHEST_PROTOCOL
+        )
+    return df
+
+
+def with_archived_expenses(df_sheet: pd.DataFrame) -> pd.DataFrame:
+    """The workbook's expenses preceded by the archived ones"""
+    archived = expenses()
+    if archived.empty:
+        return df_sheet
+    return pd.concat([archived, df_sheet], ignore_index=True)
+
+
+def with_archived_raw(df_sheet: pd.DataFrame) -> pd.DataFrame:
+    """The workbook's expenses_raw rows preceded by the archived ones"""
+    archived = read_sheet(fs.expenses_raw_page())
+    if archived.empty:
+        return df_sheet
+    return pd.concat([archived, df_sheet], ignore_index=True)
+
+
+def cube() -> pd.DataFrame:
+    """The monthly cube of every archived year, as stored when each was frozen"""
+    frames = []
+    for year, entry in load_manifest()["years"].items():
+        if not entry["cube"]["rows"]:
+            continue
+        content = _read(int(year), entry["cube"])
+        frames.append(
+            pd.read_csv(
+                io.BytesIO(content),
+                dtype={key: str for key in ag.cube_keys()},
+                keep_default_na=False,
+            )
+        )
+    return ag.combine_cubes(frames)
@@ -0,0 +1,87 @@
+"""
+Mergeable quantile sketches of amounts, one per group, kept as a table of bucket counts.
+
+Amounts are counted in logarithmic buckets (as in DDSketch): a bucket spans values whose
+ratio is at most gamma = (1 + ALPHA) / (1 - ALPHA), so any quantile read back is within
+ALPHA of the true value, relatively. A sketch is a frame of (group columns..., Key, Count)
+rows, with a key ordered like the amounts it counts (negative for negative amounts, 0
+for amounts under a cent). Sketches of new rows or of other partitions merge by summing
+counts per key, so quantiles are updated without re-reading earlier rows.
+"""
+
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+ALPHA = 0.01
+
+# amounts smaller than this (in absolute value) count as 0
+MIN_VALUE = 0.01
+
+
+def gamma() -> float:
+    return (1 + ALPHA) / (1 - ALPHA)
+
+
+def _bias() -> int:
+    """Offset making the key of MIN_VALUE 1"""
+    return 1 - int(np.ceil(np.log(MIN_VALUE) / np.log(gamma())))
+
+
+def keys(values: np.ndarray) -> np.ndarray:
+    """Bucket key of each value, in the order of the values"""
+    values = np.asarray(values, dtype=float)
+    magnitude = np.abs(values)
+    counted = magnitude >= MIN_VALUE
+    index = np.zeros(len(values), dtype=np.int64)
+    index[counted] = (
+        np.ceil(np.log(magnitude[counted]) / np.log(gamma())).astype(np.int64) + _bias()
+    )
+    return np.sign(values).astype(np.int64) * index
+
+
+def key_values(bucket_keys: np.ndarray) -> np.ndarray:
+    """Value each bucket key stands for, within ALPHA of every value it counted"""
+    bucket_keys = np.asarray(bucket_keys, dtype=np.int64)
+    index = np.abs(bucket_keys) - _bias()
+    values = 2 * gamma() ** index.astype(float) / (gamma() + 1)
+    return np.where(bucket_keys == 0, 0.0, np.sign(bucket_keys) * values)
+
+
+def sketch(df: pd.DataFrame, by: List[str], column: str = "Amount") -> pd.DataFrame:
+    """Sketch of a column for each group of the by columns"""
+    counted = df[by].copy()
+    counted["Key"] = keys(df[column].to_numpy())
+    return counted.value_counts(sort=False).rename("Count").reset_index()
+
+
+def merge(sketches: Iterable[pd.DataFrame], by: List[str]) -> pd.DataFrame:
+    """One sketch counting everything the given sketches counted"""
+    frames = [frame for frame in sketches if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=by + ["Key", "Count"])
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.groupby(by + ["Key"], as_index=False, sort=False).Count.sum()
+
+
+def quantiles(
+    sketch_df: pd.DataFrame, by: List[str], qs: Iterable[float]
+) -> pd.DataFrame:
+    """Estimated quantiles of each group, a column per quantile"""
+    qs = list(qs)
+    if sketch_df.empty:
+        return pd.DataFrame(columns=qs)
+
+    table = sketch_df.sort_values(by + ["Key"], kind="stable")
+    grouped = table.groupby(by, sort=False).Count
+    cumulative = grouped.cumsum()
+    total = grouped.transform("sum")
+
+    result = {}
+    for q in qs:
+        # first bucket whose cumulative count passes the quantile's rank
+        found = table[cumulative > q * (total - 1)]
+        first = found.groupby(by, sort=False).Key.first()
+        result[q] = pd.Series(key_values(first.to_numpy()), index=first.index)
+    return pd.DataFrame(result)
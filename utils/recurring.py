@@ -0,0 +1,156 @@
+"""
+Detection of recurring charges (subscriptions) in the categorized expenses.
+
+Charges are grouped by the merchant key of their description, so store numbers,
+reference ids and dates within a description do not split a merchant. A group is a subscription when its
+median gap between charges is close to a cadence (weekly, monthly, annual), most gaps
+are within that cadence's tolerance and most amounts are close to the median amount.
+Every statistic is a vectorized group-by over the whole ledger.
+"""
+
+import numpy as np
+import pandas as pd
+
+from utils import dates as dt
+from utils import expense_patterns as ep
+
+# cadence: (days, tolerance in days, charges per year, fewest charges to detect it)
+CADENCES = {
+    "weekly": (7.0, 2.0, 52, 4),
+    "monthly": (30.44, 5.0, 12, 3),
+    "annual": (365.25, 15.0, 1, 2),
+}
+
+# share of gaps & amounts that must be consistent
+CONSISTENCY = 0.75
+
+# an amount is consistent within this fraction of the median amount
+AMOUNT_TOLERANCE = 0.2
+
+COLUMNS = [
+    "Merchant",
+    "Primary",
+    "Secondary",
+    "Cadence",
+    "Status",
+    "Charges",
+    "First",
+    "Last",
+    "Amount",
+    "Annual",
+]
+
+
+def normalize_descriptions(descriptions: pd.Series) -> pd.Series:
+    """
+    Categorical merchant key of each description, each distinct description once.
+
+    The keys are those categorize labels by (ep.merchant_keys), so a subscription is
+    one merchant here whenever its charges share one label.
+
+    e.g. "NETFLIX.COM*1A2B", "NETFLIX.COM*9Z8Y" -> "NETFLIX.COM*0"
+    """
+    if not isinstance(descriptions.dtype, pd.CategoricalDtype):
+        descriptions = descriptions.astype(str).astype("category")
+    categories = pd.Series(descriptions.cat.categories.astype(str))
+    codes, merchants = pd.factorize(ep.merchant_keys(categories))
+    return pd.Series(
+        pd.Categorical.from_codes(codes[descriptions.cat.codes], merchants),
+        index=descriptions.index,
+    )
+
+
+def _cadences() -> pd.DataFrame:
+    return pd.DataFrame(
+        CADENCES.values(),
+        index=pd.Index(CADENCES.keys(), name="Cadence"),
+        columns=["Days", "Tolerance", "PerYear", "MinCharges"],
+    )
+
+
+def charges(df_expenses: pd.DataFrame) -> pd.DataFrame:
+    """Outgoing charges with their merchant, excluding transfers & income"""
+    df = df_expenses[
+        (df_expenses.Amount < 0) & ~df_expenses.Type.isin(["Transfers", "Income"])
+    ]
+    df = df[["Date", "Amount", "Description", "Primary", "Secondary"]].copy()
+    df["Date"] = dt.parse(df.Date)
+    df["Merchant"] = normalize_descriptions(df.Description)
+    return df[df.Merchant != ""].sort_values(["Merchant", "Date"], kind="stable")
+
+
+def detect(
+    df_expenses: pd.DataFrame, as_of: str = "", new_days: int = 120
+) -> pd.DataFrame:
+    """
+    Recurring charges with their cadence, status & annualized cost.
+
+    :param as_of: date the status is judged at, the last expense date by default
+    :param new_days: an active subscription first charged this recently is "new"
+    :return: one row per subscription, Status "active", "new" or "lapsed"
+    """
+    df = charges(df_expenses)
+    if df.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    group = df.groupby("Merchant", sort=False, observed=True)
+    df["Gap"] = group.Date.diff().dt.days
+
+    stats = group.agg(
+        Primary=("Primary", "last"),
+        Secondary=("Secondary", "last"),
+        Charges=("Amount", "size"),
+        First=("Date", "min"),
+        Last=("Date", "max"),
+        Amount=("Amount", "median"),
+        MedianGap=("Gap", "median"),
+    )
+
+    # the cadence whose period the median gap falls within
+    cadences = _cadences()
+    stats["Cadence"] = ""
+    for name, cadence in cadences.iterrows():
+        close = (stats.MedianGap - cadence.Days).abs() <= cadence.Tolerance
+        stats.loc[close & (stats.Cadence == ""), "Cadence"] = name
+    stats = stats[stats.Cadence != ""].join(cadences, on="Cadence")
+
+    df = df[df.Merchant.isin(stats.index)]
+    per_row = stats.loc[df.Merchant]
+    gap_ok = np.abs(df.Gap.values - per_row.Days.values) <= per_row.Tolerance.values
+    amount_ok = np.abs(
+        df.Amount.values - per_row.Amount.values
+    ) <= AMOUNT_TOLERANCE * np.abs(per_row.Amount.values)
+    consistency = pd.DataFrame(
+        {
+            "Merchant": df.Merchant.values,
+            "GapOk": gap_ok,
+            "HasGap": ~pd.isna(df.Gap.values),
+            "AmountOk": amount_ok,
+        }
+    ).groupby("Merchant", observed=True)
+    stats["GapShare"] = consistency.GapOk.sum() / consistency.HasGap.sum()
+    stats["AmountShare"] = consistency.AmountOk.mean()
+
+    stats = stats[
+        (stats.Charges >= stats.MinCharges)
+        & (stats.GapShare >= CONSISTENCY)
+        & (stats.AmountShare >= CONSISTENCY)
+    ].copy()
+
+    last_expense = dt.parse(df_expenses.Date).max()
+    as_of_date = pd.Timestamp(as_of) if as_of else last_expense
+    overdue = as_of_date - stats.Last > pd.to_timedelta(
+        stats.Days * 1.5 + stats.Tolerance, unit="D"
+    )
+    recent = stats.First >= as_of_date - pd.Timedelta(days=new_days)
+    stats["Status"] = "active"
+    stats.loc[recent, "Status"] = "new"
+    stats.loc[overdue, "Status"] = "lapsed"
+    stats["Annual"] = (stats.Amount * stats.PerYear).round(2)
+    stats["Amount"] = stats.Amount.round(2)
+
+    order = {"new": 0, "active": 1, "lapsed": 2}
+    stats = stats.sort_values(
+        ["Status", "Annual"], key=lambda c: c.map(order) if c.name == "Status" else c
+    )
+    return stats.reset_index()[COLUMNS]
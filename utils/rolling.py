@@ -0,0 +1,107 @@
+"""
+Trailing window statistics of every category, from the monthly aggregate cube.
+
+The cube is pivoted once into a (months x categories) matrix of cents, with months
+missing from a category filled with 0. Trailing means are differences of a cumulative
+sum, medians are taken over a sliding window view and year over year deltas compare
+the trailing 12 months with the 12 before them, so every category is computed in the
+same vectorized pass and cost grows linearly with months x categories.
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+WINDOWS = (3, 6, 12)
+
+# categories the statistics may be grouped by
+LEVELS = ("Type", "Primary")
+
+
+def columns(windows: Iterable[int] = WINDOWS) -> list:
+    windows = list(windows)
+    return (
+        ["Month", "Category", "Amount"]
+        + [f"Mean{window}" for window in windows]
+        + [f"Median{window}" for window in windows]
+        + ["YoY", "YoYPct"]
+    )
+
+
+def monthly_matrix(cube: pd.DataFrame, by: str = "Type") -> pd.DataFrame:
+    """Cents per month (every month of the range) & category of the given level"""
+    if cube.empty:
+        return pd.DataFrame(dtype="int64")
+
+    matrix = cube.pivot_table(
+        index="Month", columns=by, values="Cents", aggfunc="sum", fill_value=0
+    )
+    months = pd.period_range(matrix.index.min(), matrix.index.max(), freq="M")
+    matrix = matrix.reindex(months.strftime("%Y-%m"), fill_value=0)
+    matrix.index.name, matrix.columns.name = "Month", "Category"
+    return matrix.astype("int64")
+
+
+def trailing_sum(values: np.ndarray, window: int) -> np.ndarray:
+    """Sum of the trailing window of each row, NaN until the window is full"""
+    cumulative = np.vstack(
+        [np.zeros((1, values.shape[1]), dtype=values.dtype), values.cumsum(axis=0)]
+    )
+    result = np.full(values.shape, np.nan)
+    result[window - 1 :] = cumulative[window:] - cumulative[:-window]
+    return result
+
+
+def trailing_median(values: np.ndarray, window: int) -> np.ndarray:
+    """Median of the trailing window of each row, NaN until the window is full"""
+    result = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        windows = sliding_window_view(values, window, axis=0)
+        result[window - 1 :] = np.median(windows, axis=-1)
+    return result
+
+
+def rolling_stats(
+    cube: pd.DataFrame, by: str = "Type", windows: Tuple[int, ...] = WINDOWS
+) -> pd.DataFrame:
+    """
+    Trailing means & medians and the year over year delta of every category & month.
+
+    :param by: category level of the cube, "Type" or "Primary"
+    :return: columns(windows), amounts in dollars & signed as in the cube, the year over
+    year change of their magnitude
+    """
+    matrix = monthly_matrix(cube, by)
+    if matrix.empty:
+        return pd.DataFrame(columns=columns(windows))
+
+    values = matrix.to_numpy()
+    stats = {"Amount": values / 100}
+    for window in windows:
+        stats[f"Mean{window}"] = trailing_sum(values, window) / window / 100
+    for window in windows:
+        stats[f"Median{window}"] = trailing_median(values, window) / 100
+
+    # trailing 12 months against the 12 months before them, as magnitudes so more
+    # spending is a positive change, as more income is
+    year = np.abs(trailing_sum(values, 12))
+    previous = np.full(values.shape, np.nan)
+    previous[12:] = year[:-12]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = (year - previous) / previous * 100
+    stats["YoY"] = (year - previous) / 100
+    stats["YoYPct"] = np.where(np.isfinite(percent), percent, np.nan)
+
+    # month major rows, as the matrix ravels
+    months, categories = matrix.shape
+    df = pd.DataFrame(
+        {
+            "Month": np.repeat(matrix.index.to_numpy(), categories),
+            "Category": np.tile(matrix.columns.to_numpy(), months),
+            **{name: stat.ravel() for name, stat in stats.items()},
+        }
+    )
+    df[list(stats)] = df[list(stats)].round(2)
+    return df[columns(windows)]
@@ -0,0 +1,197 @@
+"""
+Categorization rules loaded from a JSON file instead of the built-in dictionaries.
+
+The file holds the expense patterns, in priority order, and the Type rules, applied in
+order so a later rule overrides an earlier one:
+{
+    "patterns": [
+        {"pattern": "(?i)Acme.*CO", "label": "Shopping: Hardware: Acme Corporation"}
+    ],
+    "types": [
+        {"type": "Lifestyle", "primary": ["Automotive", "Fuel"]},
+        {"type": "Fun", "secondary": ["Video"]}
+    ],
+    "merchants": [
+        {"pattern": "\\d{2,}", "replace": "0"}
+    ]
+}
+
+"merchants" is optional, the regex replacements deriving the merchant key patterns are
+matched against (see utils/expense_patterns.py), the built-in ones when it is left out.
+
+Validating thousands of regexes is the slow part of loading, so the validated bundle is
+pickled in the cache directory under the sha256 of the file and reused until the file
+changes. Compiled regexes can not be persisted (pickle stores their source), they are
+compiled when first used to label.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import file_settings as fs
+
+# bump when the bundle changes shape
+BUNDLE_VERSION = 2
+
+COLUMNS = {"primary": "Primary", "secondary": "Secondary"}
+
+# (pattern, label) in priority order
+Patterns = List[Tuple[str, str]]
+# (type, column, values) in application order
+TypeRules = List[Tuple[str, str, List[str]]]
+# (regex, replacement) in application order
+MerchantRules = List[Tuple[str, str]]
+
+
+def _fail(file: str, message: str) -> None:
+    raise ValueError(f"{file}: {message}")
+
+
+def _patterns(raw: Any, file: str) -> Patterns:
+    if not isinstance(raw, list):
+        _fail(file, '"patterns" must be a list')
+
+    patterns: Patterns = []
+    seen = set()
+    for number, rule in enumerate(raw):
+        where = f"patterns[{number}]"
+        if not isinstance(rule, dict) or set(rule) != {"pattern", "label"}:
+            _fail(file, f'{where} must have exactly "pattern" & "label"')
+        pattern, label = rule["pattern"], rule["label"]
+        if not isinstance(pattern, str) or not pattern:
+            _fail(file, f"{where} pattern must be a non empty string")
+        if not isinstance(label, str) or not label.split(":")[0].strip():
+            _fail(file, f'{where} label must be "Primary: Secondary: Tertiary"')
+        if pattern in seen:
+            _fail(file, f"{where} repeats pattern {pattern!r}")
+        try:
+            re.compile(pattern)
+        except re.error as error:
+            _fail(file, f"{where} invalid regex {pattern!r}: {error}")
+        seen.add(pattern)
+        patterns.append((pattern, label))
+    return patterns
+
+
+def _types(raw: Any, file: str) -> TypeRules:
+    if not isinstance(raw, list):
+        _fail(file, '"types" must be a list')
+
+    rules: TypeRules = []
+    for number, rule in enumerate(raw):
+        where = f"types[{number}]"
+        keys = set(rule) - {"type"} if isinstance(rule, dict) else set()
+        if not isinstance(rule, dict) or "type" not in rule or len(keys) != 1:
+            _fail(file, f'{where} must have "type" & one of "primary" or "secondary"')
+        (key,) = keys
+        values = rule[key]
+        if key not in COLUMNS:
+            _fail(file, f'{where} unknown key "{key}"')
+        if not isinstance(rule["type"], str) or not rule["type"]:
+            _fail(file, f"{where} type must be a non empty string")
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            _fail(file, f"{where} {key} must be a list of strings")
+        rules.append((rule["type"], COLUMNS[key], values))
+    return rules
+
+
+def _merchants(raw: Any, file: str) -> MerchantRules:
+    if not isinstance(raw, list):
+        _fail(file, '"merchants" must be a list')
+
+    rules: MerchantRules = []
+    for number, rule in enumerate(raw):
+        where = f"merchants[{number}]"
+        if not isinstance(rule, dict) or set(rule) != {"pattern", "replace"}:
+            _fail(file, f'{where} must have exactly "pattern" & "replace"')
+        pattern, replacement = rule["pattern"], rule["replace"]
+        if not isinstance(pattern, str) or not pattern:
+            _fail(file, f"{where} pattern must be a non empty string")
+        if not isinstance(replacement, str):
+            _fail(file, f"{where} replace must be a string")
+        try:
+            re.compile(pattern)
+        except re.error as error:
+            _fail(file, f"{where} invalid regex {pattern!r}: {error}")
+        rules.append((pattern, replacement))
+    return rules
+
+
+def validate(raw: Any, file: str = "") -> Dict[str, Any]:
+    """Bundle of patterns, type & merchant rules from the parsed file, ValueError if invalid"""
+    if not isinstance(raw, dict) or not {"patterns", "types"} <= set(raw) <= {
+        "patterns",
+        "types",
+        "merchants",
+    }:
+        _fail(file, 'expected an object with "patterns", "types" & maybe "merchants"')
+    bundle = {
+        "patterns": _patterns(raw["patterns"], file),
+        "types": _types(raw["types"], file),
+    }
+    if "merchants" in raw:
+        bundle["merchants"] = _merchants(raw["merchants"], file)
+    return bundle
+
+
+def bundle_path(digest: str) -> str:
+    return os.path.join(fs.cache_dir(), "rules", f"{digest}.pkl")
+
+
+def _read(digest: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(bundle_path(digest), "rb") as stored:
+            entry = pickle.load(stored)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if entry.get("version") != BUNDLE_VERSION:
+        return None
+    return entry["bundle"]
+
+
+def load(file: str) -> Dict[str, Any]:
+    """Validated bundle of the rules file, from the cache while the file is unchanged"""
+    with open(file, "rb") as rules:
+        content = rules.read()
+    digest = hashlib.sha256(content).hexdigest()
+
+    bundle = _read(digest)
+    if bundle is not None:
+        return bundle
+
+    try:
+        raw = json.loads(content)
+    except json.JSONDecodeError as error:
+        raise ValueError(f"{file}: {error}") from error
+    bundle = validate(raw, file)
+
+    os.makedirs(os.path.dirname(bundle_path(digest)), exist_ok=True)
+    with open(bundle_path(digest), "wb") as stored:
+        entry = {"version": BUNDLE_VERSION, "bundle": bundle}
+        pickle.dump(entry, stored, protocol=pickle.HIGHEST_PROTOCOL)
+    return bundle
+
+
+def dump(bundle: Dict[str, Any]) -> str:
+    """JSON text of a bundle, the format load reads"""
+    keys = {column: key for key, column in COLUMNS.items()}
+    raw = {
+        "patterns": [
+            {"pattern": pattern, "label": label}
+            for pattern, label in bundle["patterns"]
+        ],
+        "types": [
+            {"type": type_name, keys[column]: values}
+            for type_name, column, values in bundle["types"]
+        ],
+    }
+    if "merchants" in bundle:
+        raw["merchants"] = [
+            {"pattern": pattern, "replace": replacement}
+            for pattern, replacement in bundle["merchants"]
+        ]
+    return json.dumps(raw, indent=2) + "\n"
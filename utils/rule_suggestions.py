@@ -0,0 +1,228 @@
+"""
+Expense pattern suggestions for unlabeled Groupings.
+
+Distinct Groupings are normalized (the letters of their merchant key) and summarized by a MinHash signature
+of their character shingles. Locality sensitive hashing over bands of the signature
+finds similar Groupings without comparing every pair, and those agreeing on enough of
+their signature are clustered. Each cluster gets a regex of the tokens its members
+share, and the label of the nearest labeled Grouping (or expense pattern), found with
+the same banded index.
+"""
+
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from utils import expense_patterns as ep
+
+SHINGLE = 3
+PERMUTATIONS = 64
+# 2 signature rows per band, so pairs of similarity 0.4 share a band ~99% of the time
+BANDS = 32
+
+# Mersenne prime keeping (a * x + b) within int64 for 31 bit a, b & x
+PRIME = (1 << 31) - 1
+
+# share of signature agreeing for Groupings to cluster (estimated Jaccard similarity)
+THRESHOLD = 0.4
+
+COLUMNS = ["Regex", "Label", "Similarity", "Rows", "Dollars", "Examples"]
+
+
+def normalize(groupings: pd.Series) -> pd.Series:
+    """
+    Upper case letters & single spaces of the merchant key (ep.merchant_keys).
+
+    e.g. "Shell Oil 57442#1 Gas Austin TX" -> "SHELL OIL GAS AUSTIN"
+    """
+    return (
+        ep.merchant_keys(groupings.astype(str))
+        .str.upper()
+        .str.replace(r"[^A-Z]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def tokens(text: str) -> List[str]:
+    return [token for token in text.split() if len(token) > 1]
+
+
+def _shingles(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """crc32 of each character shingle, with the position of the text it came from"""
+    hashes, owners = [], []
+    for position, text in enumerate(texts):
+        padded = f" {text} "
+        grams = {padded[i : i + SHINGLE] for i in range(max(len(padded) - 2, 1))}
+        hashes.extend(zlib.crc32(gram.encode()) % PRIME for gram in grams)
+        owners.extend([position] * len(grams))
+    return np.array(hashes, dtype=np.int64), np.array(owners, dtype=np.int64)
+
+
+def signatures(texts: List[str], seed: int = 0) -> np.ndarray:
+    """MinHash signature of each text, shape (len(texts), PERMUTATIONS)"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, PRIME, PERMUTATIONS, dtype=np.int64)
+    b = rng.integers(0, PRIME, PERMUTATIONS, dtype=np.int64)
+
+    hashes, owners = _shingles(texts)
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    result = np.full((len(texts), PERMUTATIONS), PRIME, dtype=np.int64)
+    if not len(hashes):
+        return result
+
+    # a few permutations at a time bounds the (permutations x shingles) block
+    for first in range(0, PERMUTATIONS, 8):
+        block = (
+            a[first : first + 8, None] * hashes + b[first : first + 8, None]
+        ) % PRIME
+        minimum = np.minimum.reduceat(block, starts, axis=1)
+        result[owners[starts], first : first + 8] = minimum.T
+    return result
+
+
+def band_keys(signature: np.ndarray) -> np.ndarray:
+    """One hash per band of the signature, shape (rows, BANDS)"""
+    rows = PERMUTATIONS // BANDS
+    bands = signature.reshape(len(signature), BANDS, rows).astype(np.uint64)
+    weights = np.uint64(1000003) ** np.arange(rows, dtype=np.uint64)
+    return (bands * weights).sum(axis=2)
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Share of agreeing signature entries of each row pair"""
+    return (left == right).mean(axis=1)
+
+
+def clusters(signature: np.ndarray, threshold: float = THRESHOLD) -> np.ndarray:
+    """Cluster number of each signature, texts sharing a band bucket & similar join"""
+    count = len(signature)
+    keys = band_keys(signature)
+    left, right = [], []
+    for band in range(BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        same = keys[order[1:], band] == keys[order[:-1], band]
+        left.append(order[:-1][same])
+        right.append(order[1:][same])
+
+    left, right = np.concatenate(left), np.concatenate(right)
+    close = similarity(signature[left], signature[right]) >= threshold
+    graph = coo_matrix(
+        (np.ones(close.sum()), (left[close], right[close])), shape=(count, count)
+    )
+    return connected_components(graph, directed=False)[1]
+
+
+def nearest(query: np.ndarray, reference: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Position of the most similar reference signature sharing a band, -1 if none"""
+    query_keys, reference_keys = band_keys(query), band_keys(reference)
+    pairs = []
+    for band in range(BANDS):
+        pairs.append(
+            pd.DataFrame(
+                {"Query": np.arange(len(query)), "Key": query_keys[:, band]}
+            ).merge(
+                pd.DataFrame(
+                    {
+                        "Reference": np.arange(len(reference)),
+                        "Key": reference_keys[:, band],
+                    }
+                ),
+                on="Key",
+            )[
+                ["Query", "Reference"]
+            ]
+        )
+
+    best = np.full(len(query), -1)
+    scores = np.zeros(len(query))
+    candidates = pd.concat(pairs).drop_duplicates()
+    if candidates.empty:
+        return best, scores
+
+    candidates["Similarity"] = similarity(
+        query[candidates.Query.values], reference[candidates.Reference.values]
+    )
+    top = candidates.sort_values("Similarity", ascending=False).drop_duplicates("Query")
+    best[top.Query.values] = top.Reference.values
+    scores[top.Query.values] = top.Similarity.values
+    return best, scores
+
+
+def candidate_regex(texts: List[str]) -> str:
+    """Tokens every text shares, in the order of the first text"""
+    shared = set(tokens(texts[0]))
+    for text in texts[1:]:
+        shared &= set(tokens(text))
+    ordered = [token for token in tokens(texts[0]) if token in shared]
+    if not ordered:
+        ordered = tokens(texts[0])[:1] or [texts[0]]
+    return "(?i)" + ".*".join(re.escape(token.title()) for token in ordered)
+
+
+def suggest(
+    df_unlabeled: pd.DataFrame, df_reference: pd.DataFrame, limit: int = 20
+) -> pd.DataFrame:
+    """
+    Candidate expense patterns for the unlabeled rows.
+
+    :param df_unlabeled: Grouping & Amount of each unlabeled row
+    :param df_reference: Grouping & Label of labeled examples
+    :return: COLUMNS, ranked by the dollars & rows each regex covers
+    """
+    if df_unlabeled.empty:
+        return pd.DataFrame(columns=COLUMNS)
+
+    rows = df_unlabeled.assign(Normalized=normalize(df_unlabeled.Grouping))
+    rows["Dollars"] = rows.Amount.abs()
+    texts = rows.groupby("Normalized").agg(
+        Rows=("Dollars", "size"),
+        Dollars=("Dollars", "sum"),
+        Example=("Grouping", "first"),
+    )
+    texts = texts.sort_values("Rows", ascending=False)
+    texts["Cluster"] = clusters(signatures(texts.index.tolist()))
+
+    # the most common label of each normalized reference Grouping
+    reference = df_reference.assign(Normalized=normalize(df_reference.Grouping))
+    reference = (
+        reference.groupby(["Normalized", "Label"])
+        .size()
+        .sort_values(ascending=False, kind="stable")
+        .reset_index()
+        .drop_duplicates("Normalized")
+        .set_index("Normalized")
+        .Label
+    )
+
+    texts = texts.reset_index()
+    found = texts.groupby("Cluster", sort=False).agg(
+        Representative=("Normalized", "first"),
+        Rows=("Rows", "sum"),
+        Dollars=("Dollars", "sum"),
+    )
+    found = found.sort_values(["Dollars", "Rows"], ascending=False)
+    found = found.head(limit) if limit else found
+
+    # regexes & examples only for the clusters reported
+    members = texts[texts.Cluster.isin(found.index)].groupby("Cluster")
+    found["Regex"] = members.Normalized.agg(lambda texts: candidate_regex(list(texts)))
+    found["Examples"] = members.Example.agg(lambda examples: " | ".join(examples[:3]))
+    found["Dollars"] = found.Dollars.round(2)
+    found = found.reset_index(drop=True)
+
+    found["Label"], found["Similarity"] = "", 0.0
+    if not reference.empty:
+        best, scores = nearest(
+            signatures(found.Representative.tolist()),
+            signatures(reference.index.tolist()),
+        )
+        matched = best >= 0
+        found.loc[matched, "Label"] = reference.values[best[matched]]
+        found["Similarity"] = scores.round(2)
+
+    return found[COLUMNS]
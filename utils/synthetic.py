@@ -0,0 +1,222 @@
+"""
+Seeded synthetic statements & workbooks, in the bank/credit CSV and sheet schemas.
+
+Merchant strings are derived from the regexes in expense_patterns, so most rows are
+labeled by categorize, and carry the volatile store numbers, reference ids & locations
+real exports have. Optionally a share of rows come from unknown vendors and stay
+unlabeled (categorize refuses those until rules are added).
+"""
+
+import os
+import re
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pyexcel_ods3 as ods
+
+from utils import expense_patterns as ep
+from utils import file_settings as fs
+
+END_DATE = "2024-12-31"
+
+CREDIT_CATEGORIES = {
+    "Restaurant": "Food & Drink",
+    "Kiosk": "Food & Drink",
+    "Shopping": "Shopping",
+    "Entertainment": "Entertainment",
+    "Subscription": "Entertainment",
+    "Travel": "Travel",
+    "Fuel": "Gas",
+    "Automotive": "Automotive",
+    "Health": "Health & Wellness",
+    "Utilities": "Bills & Utilities",
+    "Service": "Personal",
+}
+
+LOCATIONS = ["AUSTIN TX", "SEATTLE WA", "DENVER CO", "PORTLAND OR", "CHICAGO IL"]
+
+UNKNOWN_VENDORS = [
+    "SQ *CORNER SHOP",
+    "TST* NEIGHBORHOOD",
+    "PAYPAL *MARKET",
+    "POS VENDOR",
+]
+
+
+def pattern_example(pattern: str) -> str:
+    """A plain description the regex matches, e.g. r"(?i)Buc-Ee.*Gas" -> "BUC-EE GAS" """
+    text = pattern.replace("(?i)", "")
+    text = re.sub(r"\(([^|()]*)\|[^()]*\)", r"\1", text)
+    text = text.replace(".*", " ").replace(r"\d", "7").replace(r"\D", " X")
+    text = text.replace(".", " ")
+    text = re.sub(r"[\\()^$+?\[\]]", "", text)
+    return re.sub(r"\s+", " ", text).strip().upper()
+
+
+def merchants() -> pd.DataFrame:
+    """Known merchant descriptions with the label & primary they are expected to get"""
+    rows = []
+    for pattern, label in ep.patterns_expense.items():
+        example = pattern_example(pattern)
+        if example and re.search(pattern, example):
+            rows.append(
+                {
+                    "Description": example,
+                    "Label": label,
+                    "Primary": label.split(":")[0].strip(),
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def _dates(rng: np.random.Generator, rows: int, years: int) -> pd.Series:
+    end = pd.Timestamp(END_DATE)
+    offsets = rng.integers(0, years * 365, rows)
+    return pd.Series(end - pd.to_timedelta(offsets, unit="D"))
+
+
+def _descriptions(rng: np.random.Generator, base: pd.Series) -> pd.Series:
+    """Append the volatile tokens (store #, reference id, location) exports carry"""
+    rows = len(base)
+    store = pd.Series(rng.integers(100, 9999, rows)).astype(str)
+    reference = pd.Series(rng.integers(16**5, 16**6, rows)).map("{:X}".format)
+    location = pd.Series(np.array(LOCATIONS)[rng.integers(0, len(LOCATIONS), rows)])
+    variant = rng.integers(0, 3, rows)
+
+    base = base.reset_index(drop=True)
+    return pd.Series(
+        np.select(
+            [variant == 0, variant == 1],
+            [
+                base + " #" + store + " " + location,
+                base + "*" + reference,
+            ],
+            default=base + " " + location,
+        )
+    )
+
+
+def _rows(rng: np.random.Generator, rows: int, unlabeled: float) -> pd.DataFrame:
+    """Description, Primary & signed Amount of each synthetic transaction"""
+    known = merchants()
+    expense = known[known.Primary != "Income"].reset_index(drop=True)
+    income = known[known.Primary == "Income"].reset_index(drop=True)
+
+    kind = rng.random(rows)
+    is_income = kind < 0.05
+    is_unknown = ~is_income & (kind < 0.05 + unlabeled)
+
+    picked = expense.iloc[rng.integers(0, len(expense), rows)].reset_index(drop=True)
+    if len(income):
+        paid = income.iloc[rng.integers(0, len(income), rows)].reset_index(drop=True)
+        picked.loc[is_income] = paid.loc[is_income]
+    vendors = np.array(UNKNOWN_VENDORS)[rng.integers(0, len(UNKNOWN_VENDORS), rows)]
+    picked.loc[is_unknown, "Description"] = vendors[is_unknown]
+    picked.loc[is_unknown, "Primary"] = ""
+
+    amount = np.round(rng.lognormal(3.5, 1.1, rows), 2)
+    amount = np.where(is_income, np.round(rng.normal(3000, 400, rows), 2), -amount)
+
+    return pd.DataFrame(
+        {
+            "Description": _descriptions(rng, picked.Description),
+            "Primary": picked.Primary,
+            "Amount": amount,
+        }
+    )
+
+
+def bank_csv_df(
+    rows: int, seed: int = 0, years: int = 5, unlabeled: float = 0.0
+) -> pd.DataFrame:
+    """A bank export, columns as in file_settings.bank_dtype"""
+    rng = np.random.default_rng(seed)
+    df = _rows(rng, rows, unlabeled)
+    dates = _dates(rng, rows, years)
+
+    df = df.assign(Date=dates).sort_values("Date", ascending=False)
+    balance = 10000 + df.Amount[::-1].cumsum()[::-1]
+
+    return pd.DataFrame(
+        {
+            "Details": np.where(df.Amount > 0, "CREDIT", "DEBIT"),
+            "Posting Date": df.Date.dt.strftime("%m/%d/%Y"),
+            "Description": df.Description,
+            "Amount": df.Amount,
+            "Type": np.where(df.Amount > 0, "ACH_CREDIT", "DEBIT_CARD"),
+            "Balance": balance.map("{:.2f}".format),
+        }
+    )[list(fs.bank_dtype())].reset_index(drop=True)
+
+
+def credit_csv_df(
+    rows: int, seed: int = 0, years: int = 5, unlabeled: float = 0.0
+) -> pd.DataFrame:
+    """A credit card export, columns as in file_settings.credit_dtype"""
+    rng = np.random.default_rng(seed + 1)
+    df = _rows(rng, rows, unlabeled)
+    df = df[df.Primary != "Income"]
+    df = df.iloc[rng.integers(0, len(df), rows)].reset_index(drop=True)
+
+    transaction = _dates(rng, rows, years)
+    posted = transaction + pd.to_timedelta(rng.integers(0, 3, rows), unit="D")
+    df = df.assign(Transaction=transaction, Posted=posted)
+    df = df.sort_values("Transaction", ascending=False)
+
+    return pd.DataFrame(
+        {
+            "Transaction Date": df.Transaction.dt.strftime("%m/%d/%Y"),
+            "Post Date": df.Posted.dt.strftime("%m/%d/%Y"),
+            "Description": df.Description,
+            "Category": df.Primary.map(CREDIT_CATEGORIES).fillna(""),
+            "Type": "Sale",
+            "Amount": df.Amount,
+            "Memo": "",
+        }
+    )[list(fs.credit_dtype())].reset_index(drop=True)
+
+
+def split_rows(rows: int) -> Dict[str, int]:
+    """Share of rows given to the bank & credit exports"""
+    bank = max(rows * 3 // 10, 1)
+    return {"bank": bank, "credit": max(rows - bank, 1)}
+
+
+def _sheet(df: pd.DataFrame) -> List[list]:
+    return [df.columns.tolist()] + df.values.tolist()
+
+
+def workbook(rows: int, seed: int = 0, unlabeled: float = 0.0) -> Dict[str, List[list]]:
+    """Activity sheets as import_activity leaves them, with their data_source_note"""
+    split = split_rows(rows)
+    bank = bank_csv_df(split["bank"], seed, unlabeled=unlabeled)
+    bank = bank.assign(data_source_note="synthetic bank")
+    credit = credit_csv_df(split["credit"], seed, unlabeled=unlabeled).assign(
+        data_source_note="synthetic credit"
+    )
+    return {
+        fs.activity_page_bank(): _sheet(bank),
+        fs.activity_page_credit(): _sheet(credit),
+    }
+
+
+def write_statements(
+    directory: str, rows: int, seed: int = 0, unlabeled: float = 0.0
+) -> Dict[str, str]:
+    """Write bank.csv, credit.csv & a workbook of the same activity into directory"""
+    os.makedirs(directory, exist_ok=True)
+    split = split_rows(rows)
+    paths = {
+        "bank": os.path.join(directory, "bank.csv"),
+        "credit": os.path.join(directory, "credit.csv"),
+        "workbook": os.path.join(directory, fs.decrypted_file_name()),
+    }
+
+    bank = bank_csv_df(split["bank"], seed, unlabeled=unlabeled)
+    bank.to_csv(paths["bank"], index=False)
+    credit = credit_csv_df(split["credit"], seed, unlabeled=unlabeled)
+    credit.to_csv(paths["credit"], index=False)
+    ods.save_data(paths["workbook"], workbook(rows, seed, unlabeled))
+
+    return paths
@@ -0,0 +1,113 @@
+"""
+Pairing of bank -> credit card payments, which appear in both activity sheets.
+
+A bank debit (Amount < 0) and a credit card payment (Amount > 0, of Type "Payment" when
+the export has a Type) pair when their amounts are equal and their dates are within a
+window. A bank deposit never pairs with a card purchase. Pairs are found with a sorted
+(as-of) merge keyed by the signed amount in cents, nearest date first, so matching is
+O(n log n). A row pairs at most once; ties are settled in rounds, each pairing every
+credit row with its nearest still unpaired bank row.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils import dates as dt
+
+
+def transfer_label() -> str:
+    return "Transfers: Card Payment"
+
+
+def _side(dates: pd.Series, amounts: pd.Series, sign: int) -> pd.DataFrame:
+    cents = np.round(pd.to_numeric(amounts, errors="coerce").fillna(0) * 100)
+    df = pd.DataFrame(
+        {
+            "Date": dt.parse(dates).values,
+            "Key": cents.astype("int64").values * sign,
+            "Row": np.arange(len(cents)),
+        }
+    )
+    # bank debits & credit payments, whose keys are both negative
+    return df[(df.Key < 0) & df.Date.notna()]
+
+
+def pairs(
+    bank_dates: pd.Series,
+    bank_amounts: pd.Series,
+    credit_dates: pd.Series,
+    credit_amounts: pd.Series,
+    window_days: int,
+) -> pd.DataFrame:
+    """Positions of the paired rows, columns Bank & Credit, ordered by bank date"""
+    bank = _side(bank_dates, bank_amounts, 1)
+    # a credit payment of +x pairs a bank debit of -x, negate so their keys agree
+    credit = _side(credit_dates, credit_amounts, -1).rename(columns={"Row": "Match"})
+    credit["MatchDate"] = credit.Date
+    tolerance = pd.Timedelta(days=window_days)
+
+    found = []
+    while not bank.empty and not credit.empty:
+        merged = pd.merge_asof(
+            bank.sort_values("Date"),
+            credit.sort_values("Date"),
+            on="Date",
+            by="Key",
+            tolerance=tolerance,
+            direction="nearest",
+        ).dropna(subset=["Match"])
+        if merged.empty:
+            break
+
+        merged["Distance"] = (merged.Date - merged.MatchDate).abs()
+        merged = merged.sort_values(["Distance", "Row"], kind="stable")
+        merged = merged.drop_duplicates("Match")
+        found.append(merged[["Row", "Match", "Date"]])
+
+        bank = bank[~bank.Row.isin(merged.Row)]
+        credit = credit[~credit.Match.isin(merged.Match)]
+
+    if not found:
+        return pd.DataFrame({"Bank": [], "Credit": []}, dtype="int64")
+
+    matched = pd.concat(found).sort_values(["Date", "Row"], kind="stable")
+    return pd.DataFrame(
+        {
+            "Bank": matched.Row.astype("int64").values,
+            "Credit": matched.Match.astype("int64").values,
+        }
+    )
+
+
+def link_ids(
+    bank_df: pd.DataFrame, credit_df: pd.DataFrame, window_days: int
+) -> Tuple[pd.Series, pd.Series]:
+    """
+    Link id of each bank & credit activity row, "" when it is not a transfer.
+
+    :param window_days: most days between the bank & credit dates of a pair
+    """
+    credit_amounts = credit_df["Amount"]
+    if "Type" in credit_df:
+        # purchases & returns are not payments, whatever their amount
+        payment = credit_df["Type"].astype(str).str.strip().str.lower() == "payment"
+        credit_amounts = credit_amounts.where(payment, 0)
+    matched = pairs(
+        bank_df["Posting Date"],
+        bank_df["Amount"],
+        credit_df["Post Date"],
+        credit_amounts,
+        window_days,
+    )
+    ids = [f"T{number}" for number in range(1, len(matched) + 1)]
+
+    bank_links = np.full(len(bank_df), "", dtype=object)
+    bank_links[matched.Bank.values] = ids
+    credit_links = np.full(len(credit_df), "", dtype=object)
+    credit_links[matched.Credit.values] = ids
+    return (
+        pd.Series(bank_links, index=bank_df.index, name="Link"),
+        pd.Series(credit_links, index=credit_df.index, name="Link"),
+    )
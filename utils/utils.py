@@ -1,10 +1,13 @@
 import datetime
+import pathlib
 import subprocess
-from typing import Dict, OrderedDict
+from typing import TYPE_CHECKING, Dict, List, OrderedDict
 
-import pandas as pd
 from colorama import Fore, Style, init
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Initialize terminal coloring
 init(autoreset=True)
 
@@ -38,23 +41,61 @@ def open(file: str) -> None:
 
 def get_sheet_df(
     book: OrderedDict, sheet_name: str, dtype_spec: Dict = dict()
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
+    # imported here so commands that never read a sheet (encrypt) skip pandas
+    import pandas as pd
+
+    from utils import arrow
+    from utils import dates as dt
+    from utils import file_settings as fs
+
     if not dtype_spec:
         raise ValueError("dtype spec required")
 
     sheet_data = book.get(sheet_name, [])
 
     if sheet_data:
-        df = pd.DataFrame(sheet_data[1:], columns=sheet_data[0])
+        # ods readers drop trailing empty cells, pad rows back to the header width
+        width = len(sheet_data[0])
+        rows = [row + [""] * (width - len(row)) for row in sheet_data[1:]]
+        df = pd.DataFrame(rows, columns=sheet_data[0])
     else:
         df = pd.DataFrame()
 
     for column, dtype in dtype_spec.items():
         if column in df.columns:
             fillna_value = "" if type(dtype) is str else 0
-            _astype = str if type(dtype) is str else float
+            _astype = arrow.string_dtype() if type(dtype) is str else float
             df[column] = (
                 df[column].astype(dtype).fillna(value=fillna_value).astype(_astype)
             )
 
-    return df
+    return dt.typed(df, fs.sheet_date_columns().get(sheet_name, []))
+
+
+def df_to_sheet(df: "pd.DataFrame") -> List[list]:
+    """Header row followed by the values, as the ods writer expects a sheet"""
+    from utils import dates as dt
+
+    # dates stay typed in memory and are only formatted here, as the sheet holds text
+    df = dt.as_text(df)
+    return [df.columns.tolist()] + df.values.tolist()
+
+
+def write_frame(
+    df: "pd.DataFrame", output_format: str = "table", output: str = ""
+) -> None:
+    """Print df as a table, CSV or JSON, or write it to the output file"""
+    if output_format == "csv":
+        text = df.to_csv(index=False)
+    elif output_format == "json":
+        text = df.to_json(orient="records", indent=2)
+    else:
+        text = df.to_string(index=False) if not df.empty else "No matching rows"
+
+    if output:
+        # this module's open launches LibreOffice
+        pathlib.Path(output).write_text(text)
+        print_status(f"{len(df)} row(s) written to {output}")
+    else:
+        print(text)